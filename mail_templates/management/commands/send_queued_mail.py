@@ -0,0 +1,64 @@
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from mail_templates.outbox import process_outbox
+
+
+class Command(BaseCommand):
+    help = "送信キューのメールをまとめて送信する（--once を指定しない場合は停止するまで繰り返す）"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.MAIL_OUTBOX["BATCH_SIZE"],
+            help="1回に送信する件数",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=settings.MAIL_OUTBOX["POLL_INTERVAL"],
+            help="送信対象がない場合に待つ秒数",
+        )
+        parser.add_argument(
+            "--once", action="store_true", help="送信対象がなくなったら終了する"
+        )
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        # SIGTERM（ECSのタスク停止など）を受けたら、処理中のバッチを送信してから終了する
+        handlers = {
+            signum: signal.signal(signum, self._stop)
+            for signum in (signal.SIGTERM, signal.SIGINT)
+        }
+        try:
+            self._run(options)
+        finally:
+            for signum, handler in handlers.items():
+                signal.signal(signum, handler)
+
+    def _run(self, options):
+        while not self.stopping:
+            close_old_connections()
+            try:
+                results = process_outbox(options["batch_size"])
+            except Exception as e:
+                self.stderr.write(f"メールの送信に失敗しました: {str(e)}")
+                results = None
+                if options["once"]:
+                    raise
+            if results is not None:
+                self.stdout.write(
+                    f"sent={results['sent']} retried={results['retried']} failed={results['failed']}"
+                )
+                continue
+            if options["once"]:
+                break
+            time.sleep(options["interval"])
+
+    def _stop(self, signum, frame):
+        self.stopping = True
@@ -0,0 +1,85 @@
+# Generated by Django 4.2.16 on 2026-10-18 18:13
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="OutgoingMail",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        primary_key=True, serialize=False, verbose_name="メールID"
+                    ),
+                ),
+                ("kind", models.CharField(max_length=50, verbose_name="種類")),
+                ("subject", models.CharField(max_length=255, verbose_name="件名")),
+                ("body", models.TextField(verbose_name="本文")),
+                (
+                    "from_email",
+                    models.CharField(
+                        blank=True, max_length=254, null=True, verbose_name="送信者"
+                    ),
+                ),
+                ("recipients", models.JSONField(verbose_name="受信者")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "送信待ち"),
+                            ("sending", "送信中"),
+                            ("sent", "送信済み"),
+                            ("failed", "送信失敗"),
+                        ],
+                        default="pending",
+                        max_length=10,
+                        verbose_name="状態",
+                    ),
+                ),
+                (
+                    "attempts",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="送信の試行回数"
+                    ),
+                ),
+                (
+                    "next_attempt_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="次回送信日時"
+                    ),
+                ),
+                (
+                    "last_error",
+                    models.TextField(blank=True, verbose_name="最後のエラー"),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="作成日時"),
+                ),
+                (
+                    "sent_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="送信日時"
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "outgoing_mails",
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("status__in", ["pending", "sending"])),
+                        fields=["next_attempt_at"],
+                        name="outgoing_mail_due_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.16 on 2026-10-18 18:19
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shared", "0005_announcement_active_idx"),
+        ("mail_templates", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="outgoingmail",
+            name="batch_id",
+            field=models.UUIDField(
+                blank=True, db_index=True, null=True, verbose_name="一括送信ID"
+            ),
+        ),
+        migrations.AddField(
+            model_name="outgoingmail",
+            name="requested_by",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                to="shared.account",
+                verbose_name="依頼者",
+            ),
+        ),
+    ]
@@ -0,0 +1,59 @@
+from django.db import models
+from django.utils.timezone import now
+
+
+class OutgoingMailStatus(models.TextChoices):
+    PENDING = "pending", "送信待ち"
+    SENDING = "sending", "送信中"
+    SENT = "sent", "送信済み"
+    FAILED = "failed", "送信失敗"
+
+
+class OutgoingMail(models.Model):
+    """送信待ちのメール（mail_templates.outbox で送信する）"""
+
+    id = models.BigAutoField(primary_key=True, verbose_name="メールID")
+    kind = models.CharField(max_length=50, verbose_name="種類")
+    # 一括送信（mail_templates.outbox.enqueue_bulk_mail）の場合の識別子と依頼者
+    batch_id = models.UUIDField(
+        null=True, blank=True, db_index=True, verbose_name="一括送信ID"
+    )
+    requested_by = models.ForeignKey(
+        "shared.Account",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        verbose_name="依頼者",
+    )
+    subject = models.CharField(max_length=255, verbose_name="件名")
+    body = models.TextField(verbose_name="本文")
+    from_email = models.CharField(
+        max_length=254, null=True, blank=True, verbose_name="送信者"
+    )
+    recipients = models.JSONField(verbose_name="受信者")
+    status = models.CharField(
+        max_length=10,
+        choices=OutgoingMailStatus.choices,
+        default=OutgoingMailStatus.PENDING,
+        verbose_name="状態",
+    )
+    attempts = models.PositiveIntegerField(default=0, verbose_name="送信の試行回数")
+    # 送信待ちの場合は次に送信する日時、送信中の場合は送信を打ち切ったとみなす日時
+    next_attempt_at = models.DateTimeField(default=now, verbose_name="次回送信日時")
+    last_error = models.TextField(blank=True, verbose_name="最後のエラー")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="作成日時")
+    sent_at = models.DateTimeField(null=True, blank=True, verbose_name="送信日時")
+
+    class Meta:
+        db_table = "outgoing_mails"
+        indexes = [
+            # 送信対象の取得（送信待ち・送信中 + 次回送信日時）
+            models.Index(
+                fields=["next_attempt_at"],
+                name="outgoing_mail_due_idx",
+                condition=models.Q(status__in=["pending", "sending"]),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}: {self.subject}"
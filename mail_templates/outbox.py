@@ -0,0 +1,230 @@
+"""
+メールの送信キュー（outbox）
+
+APIではメールを outgoing_mails テーブルに登録するだけにして、
+送信は別プロセスのワーカー（manage.py send_queued_mail）がまとめて行う。
+
+- 送信に失敗した場合は、MAIL_OUTBOX["RETRY_BACKOFF"] 秒 × 2^(試行回数 - 1) 後に再送する
+- MAIL_OUTBOX["MAX_ATTEMPTS"] 回失敗した場合は送信失敗（failed）とする
+- 送信中のままワーカーが停止した場合は、MAIL_OUTBOX["SENDING_TIMEOUT"] 秒後に再送の対象に戻る
+
+一括送信（enqueue_bulk_mail）では、テンプレートを1回だけ解析して受信者ごとに展開し、
+受信者ごとに1件ずつ登録する（送信結果は受信者ごとに記録される）。
+ワーカーは1バッチ分のメールを1つの接続で送信する。
+
+パスワード再設定のトークンなど、送信キューに保存してはいけない値を含むメールは、
+register_message_builder で登録した処理が送信の直前に本文を組み立てる。
+"""
+
+import logging
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Count
+from django.template import Context, Engine
+from django.utils import timezone
+
+from mail_templates.models import OutgoingMail, OutgoingMailStatus
+from npi.metrics import observe_mail_send
+
+# ロガーの設定
+logger = logging.getLogger(__name__)
+
+
+def _options():
+    return settings.MAIL_OUTBOX
+
+
+# 送信の直前に本文を組み立てるメールの種類 → 組み立てる処理
+_message_builders = {}
+
+
+def register_message_builder(kind, func):
+    """
+    送信の直前に本文を組み立てる処理を登録（各アプリの ready で登録する）
+    func(mail) は送信する本文を返す。送信を取りやめる場合は None を返す
+    """
+    _message_builders[kind] = func
+
+
+def enqueue_mail(kind, subject, message, recipient_list, from_email=None):
+    """メールを送信キューに登録"""
+    return OutgoingMail.objects.create(
+        kind=kind,
+        subject=subject,
+        body=message,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        recipients=list(recipient_list),
+    )
+
+
+def compile_template(source):
+    """メールのテンプレートを解析（構文エラーの場合は TemplateSyntaxError）"""
+    # メールはテキストのため、HTMLのエスケープは行わない
+    return Engine(autoescape=False).from_string(source)
+
+
+def enqueue_bulk_mail(
+    kind, subject, message, recipients, from_email=None, requested_by=None
+):
+    """
+    テンプレートを受信者ごとに展開し、まとめて送信キューに登録
+    recipients: [{"email": ..., "context": {...}}]（テンプレートでは email とコンテキストの値を参照できる）
+    戻り値: (一括送信ID, 登録した件数)
+    """
+    subject_template = compile_template(subject)
+    message_template = compile_template(message)
+    from_email = from_email or settings.DEFAULT_FROM_EMAIL
+    batch_id = uuid.uuid4()
+
+    mails = []
+    seen = set()
+    for recipient in recipients:
+        email = recipient["email"]
+        # 同じアドレスには1通だけ送る
+        if email in seen:
+            continue
+        seen.add(email)
+        context = Context({**recipient.get("context", {}), "email": email})
+        mails.append(
+            OutgoingMail(
+                kind=kind,
+                batch_id=batch_id,
+                requested_by=requested_by,
+                # 件名に改行が含まれるとヘッダーが不正になるため、1行にまとめる
+                subject=" ".join(subject_template.render(context).split()),
+                body=message_template.render(context),
+                from_email=from_email,
+                recipients=[email],
+            )
+        )
+    OutgoingMail.objects.bulk_create(
+        mails, batch_size=_options()["BULK_CREATE_BATCH_SIZE"]
+    )
+    return batch_id, len(mails)
+
+
+def batch_summary(batch_id):
+    """一括送信の状態ごとの件数"""
+    counts = dict(
+        OutgoingMail.objects.filter(batch_id=batch_id)
+        .values_list("status")
+        .annotate(count=Count("id"))
+        .order_by()
+    )
+    return {
+        mail_status: counts.get(mail_status, 0)
+        for mail_status in OutgoingMailStatus.values
+    }
+
+
+def retry_delay(attempts):
+    """attempts 回目の送信に失敗した後、再送までの秒数"""
+    return min(
+        _options()["RETRY_BACKOFF"] * 2 ** (attempts - 1), _options()["MAX_BACKOFF"]
+    )
+
+
+def claim_batch(batch_size):
+    """
+    送信対象のメールを取得し、送信中にする
+    複数のワーカーが同じメールを送信しないよう、行ロックを取得できたものだけを対象にする
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        mails = list(
+            OutgoingMail.objects.select_for_update(skip_locked=True)
+            .filter(
+                status__in=[OutgoingMailStatus.PENDING, OutgoingMailStatus.SENDING],
+                next_attempt_at__lte=now,
+            )
+            .order_by("next_attempt_at", "id")[:batch_size]
+        )
+        for mail in mails:
+            mail.status = OutgoingMailStatus.SENDING
+            mail.attempts += 1
+            mail.next_attempt_at = now + timedelta(
+                seconds=_options()["SENDING_TIMEOUT"]
+            )
+        OutgoingMail.objects.bulk_update(
+            mails, ["status", "attempts", "next_attempt_at"]
+        )
+    return mails
+
+
+def _build_message(mail, connection):
+    """送信するメール（送信を取りやめる場合は None）"""
+    body = mail.body
+    builder = _message_builders.get(mail.kind)
+    if builder is not None:
+        body = builder(mail)
+        if body is None:
+            return None
+    return EmailMessage(
+        mail.subject, body, mail.from_email, mail.recipients, connection=connection
+    )
+
+
+def send_batch(mails):
+    """取得したメールを1つの接続で送信し、結果を記録"""
+    results = {"sent": 0, "retried": 0, "failed": 0}
+    if not mails:
+        return results
+
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+        for mail in mails:
+            try:
+                with observe_mail_send(mail.kind):
+                    message = _build_message(mail, connection)
+                    if message is not None:
+                        connection.send_messages([message])
+            except Exception as e:
+                logger.error(
+                    f"Failed to send mail {mail.id} (attempt {mail.attempts}): {str(e)}"
+                )
+                mail.last_error = str(e)
+                if mail.attempts >= _options()["MAX_ATTEMPTS"]:
+                    mail.status = OutgoingMailStatus.FAILED
+                    results["failed"] += 1
+                else:
+                    mail.status = OutgoingMailStatus.PENDING
+                    mail.next_attempt_at = timezone.now() + timedelta(
+                        seconds=retry_delay(mail.attempts)
+                    )
+                    results["retried"] += 1
+            else:
+                if message is None:
+                    # 送信の対象でなくなったメール（宛先のアカウントの削除など）は再送しない
+                    mail.status = OutgoingMailStatus.FAILED
+                    mail.last_error = "cancelled"
+                    results["failed"] += 1
+                    continue
+                mail.status = OutgoingMailStatus.SENT
+                mail.sent_at = timezone.now()
+                results["sent"] += 1
+    finally:
+        connection.close()
+        # 送信できなかったメール（接続の失敗など）も含めて結果を記録する
+        for mail in mails:
+            if mail.status == OutgoingMailStatus.SENDING:
+                mail.status = OutgoingMailStatus.PENDING
+                mail.next_attempt_at = timezone.now() + timedelta(
+                    seconds=retry_delay(mail.attempts)
+                )
+        OutgoingMail.objects.bulk_update(
+            mails, ["status", "next_attempt_at", "last_error", "sent_at"]
+        )
+    return results
+
+
+def process_outbox(batch_size=None):
+    """送信対象のメールを1バッチ分送信（送信対象がない場合は None）"""
+    mails = claim_batch(batch_size or _options()["BATCH_SIZE"])
+    if not mails:
+        return None
+    return send_batch(mails)
@@ -1,7 +1,60 @@
+from django.conf import settings
+from django.template import TemplateSyntaxError
 from rest_framework import serializers
 
+from mail_templates.outbox import compile_template
+from shared.models import Account
+
 
 class SendMailSerializer(serializers.Serializer):
     recipient_email = serializers.EmailField(help_text="受信者のメールアドレス")
     subject = serializers.CharField(max_length=255, help_text="メールの件名")
     message = serializers.CharField(help_text="メールの本文")
+
+
+class BulkMailRecipientSerializer(serializers.Serializer):
+    email = serializers.EmailField(help_text="受信者のメールアドレス")
+    context = serializers.DictField(
+        required=False, default=dict, help_text="テンプレートに渡す値"
+    )
+
+
+class BulkSendMailSerializer(serializers.Serializer):
+    subject = serializers.CharField(
+        max_length=255, help_text="メールの件名（テンプレート）"
+    )
+    message = serializers.CharField(help_text="メールの本文（テンプレート）")
+    recipients = BulkMailRecipientSerializer(
+        many=True,
+        allow_empty=False,
+        max_length=settings.MAIL_OUTBOX["BULK_MAX_RECIPIENTS"],
+        help_text="受信者",
+    )
+
+    def _validate_template(self, value):
+        try:
+            compile_template(value)
+        except TemplateSyntaxError as e:
+            raise serializers.ValidationError(f"テンプレートの構文が不正です: {str(e)}")
+        return value
+
+    def validate_subject(self, value):
+        return self._validate_template(value)
+
+    def validate_message(self, value):
+        return self._validate_template(value)
+
+    def validate_recipients(self, value):
+        # 一括送信はアカウント宛てのお知らせのみのため、登録済み（削除されていない）アカウントにのみ送る
+        emails = {recipient["email"] for recipient in value}
+        registered = set(
+            Account.objects.filter(
+                email__in=emails, deleted_at__isnull=True
+            ).values_list("email", flat=True)
+        )
+        unknown = emails - registered
+        if unknown:
+            raise serializers.ValidationError(
+                f"登録されていないメールアドレスが含まれています（{len(unknown)}件）"
+            )
+        return value
@@ -1,17 +1,35 @@
 # tests.py
 
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
 from django.core import mail
+from django.core.cache import cache
+from django.core.mail import get_connection
+from django.core.management import call_command
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.utils import timezone
 from django_hosts.resolvers import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
 from shared.models import Account
 from django.contrib.auth.hashers import make_password
+from mail_templates.models import OutgoingMail, OutgoingMailStatus
+from mail_templates.outbox import (
+    enqueue_bulk_mail,
+    enqueue_mail,
+    process_outbox,
+    retry_delay,
+)
+from npi.testing import PerformanceBudgetMixin
 
 
 class SendMailViewTests(APITestCase):
     def setUp(self):
         # テスト用のAPIエンドポイントURLを設定
-        self.url = reverse("send-mail", host='user_app')
+        self.url = reverse("send-mail", host="user_app")
         self.valid_payload = {
             "recipient_email": "test@example.com",
             "subject": "Test Subject",
@@ -23,7 +41,7 @@ class SendMailViewTests(APITestCase):
             "message": "This is a test message.",
         }
 
-        self.login_url = reverse("login", host='user_app')
+        self.login_url = reverse("login", host="user_app")
         # テスト用ユーザーを作成
         self.account1 = Account.objects.create(
             email="test@example.com",
@@ -45,14 +63,22 @@ class SendMailViewTests(APITestCase):
         """メール送信が正常に行われることを確認する"""
         response = self.client.post(self.url, data=self.valid_payload, format="json")
 
-        # ステータスコードが200であることを確認
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # ステータスコードが202であることを確認
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(
+            response.json().get("message"), "メールの送信を受け付けました。"
+        )
+
+        # リクエスト中には送信されず、送信キューに登録されていることを確認
+        self.assertEqual(len(mail.outbox), 0)
         self.assertEqual(
-            response.json().get("message"), "メールが正常に送信されました。"
+            OutgoingMail.objects.filter(status=OutgoingMailStatus.PENDING).count(), 1
         )
 
-        # メールが1通送信されていることを確認
+        # ワーカーの処理でメールが1通送信されていることを確認
+        self.assertEqual(process_outbox(), {"sent": 1, "retried": 0, "failed": 0})
         self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(OutgoingMail.objects.get().status, OutgoingMailStatus.SENT)
 
         # メールの内容を確認
         sent_mail = mail.outbox[0]
@@ -69,3 +95,280 @@ class SendMailViewTests(APITestCase):
 
         # メールが送信されていないことを確認
         self.assertEqual(len(mail.outbox), 0)
+        self.assertFalse(OutgoingMail.objects.exists())
+
+
+class OutboxTests(TestCase):
+    def setUp(self):
+        self.mail = enqueue_mail(
+            "send_mail", "Test Subject", "This is a test message.", ["test@example.com"]
+        )
+
+    def test_retry_with_backoff(self):
+        """送信に失敗した場合は、間隔を空けて再送すること"""
+        with mock.patch(
+            "django.core.mail.backends.locmem.EmailBackend.send_messages",
+            side_effect=ConnectionError("SES timeout"),
+        ):
+            self.assertEqual(process_outbox(), {"sent": 0, "retried": 1, "failed": 0})
+
+        self.mail.refresh_from_db()
+        self.assertEqual(self.mail.status, OutgoingMailStatus.PENDING)
+        self.assertEqual(self.mail.attempts, 1)
+        self.assertEqual(self.mail.last_error, "SES timeout")
+        self.assertGreater(
+            self.mail.next_attempt_at,
+            timezone.now() + timedelta(seconds=retry_delay(1) - 5),
+        )
+
+        # 再送の日時になるまでは送信しない
+        self.assertIsNone(process_outbox())
+
+        OutgoingMail.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(process_outbox(), {"sent": 1, "retried": 0, "failed": 0})
+        self.assertEqual(len(mail.outbox), 1)
+
+    @override_settings(MAIL_OUTBOX={**settings.MAIL_OUTBOX, "MAX_ATTEMPTS": 2})
+    def test_failed_after_max_attempts(self):
+        """試行回数の上限まで失敗した場合は送信失敗とすること"""
+        with mock.patch(
+            "django.core.mail.backends.locmem.EmailBackend.send_messages",
+            side_effect=ConnectionError("SES timeout"),
+        ):
+            process_outbox()
+            OutgoingMail.objects.update(next_attempt_at=timezone.now())
+            self.assertEqual(process_outbox(), {"sent": 0, "retried": 0, "failed": 1})
+
+        self.mail.refresh_from_db()
+        self.assertEqual(self.mail.status, OutgoingMailStatus.FAILED)
+        self.assertEqual(self.mail.attempts, 2)
+        self.assertIsNone(process_outbox())
+
+    def test_stale_sending_mail_is_retried(self):
+        """送信中のままワーカーが停止したメールは、一定時間後に再送すること"""
+        OutgoingMail.objects.update(
+            status=OutgoingMailStatus.SENDING,
+            next_attempt_at=timezone.now() - timedelta(seconds=1),
+        )
+        self.assertEqual(process_outbox(), {"sent": 1, "retried": 0, "failed": 0})
+
+    def test_send_queued_mail_command(self):
+        """ワーカーのコマンドで送信キューのメールが送信されること"""
+        enqueue_mail("send_mail", "Second", "Second message.", ["second@example.com"])
+        stdout = StringIO()
+        call_command("send_queued_mail", "--once", "--batch-size", "1", stdout=stdout)
+
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(stdout.getvalue().count("sent=1"), 2)
+        self.assertFalse(
+            OutgoingMail.objects.exclude(status=OutgoingMailStatus.SENT).exists()
+        )
+
+
+class BulkSendMailViewTests(APITestCase):
+    def setUp(self):
+        self.url = reverse("send-mail-bulk", host="user_app")
+        # 呼び出し回数の制限の記録を消しておく
+        cache.clear()
+        self.account1 = Account.objects.create(
+            email="sender@example.com",
+            password=make_password("securepassword1"),
+            name="Sender",
+            is_staff=True,
+        )
+        # 受信者は登録済みのアカウントに限る
+        Account.objects.bulk_create(
+            Account(
+                email=f"user{i}@example.com",
+                password=make_password("securepassword1"),
+                name=f"User {i}",
+            )
+            for i in range(5)
+        )
+        login_response = self.client.post(
+            reverse("login", host="user_app"),
+            {"email": "sender@example.com", "password": "securepassword1"},
+        )
+        self.assertEqual(login_response.status_code, status.HTTP_200_OK)
+        self.client.cookies["access_token"] = login_response.cookies.get(
+            "access_token"
+        ).value
+
+        self.payload = {
+            "subject": "{{ name }}様へのお知らせ",
+            "message": "{{ name }}様\n{{ email }} 宛のお知らせです。<b>",
+            "recipients": [
+                {"email": f"user{i}@example.com", "context": {"name": f"User {i}"}}
+                for i in range(5)
+            ],
+        }
+
+    def test_bulk_send(self):
+        """テンプレートを受信者ごとに展開し、1つの接続でまとめて送信すること"""
+        response = self.client.post(self.url, data=self.payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data["queued"], 5)
+        self.assertEqual(len(mail.outbox), 0)
+
+        with mock.patch(
+            "mail_templates.outbox.get_connection", wraps=get_connection
+        ) as connection:
+            self.assertEqual(process_outbox(), {"sent": 5, "retried": 0, "failed": 0})
+        connection.assert_called_once()
+
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(mail.outbox[0].subject, "User 0様へのお知らせ")
+        # テキストのため、HTMLのエスケープは行わない
+        self.assertEqual(
+            mail.outbox[0].body, "User 0様\nuser0@example.com 宛のお知らせです。<b>"
+        )
+        self.assertEqual(mail.outbox[4].to, ["user4@example.com"])
+
+        # 受信者ごとの送信結果
+        status_url = reverse(
+            "send-mail-bulk-status",
+            kwargs={"batch_id": response.data["batch_id"]},
+            host="user_app",
+        )
+        status_response = self.client.get(status_url, {"page": 1, "per_page": 10})
+        self.assertEqual(status_response.status_code, status.HTTP_200_OK)
+        self.assertEqual(status_response.data["summary"]["sent"], 5)
+        self.assertEqual(
+            [(row["email"], row["status"]) for row in status_response.data["data"]],
+            [(f"user{i}@example.com", "sent") for i in range(5)],
+        )
+
+    def test_bulk_send_duplicate_recipients(self):
+        """同じアドレスには1通だけ送ること"""
+        self.payload["recipients"].append({"email": "user0@example.com"})
+        response = self.client.post(self.url, data=self.payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data["queued"], 5)
+
+    def test_bulk_send_invalid_template(self):
+        """テンプレートの構文が不正な場合は400エラーを返すこと"""
+        self.payload["message"] = "{% if %}"
+        response = self.client.post(self.url, data=self.payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("message", response.data)
+        self.assertFalse(OutgoingMail.objects.exists())
+
+    def test_bulk_send_not_staff(self):
+        """運用担当者でない場合は403エラーを返し、送信キューに登録しないこと"""
+        self.account1.is_staff = False
+        self.account1.save(update_fields=["is_staff"])
+        response = self.client.post(self.url, data=self.payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(OutgoingMail.objects.exists())
+
+    def test_bulk_send_unknown_recipient(self):
+        """登録されていない（削除済みを含む）アドレスが含まれる場合は400エラーを返すこと"""
+        Account.objects.filter(email="user4@example.com").update(
+            deleted_at=timezone.now()
+        )
+        response = self.client.post(self.url, data=self.payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("recipients", response.data)
+
+        self.payload["recipients"] = [{"email": "stranger@example.com"}]
+        response = self.client.post(self.url, data=self.payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(OutgoingMail.objects.exists())
+
+    @override_settings(MAIL_OUTBOX={**settings.MAIL_OUTBOX, "BULK_RATE": "1/hour"})
+    def test_bulk_send_rate_limit(self):
+        """アカウントごとの呼び出し回数の上限を超えた場合は429エラーを返すこと"""
+        response = self.client.post(self.url, data=self.payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+
+        response = self.client.post(self.url, data=self.payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response.data["error"]["code"], "TOO_MANY_REQUESTS")
+        self.assertIn("Retry-After", response)
+        self.assertEqual(OutgoingMail.objects.count(), 5)
+
+    def test_bulk_send_unauthenticated(self):
+        """未ログインの場合は401エラーを返すこと"""
+        self.client.cookies.clear()
+        response = self.client.post(self.url, data=self.payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_bulk_status_other_account(self):
+        """他のアカウントの一括送信は参照できないこと"""
+        batch_id, _ = enqueue_bulk_mail(
+            "bulk", "Subject", "Message", [{"email": "user@example.com"}]
+        )
+        status_url = reverse(
+            "send-mail-bulk-status", kwargs={"batch_id": batch_id}, host="user_app"
+        )
+        response = self.client.get(status_url, {"page": 1, "per_page": 10})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class MailPerformanceBudgetTests(PerformanceBudgetMixin, APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.account1 = Account.objects.create(
+            email="sender@example.com",
+            password=make_password("securepassword1"),
+            name="Sender",
+            is_staff=True,
+        )
+        Account.objects.bulk_create(
+            Account(
+                email=f"user{i}@example.com",
+                password=make_password("securepassword1"),
+                name=f"User {i}",
+            )
+            for i in range(5)
+        )
+        login_response = self.client.post(
+            reverse("login", host="user_app"),
+            {"email": "sender@example.com", "password": "securepassword1"},
+        )
+        self.assertEqual(login_response.status_code, status.HTTP_200_OK)
+        self.client.cookies["access_token"] = login_response.cookies.get(
+            "access_token"
+        ).value
+
+    def test_send_mail_budget(self):
+        """メール送信の受け付けが予算内に収まること"""
+        data = {
+            "recipient_email": "test@example.com",
+            "subject": "Subject",
+            "message": "Message",
+        }
+        response = self.assertWithinBudget(
+            "post", reverse("send-mail", host="user_app"), data, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+
+    def test_bulk_send_budget(self):
+        """一括送信の受け付けが、受信者数によらず予算内に収まること"""
+        data = {
+            "subject": "{{ name }}様へのお知らせ",
+            "message": "{{ name }}様",
+            "recipients": [
+                {"email": f"user{i}@example.com", "context": {"name": f"User {i}"}}
+                for i in range(5)
+            ],
+        }
+        response = self.assertWithinBudget(
+            "post", reverse("send-mail-bulk", host="user_app"), data, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+
+    def test_bulk_status_budget(self):
+        """一括送信の送信結果の取得が予算内に収まること"""
+        batch_id, _ = enqueue_bulk_mail(
+            "bulk",
+            "Subject",
+            "Message",
+            [{"email": f"user{i}@example.com"} for i in range(5)],
+            requested_by=self.account1,
+        )
+        url = reverse(
+            "send-mail-bulk-status", kwargs={"batch_id": batch_id}, host="user_app"
+        )
+        response = self.assertWithinBudget("get", url, {"page": 1, "per_page": 10})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -1,16 +1,29 @@
 # views.py
 
+import math
+
 from django.conf import settings
-from django.core.mail import send_mail
 from rest_framework import status
+from rest_framework.exceptions import Throttled
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.throttling import UserRateThrottle
 from rest_framework.views import APIView
 
-from mail_templates.serializers import SendMailSerializer
+from mail_templates.models import OutgoingMail
+from mail_templates.outbox import batch_summary, enqueue_bulk_mail, enqueue_mail
+from mail_templates.serializers import BulkSendMailSerializer, SendMailSerializer
+from npi.permissions import IsStaffAccount
+from npi.utils import ERROR_MESSAGES, get_paginator, list_params_error
 
 
 class SendMailView(APIView):
     authentication_classes = []
+    # 性能の予算（npi.testing）
+    performance_budgets = {
+        # 送信キューへの登録
+        "POST": {"queries": 1, "db_time": 0.05, "wall_time": 0.5},
+    }
 
     def post(self, request):
         serializer = SendMailSerializer(data=request.data)
@@ -20,24 +33,119 @@ class SendMailView(APIView):
             subject = serializer.validated_data["subject"]
             message = serializer.validated_data["message"]
 
-            # メール送信
-            try:
-                send_mail(
-                    subject,
-                    message,
-                    sender_email,
-                    [recipient_email],
-                    fail_silently=False,
-                )
-                return Response(
-                    {"message": "メールが正常に送信されました。"},
-                    status=status.HTTP_200_OK,
-                )
-            except Exception as e:
-                return Response(
-                    {"error": f"メールの送信に失敗しました: {str(e)}"},
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                )
+            # 送信キューに登録（送信はワーカーが行う）
+            enqueue_mail(
+                "send_mail",
+                subject,
+                message,
+                [recipient_email],
+                from_email=sender_email,
+            )
+            return Response(
+                {"message": "メールの送信を受け付けました。"},
+                status=status.HTTP_202_ACCEPTED,
+            )
 
         # バリデーションエラー
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class BulkMailRateThrottle(UserRateThrottle):
+    """一括送信APIのアカウントごとの呼び出し回数の制限（MAIL_OUTBOX["BULK_RATE"]）"""
+
+    scope = "bulk_mail"
+
+    def get_rate(self):
+        return settings.MAIL_OUTBOX["BULK_RATE"]
+
+
+class BulkSendMailView(APIView):
+    """テンプレートを受信者ごとに展開して一括送信する（送信はワーカーが行う）"""
+
+    # 運用担当者のみ利用できる
+    permission_classes = (IsAuthenticated, IsStaffAccount)
+    # アカウントごとの呼び出し回数を制限する
+    throttle_classes = (BulkMailRateThrottle,)
+    # 性能の予算（npi.testing）
+    performance_budgets = {
+        # アカウント（キャッシュがない場合。運用担当者かどうかも含む） + 受信者の存在チェック
+        # + 送信キューへの登録（MAIL_OUTBOX["BULK_CREATE_BATCH_SIZE"] 件ごとに1回）
+        "POST": {"queries": 3, "db_time": 0.05, "wall_time": 0.5},
+    }
+
+    def throttled(self, request, wait):
+        # 共通のエラー形式で返す（待ち時間は Retry-After ヘッダーで返す）
+        exc = Throttled(detail=ERROR_MESSAGES["429_ERRORS"])
+        exc.wait = math.ceil(wait) if wait is not None else None
+        raise exc
+
+    def post(self, request):
+        serializer = BulkSendMailSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        batch_id, queued = enqueue_bulk_mail(
+            "bulk",
+            serializer.validated_data["subject"],
+            serializer.validated_data["message"],
+            serializer.validated_data["recipients"],
+            requested_by=request.user,
+        )
+        return Response(
+            {
+                "message": "メールの送信を受け付けました。",
+                "batch_id": str(batch_id),
+                "queued": queued,
+            },
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+
+class BulkSendMailStatusView(APIView):
+    """一括送信の状態ごとの件数と、受信者ごとの送信結果"""
+
+    # 認証が必要
+    permission_classes = (IsAuthenticated,)
+    # キーセット方式のページネーション（pagination=cursor）で指定できる並び順
+    orderings = {"id": ("id",)}
+    # 性能の予算（npi.testing）
+    performance_budgets = {
+        # アカウント（キャッシュがない場合） + 一覧 + 状態ごとの件数
+        "GET": {"queries": 3, "db_time": 0.05, "wall_time": 0.5},
+    }
+
+    def get(self, request, batch_id):
+        # 必須チェック
+        error = list_params_error(request)
+        if error is not None:
+            return error
+
+        # 依頼者本人の一括送信のみ参照できる
+        mails = (
+            OutgoingMail.objects.filter(
+                batch_id=batch_id, requested_by_id=request.user.id
+            )
+            .order_by("id")
+            .values("id", "recipients", "status", "attempts", "last_error", "sent_at")
+        )
+        paginator = get_paginator(request, self.orderings)
+        page = paginator.paginate_queryset(mails, request)
+        if not page:
+            return Response(
+                ERROR_MESSAGES["404_ERRORS"], status=status.HTTP_404_NOT_FOUND
+            )
+
+        response = paginator.get_paginated_response(
+            [
+                {
+                    "email": mail["recipients"][0],
+                    "status": mail["status"],
+                    "attempts": mail["attempts"],
+                    "last_error": mail["last_error"],
+                    "sent_at": mail["sent_at"],
+                }
+                for mail in page
+            ]
+        )
+        response.data["summary"] = batch_summary(batch_id)
+        return response
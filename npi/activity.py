@@ -0,0 +1,296 @@
+"""
+アカウントの利用状況（最終ログイン日時・最終利用日時）の更新
+
+認証のたびに呼ばれる処理でアカウントの行全体を保存すると、変更していない列（パスワードなど）まで
+書き込むことになるため、更新する列だけを指定した UPDATE を発行する。
+
+ログイン・トークンの更新時の日時の記録は ACCOUNT_ACTIVITY["DURABILITY"] で書き込み方を選ぶ。
+
+- sync（既定）: リクエストの中で書き込む。ただし ACCOUNT_ACTIVITY["TOUCH_INTERVAL"] 秒に1回だけ更新する
+  （前回の更新からその秒数が経っていない場合は書き込まない）
+- buffered（明示的に指定した場合のみ）: プロセス内に溜めておき、ACCOUNT_ACTIVITY["FLUSH_INTERVAL"] 秒ごと（溜まった件数が
+  ["MAX_PENDING"] に達した場合はその時点）にバックグラウンドのスレッドがまとめて書き込む。
+  ワーカーの終了時（gunicorn の worker_exit・プロセスの終了時）には残りを書き込むため、
+  通常の停止では失われないが、異常終了した場合は最大 FLUSH_INTERVAL 秒分の記録が失われる
+"""
+
+import atexit
+import logging
+import os
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, connections, transaction
+from django.db.models import DateTimeField, F, Q, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils.timezone import localtime, now
+
+from npi.principals import SNAPSHOT_FIELDS, get_principal_cache
+from shared.models import Account
+
+# ロガーの設定
+logger = logging.getLogger(__name__)
+
+DURABILITY_SYNC = "sync"
+DURABILITY_BUFFERED = "buffered"
+
+# 記録する列（ログイン時はすべて、トークンの更新時は最終利用日時のみ）
+ACTIVITY_FIELDS = ("last_login_at", "last_active_at")
+REFRESH_FIELDS = ("last_active_at",)
+
+# UPDATE ... FROM (VALUES ...) の1文あたりの件数
+WRITE_BATCH_SIZE = 500
+
+
+def update_account(account, **values):
+    """
+    アカウントの指定の列だけを更新
+    保存時のシグナルで認証済みユーザーのキャッシュも無効化される
+    """
+    for field, value in values.items():
+        setattr(account, field, value)
+    account.save(update_fields=list(values))
+
+
+def _invalidate_principals(account_ids, fields):
+    # 認証済みユーザーのキャッシュに含まれる列を更新した場合のみ無効化する
+    if not any(field in SNAPSHOT_FIELDS for field in fields):
+        return
+    cache = get_principal_cache()
+    for account_id in account_ids:
+        cache.invalidate(account_id)
+
+
+def touch_activity(account, fields, at=None):
+    """
+    利用状況の列をリクエストの中で更新（更新した場合は True）
+    前回の更新から TOUCH_INTERVAL 秒が経っていない列は更新しない
+    """
+    at = at or localtime(now())
+    threshold = at - timedelta(seconds=settings.ACCOUNT_ACTIVITY["TOUCH_INTERVAL"])
+    # 読み込んでいない列（認証済みユーザーのキャッシュから復元した場合など）は更新の要否をDBで判定する
+    deferred = account.get_deferred_fields()
+    due = [
+        field
+        for field in fields
+        if field in deferred
+        or getattr(account, field) is None
+        or getattr(account, field) <= threshold
+    ]
+    if not due:
+        return False
+
+    # 同時にログインした他のリクエストが更新済みの場合も書き込まないよう、条件付きで更新する
+    condition = Q()
+    for field in due:
+        condition |= Q(**{f"{field}__isnull": True}) | Q(**{f"{field}__lte": threshold})
+    updated = (
+        Account.objects.filter(pk=account.pk)
+        .filter(condition)
+        .update(**{field: at for field in due})
+    )
+    if not updated:
+        return False
+    for field in due:
+        setattr(account, field, at)
+    # QuerySet.update は保存時のシグナルを送らないため、キャッシュはここで無効化する
+    _invalidate_principals([account.pk], due)
+    return True
+
+
+def _write_with_values(rows):
+    # PostgreSQL: UPDATE ... FROM (VALUES ...) で1文にまとめて更新する
+    quote = connection.ops.quote_name
+    columns = [Account._meta.get_field(field).column for field in ACTIVITY_FIELDS]
+    assignments = ", ".join(
+        f"{quote(column)} = GREATEST(a.{quote(column)}, v.{quote(column)})"
+        for column in columns
+    )
+    placeholders = "(%s::bigint" + ", %s::timestamptz" * len(columns) + ")"
+    for start in range(0, len(rows), WRITE_BATCH_SIZE):
+        batch = rows[start : start + WRITE_BATCH_SIZE]
+        sql = (
+            f"UPDATE {quote(Account._meta.db_table)} AS a SET {assignments} "
+            f"FROM (VALUES {', '.join([placeholders] * len(batch))}) "
+            f"AS v(id, {', '.join(quote(column) for column in columns)}) "
+            f"WHERE a.{quote(Account._meta.pk.column)} = v.id"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [value for row in batch for value in row])
+
+
+def _write_each(rows):
+    # PostgreSQL 以外（テストの SQLite など）: アカウントごとに更新する
+    with transaction.atomic():
+        for account_id, *values in rows:
+            updates = {}
+            for field, value in zip(ACTIVITY_FIELDS, values):
+                if value is None:
+                    continue
+                value = Value(value, output_field=DateTimeField())
+                # 既存の値より新しい場合のみ更新する（NULL の場合は記録した値）
+                updates[field] = Coalesce(Greatest(F(field), value), value)
+            if updates:
+                Account.objects.filter(pk=account_id).update(**updates)
+
+
+def write_activity(pending):
+    """
+    溜めておいた利用状況をまとめてDBに書き込む
+    pending: {アカウントID: {列: 日時}}（既存の値より新しい場合のみ更新する）
+    """
+    if not pending:
+        return
+    # 複数のワーカーが同時に書き込んでもデッドロックしないよう、行の順序を揃える
+    rows = [
+        (account_id, *(values.get(field) for field in ACTIVITY_FIELDS))
+        for account_id, values in sorted(pending.items())
+    ]
+    if connection.vendor == "postgresql":
+        _write_with_values(rows)
+    else:
+        _write_each(rows)
+    for account_id, values in pending.items():
+        _invalidate_principals([account_id], values)
+
+
+class ActivityBuffer:
+    """利用状況をプロセス内に溜め、バックグラウンドのスレッドでまとめて書き込む"""
+
+    def __init__(self, flush_interval=10, max_pending=1000):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    @classmethod
+    def from_settings(cls):
+        options = settings.ACCOUNT_ACTIVITY
+        return cls(
+            flush_interval=options.get("FLUSH_INTERVAL", 10),
+            max_pending=options.get("MAX_PENDING", 1000),
+        )
+
+    def __len__(self):
+        return len(self._pending)
+
+    def _merge(self, pending):
+        # 同じアカウント・列は新しい日時だけを残す
+        with self._lock:
+            for account_id, values in pending.items():
+                current = self._pending.setdefault(account_id, {})
+                for field, at in values.items():
+                    if current.get(field) is None or current[field] < at:
+                        current[field] = at
+            return len(self._pending)
+
+    def record(self, account_id, fields, at):
+        """利用状況を記録"""
+        size = self._merge({account_id: {field: at for field in fields}})
+        if size >= self.max_pending:
+            self._wakeup.set()
+
+    def flush(self):
+        """溜めておいた記録を書き込む（書き込んだアカウント数を返す）"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        try:
+            write_activity(pending)
+        except Exception:
+            # 書き込めなかった記録は戻し、次回の書き込みで再試行する
+            self._merge(pending)
+            raise
+        return len(pending)
+
+    def start(self):
+        """書き込み用のスレッドを起動（fork後のプロセスでは起動し直す）"""
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="account-activity-flusher", daemon=True
+            )
+            self._pid = os.getpid()
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            if self._stopped.is_set():
+                break
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Failed to write account activity: {str(e)}")
+            finally:
+                # スレッドのDB接続は保持しない（接続プールに返却する）
+                connections.close_all()
+
+    def shutdown(self):
+        """スレッドを停止し、残りの記録を呼び出し元のスレッドで書き込む"""
+        with self._lock:
+            thread = self._thread if self._pid == os.getpid() else None
+            self._thread = None
+        if thread is not None:
+            self._stopped.set()
+            self._wakeup.set()
+            thread.join()
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Failed to write account activity on shutdown: {str(e)}")
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_activity_buffer():
+    """プロセスで共有するバッファを取得（書き込み用のスレッドを起動する）"""
+    global _buffer
+    buffer = _buffer
+    if buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = ActivityBuffer.from_settings()
+                atexit.register(shutdown_activity_buffer)
+            buffer = _buffer
+    buffer.start()
+    return buffer
+
+
+def shutdown_activity_buffer():
+    """ワーカーの終了時に残りの記録を書き込む"""
+    global _buffer
+    with _buffer_lock:
+        buffer, _buffer = _buffer, None
+    if buffer is not None:
+        buffer.shutdown()
+
+
+def record_activity(account, fields, at=None):
+    """利用状況を記録（DURABILITY に応じてリクエストの中で書き込むか、バッファに溜める）"""
+    at = at or localtime(now())
+    if settings.ACCOUNT_ACTIVITY["DURABILITY"] == DURABILITY_BUFFERED:
+        get_activity_buffer().record(account.pk, fields, at)
+    else:
+        touch_activity(account, fields, at)
+
+
+def record_login(account, at=None):
+    """ログイン日時を記録"""
+    record_activity(account, ACTIVITY_FIELDS, at)
+
+
+def record_refresh(account, at=None):
+    """トークンの更新日時を記録"""
+    record_activity(account, REFRESH_FIELDS, at)
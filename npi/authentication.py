@@ -1,9 +1,12 @@
 from rest_framework_simplejwt.authentication import JWTAuthentication
-from rest_framework_simplejwt.tokens import AccessToken
 from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import SAFE_METHODS
 from shared.models import Account
 import logging
 from npi.utils import ERROR_MESSAGES
+from npi.principals import TokenPrincipal, get_principal_cache
+from npi.tokens import get_verified_token_cache
+from npi.instrumentation import timer
 
 # ロガーの設定
 logger = logging.getLogger(__name__)
@@ -12,21 +15,43 @@ logger = logging.getLogger(__name__)
 class CookieJWTAuthentication(JWTAuthentication):
 
     def authenticate(self, request):
-        # クッキーからアクセストークンを取得
-        access_token = request.COOKIES.get("access_token")
-        if not access_token:
-            logger.error("Access token not found in cookies")
-            raise AuthenticationFailed(ERROR_MESSAGES["401_ERRORS"])
+        # 認証の処理時間を計測（npi.middleware.RequestMetricsMiddleware）
+        with timer("auth"):
+            # クッキーからアクセストークンを取得
+            access_token = request.COOKIES.get("access_token")
+            if not access_token:
+                logger.error("Access token not found in cookies")
+                raise AuthenticationFailed(ERROR_MESSAGES["401_ERRORS"])
 
-        try:
-            # トークン検証
-            validated_token = AccessToken(access_token)
-            user = self.get_user(validated_token)
-            return (user, validated_token)
-        # トークン検証で例外が発生した場合（トークンの有効期限切れなど）
-        except Exception:
-            logger.error("An error occurred during access token validation.")
-            raise AuthenticationFailed(ERROR_MESSAGES["401_ERRORS"])
+            try:
+                # トークン検証（検証済みのトークンは署名検証を省略）
+                validated_token = get_verified_token_cache().get_access_token(
+                    access_token
+                )
+                user = self.get_user(validated_token)
+                return (user, validated_token)
+            # トークン検証で例外が発生した場合（トークンの有効期限切れなど）
+            except Exception:
+                logger.error("An error occurred during access token validation.")
+                raise AuthenticationFailed(ERROR_MESSAGES["401_ERRORS"])
+
+    async def aauthenticate(self, request):
+        """authenticate の非同期版（非同期ビューから呼び出される）"""
+        with timer("auth"):
+            access_token = request.COOKIES.get("access_token")
+            if not access_token:
+                logger.error("Access token not found in cookies")
+                raise AuthenticationFailed(ERROR_MESSAGES["401_ERRORS"])
+
+            try:
+                validated_token = get_verified_token_cache().get_access_token(
+                    access_token
+                )
+                user = await self.aget_user(validated_token)
+                return (user, validated_token)
+            except Exception:
+                logger.error("An error occurred during access token validation.")
+                raise AuthenticationFailed(ERROR_MESSAGES["401_ERRORS"])
 
     def get_user(self, validated_token):
         """トークンのユーザーを取得"""
@@ -35,8 +60,67 @@ class CookieJWTAuthentication(JWTAuthentication):
             logger.error("Token does not contain user_id")
             raise AuthenticationFailed(ERROR_MESSAGES["401_ERRORS"])
         try:
-            user = Account.objects.get(id=user_id)
+            # キャッシュ済みの場合はDBにアクセスしない
+            user = get_principal_cache().get_account(user_id)
+        except Account.DoesNotExist:
+            logger.error(f"User with ID {user_id} does not exist")
+            raise AuthenticationFailed(ERROR_MESSAGES["401_ERRORS"])
+        return self._check_active(user)
+
+    async def aget_user(self, validated_token):
+        """get_user の非同期版"""
+        user_id = validated_token.get("user_id")
+        if not user_id:
+            logger.error("Token does not contain user_id")
+            raise AuthenticationFailed(ERROR_MESSAGES["401_ERRORS"])
+        try:
+            user = await get_principal_cache().aget_account(user_id)
         except Account.DoesNotExist:
             logger.error(f"User with ID {user_id} does not exist")
             raise AuthenticationFailed(ERROR_MESSAGES["401_ERRORS"])
+        return self._check_active(user)
+
+    @staticmethod
+    def _check_active(user):
+        # 削除済みユーザーのトークンは、有効期限内でも認証しない
+        if user.deleted_at is not None:
+            logger.error(f"User with ID {user.id} is deleted")
+            raise AuthenticationFailed(ERROR_MESSAGES["401_ERRORS"])
         return user
+
+
+class CookieJWTStatelessAuthentication(CookieJWTAuthentication):
+    """
+    参照系（GETなど）のリクエストは、トークンのクレームのみでユーザーを生成する認証
+    request.user.id のみを参照するビュー向け（アカウントは参照時に取得する）
+    更新系のリクエストは、アカウントの存在・削除済みでないことを確認する（CookieJWTAuthentication と同じ）
+    """
+
+    def authenticate(self, request):
+        # 認証クラスはリクエストごとに生成されるため、リクエストのメソッドを保持しておく
+        self.claims_only = request.method in SAFE_METHODS
+        return super().authenticate(request)
+
+    async def aauthenticate(self, request):
+        """authenticate の非同期版"""
+        self.claims_only = request.method in SAFE_METHODS
+        return await super().aauthenticate(request)
+
+    def get_user(self, validated_token):
+        """トークンのクレームからユーザーを生成（更新系のリクエストはアカウントを取得）"""
+        if not getattr(self, "claims_only", False):
+            return super().get_user(validated_token)
+        user_id = validated_token.get("user_id")
+        if not user_id:
+            logger.error("Token does not contain user_id")
+            raise AuthenticationFailed(ERROR_MESSAGES["401_ERRORS"])
+        return TokenPrincipal(
+            user_id, validated_token.get("isTwoFactorAuthenticated", False)
+        )
+
+    async def aget_user(self, validated_token):
+        """get_user の非同期版"""
+        if not getattr(self, "claims_only", False):
+            return await super().aget_user(validated_token)
+        # クレームのみの場合はDBにアクセスしないためそのまま呼び出す
+        return self.get_user(validated_token)
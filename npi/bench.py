@@ -0,0 +1,227 @@
+"""
+user_app のAPIの負荷計測
+
+複数のクライアント（スレッド）から各APIを順に呼び出し、APIごとに
+スループット（RPS）・レイテンシのパーセンタイル・1リクエストあたりのクエリ数を集計する。
+
+- プロセス内: Djangoのテストクライアントでアプリを直接呼び出す（クエリ数も計測する）
+- HTTP: 起動済みのサーバー（manage.py serve など）にリクエストを送る（クエリ数は計測しない）
+"""
+
+import http.cookiejar
+import json
+import math
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from dataclasses import dataclass, field
+
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from shared.models import SpaceAccountPermission
+from shared.registry import PERM
+
+# user_app のホスト名（django-hosts でホストからURL設定を選ぶため）
+DEFAULT_HOST = "user-app.localhost"
+
+
+@dataclass
+class Target:
+    """計測に使うアカウントと、そのアカウントが参照できるスペース・プロジェクト"""
+
+    email: str
+    space_id: int
+    project_id: int
+
+
+@dataclass
+class EndpointResult:
+    name: str
+    latencies: list = field(default_factory=list)
+    queries: list = field(default_factory=list)
+    errors: int = 0
+    elapsed: float = 0.0
+
+    def summary(self):
+        latencies = sorted(self.latencies)
+        summary = {
+            "requests": len(latencies),
+            "errors": self.errors,
+            "rps": round(len(latencies) / self.elapsed, 2) if self.elapsed else None,
+            "p50_ms": _percentile(latencies, 50),
+            "p95_ms": _percentile(latencies, 95),
+            "p99_ms": _percentile(latencies, 99),
+        }
+        if self.queries:
+            summary["queries_per_request"] = round(
+                sum(self.queries) / len(self.queries), 2
+            )
+        return summary
+
+
+def _percentile(sorted_values, percent):
+    """最近傍順位法によるパーセンタイル（ミリ秒）"""
+    if not sorted_values:
+        return None
+    rank = max(math.ceil(len(sorted_values) * percent / 100), 1)
+    return round(sorted_values[rank - 1] * 1000, 2)
+
+
+def find_targets(limit):
+    """コンテンツ一覧まで参照できる（creator 権限を持つ）アカウントを取得"""
+    rows = (
+        SpaceAccountPermission.objects.filter(
+            deleted_at__isnull=True,
+            permission__name=PERM.creator,
+            permission__deleted_at__isnull=True,
+            space_account__deleted_at__isnull=True,
+            space_account__account__deleted_at__isnull=True,
+            space_account__space__deleted_at__isnull=True,
+            space_account__space__project__deleted_at__isnull=True,
+        )
+        .order_by("space_account__account_id")
+        .values_list(
+            "space_account__account__email",
+            "space_account__space_id",
+            "space_account__space__project__id",
+        )
+    )
+    targets = {}
+    for email, space_id, project_id in rows.iterator():
+        targets.setdefault(email, Target(email, space_id, project_id))
+        if len(targets) >= limit:
+            break
+    return list(targets.values())
+
+
+class InProcessClient:
+    """Djangoのテストクライアントでアプリを直接呼び出す"""
+
+    measures_queries = True
+
+    def __init__(self, host):
+        self.client = Client(HTTP_HOST=host)
+
+    def request(self, method, path, data=None):
+        with CaptureQueriesContext(connection) as context:
+            if method == "GET":
+                response = self.client.get(path, data)
+            else:
+                response = self.client.post(
+                    path, data or {}, content_type="application/json"
+                )
+        return response.status_code, len(context.captured_queries)
+
+
+class HttpClient:
+    """起動済みのサーバーにHTTPでリクエストを送る"""
+
+    measures_queries = False
+
+    def __init__(self, base_url, host):
+        self.base_url = base_url.rstrip("/")
+        self.host = host
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar())
+        )
+
+    def request(self, method, path, data=None):
+        url = self.base_url + path
+        body = None
+        if method == "GET" and data:
+            url += "?" + urllib.parse.urlencode(data)
+        elif method != "GET":
+            body = json.dumps(data or {}).encode()
+        request = urllib.request.Request(
+            url,
+            data=body,
+            method=method,
+            headers={"Host": self.host, "Content-Type": "application/json"},
+        )
+        try:
+            with self.opener.open(request) as response:
+                response.read()
+                return response.status, None
+        except urllib.error.HTTPError as error:
+            return error.code, None
+
+
+def endpoints(target, password, per_page):
+    """計測するAPI（名前, メソッド, パス, データ）"""
+    space_path = f"/spaces/{target.space_id}/projects/"
+    contents_path = f"{space_path}{target.project_id}/contents/"
+    page = {"page": 1, "per_page": per_page}
+    return [
+        ("login", "POST", "/login/", {"email": target.email, "password": password}),
+        ("refresh", "POST", "/refresh/", {"email": target.email}),
+        ("spaces", "GET", "/spaces/", page),
+        ("projects", "GET", space_path, page),
+        ("contents", "GET", contents_path, page),
+        ("announcements", "GET", "/announcements/announcements/", page),
+    ]
+
+
+def run_benchmark(
+    targets,
+    make_client,
+    password,
+    requests_per_client,
+    per_page=10,
+    log=lambda message: None,
+):
+    """
+    クライアントごとにログインしてから、APIを1つずつ全クライアントで同時に呼び出して計測する
+    targets の件数がクライアント（スレッド）数になる
+    """
+    clients = [make_client() for _ in targets]
+    plans = [endpoints(target, password, per_page) for target in targets]
+
+    # 計測前のログイン（以降のリクエストはログイン済みのCookieで送る）
+    for client, plan in zip(clients, plans):
+        status, _ = client.request(*plan[0][1:])
+        if status != 200:
+            raise RuntimeError(
+                f"ログインに失敗しました: {plan[0][3]['email']} ({status})"
+            )
+
+    results = {}
+    for index, (name, _, _, _) in enumerate(plans[0]):
+        result = EndpointResult(name)
+        lock = threading.Lock()
+        barrier = threading.Barrier(len(clients))
+
+        def worker(client, plan):
+            _, method, path, data = plan[index]
+            barrier.wait()
+            try:
+                for _ in range(requests_per_client):
+                    started_at = time.perf_counter()
+                    status, queries = client.request(method, path, data)
+                    latency = time.perf_counter() - started_at
+                    with lock:
+                        result.latencies.append(latency)
+                        if queries is not None:
+                            result.queries.append(queries)
+                        if status >= 400:
+                            result.errors += 1
+            finally:
+                # スレッドごとのDB接続を閉じる
+                connections.close_all()
+
+        threads = [
+            threading.Thread(target=worker, args=(client, plan))
+            for client, plan in zip(clients, plans)
+        ]
+        started_at = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        result.elapsed = time.perf_counter() - started_at
+        results[name] = result.summary()
+        log(f"{name}: {results[name]}")
+    return results
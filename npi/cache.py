@@ -0,0 +1,119 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import cache
+
+from npi.metrics import record_cache_access
+
+
+# キャッシュのバージョン管理
+# 名前空間ごとのバージョン番号をキーに含めることで、関連するキャッシュをまとめて無効化する
+def get_version(namespace):
+    """名前空間の現在のバージョンを取得"""
+    key = f"version:{namespace}"
+    version = cache.get(key)
+    if version is None:
+        # 未登録の場合は初期値を登録（他プロセスが先に登録していればそちらを優先）
+        cache.add(key, 1, timeout=None)
+        version = cache.get(key, 1)
+    return version
+
+
+def bump_version(namespace):
+    """名前空間のバージョンを進めて、既存のキャッシュを無効化する"""
+    key = f"version:{namespace}"
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # キーが存在しない場合
+        cache.set(key, 2, timeout=None)
+        return 2
+
+
+class CacheStats:
+    """
+    キャッシュのヒット/ミス数を集計する
+    name を指定した場合は、メトリクス（npi_cache_requests）にも記録する
+    """
+
+    def __init__(self, name=None):
+        self._lock = threading.Lock()
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+
+    def hit(self):
+        with self._lock:
+            self.hits += 1
+        if self.name:
+            record_cache_access(self.name, hit=True)
+
+    def miss(self):
+        with self._lock:
+            self.misses += 1
+        if self.name:
+            record_cache_access(self.name, hit=False)
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def snapshot(self):
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hit_rate}
+
+    def reset(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+
+class LRUCache:
+    """
+    有効期限付きのLRUキャッシュ（プロセス内）
+    max_sizeを超えた場合は最も古く参照されたものから破棄する
+    """
+
+    def __init__(self, max_size, ttl=None, name=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.stats = CacheStats(name)
+        self._lock = threading.Lock()
+        self._data = OrderedDict()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                value, expires_at = item
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.stats.hit()
+                    return value
+                # 有効期限切れ
+                del self._data[key]
+        self.stats.miss()
+        return default
+
+    def set(self, key, value, ttl=None):
+        if self.max_size <= 0:
+            return
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
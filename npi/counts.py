@@ -0,0 +1,117 @@
+"""
+一覧の件数（total_items）の取得方法
+
+- exact: 毎回 COUNT(*) を実行する
+- cached: COUNT(*) の結果を条件ごとにキャッシュする（対象のモデルの変更時に無効化）
+- estimate: 件数が多い場合は実行計画の推定行数を使う（PostgreSQLのみ。それ以外は cached と同じ）
+- none: 件数を取得せず、次のページの有無のみ返す
+
+cached / estimate の件数は実際と異なる場合があるため、total_items / total_pages の表示にのみ使う。
+ページの行は件数に関わらず LIMIT/OFFSET で取得する（npi.utils.CountingPaginator）。
+
+件数のキャッシュは一覧のモデル単位で無効化する。
+結合先のモデルの変更で件数が変わる場合は、その変更時にも invalidate_counts を呼ぶこと。
+"""
+
+import hashlib
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.db import connections
+from django.db.models import QuerySet
+
+from npi.cache import bump_version, get_version
+
+COUNT_EXACT = "exact"
+COUNT_CACHED = "cached"
+COUNT_ESTIMATE = "estimate"
+COUNT_NONE = "none"
+COUNT_STRATEGIES = (COUNT_EXACT, COUNT_CACHED, COUNT_ESTIMATE, COUNT_NONE)
+
+
+def _namespace(model):
+    return f"counts:{model._meta.label_lower}"
+
+
+def _cache_key(queryset):
+    """件数のキャッシュキー（モデルのバージョン + 条件のSQL）"""
+    # 並び順は件数に影響しないため、キーに含めない
+    sql, params = queryset.order_by().query.sql_with_params()
+    digest = hashlib.sha256(f"{queryset.db}:{sql}:{params!r}".encode()).hexdigest()
+    return f"{_namespace(queryset.model)}:{get_version(_namespace(queryset.model))}:{digest}"
+
+
+def invalidate_counts(model):
+    """モデルの変更時に、そのモデルの件数のキャッシュをまとめて無効化"""
+    bump_version(_namespace(model))
+
+
+def estimate_count(queryset):
+    """実行計画の推定行数を取得（PostgreSQL以外では None）"""
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def _options():
+    return settings.PAGINATION_COUNT
+
+
+def get_count(queryset, strategy):
+    """一覧の件数を指定の方法で取得"""
+    if not isinstance(queryset, QuerySet):
+        return len(queryset)
+    if strategy == COUNT_EXACT:
+        return queryset.count()
+
+    try:
+        key = _cache_key(queryset)
+    except EmptyResultSet:
+        # 条件から結果が空であることが分かる場合
+        return 0
+    count = cache.get(key)
+    if count is not None:
+        return count
+
+    count = estimate_count(queryset) if strategy == COUNT_ESTIMATE else None
+    # 推定値が小さい場合は誤差が目立つため、正確な件数を取得する
+    if count is None or count < _options()["ESTIMATE_THRESHOLD"]:
+        count = queryset.count()
+    cache.set(key, count, timeout=_options()["TIMEOUT"])
+    return count
+
+
+async def aget_count(queryset, strategy):
+    """get_count の非同期版"""
+    if not isinstance(queryset, QuerySet):
+        return len(queryset)
+    if strategy == COUNT_EXACT:
+        return await queryset.acount()
+
+    try:
+        key = _cache_key(queryset)
+    except EmptyResultSet:
+        return 0
+    count = await cache.aget(key)
+    if count is not None:
+        return count
+
+    count = (
+        await sync_to_async(estimate_count)(queryset)
+        if strategy == COUNT_ESTIMATE
+        else None
+    )
+    if count is None or count < _options()["ESTIMATE_THRESHOLD"]:
+        count = await queryset.acount()
+    await cache.aset(key, count, timeout=_options()["TIMEOUT"])
+    return count
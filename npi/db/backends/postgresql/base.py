@@ -0,0 +1,77 @@
+"""
+コネクションプール付きのPostgreSQLバックエンド
+
+DATABASES の ENGINE に "npi.db.backends.postgresql" を指定すると、
+リクエスト終了時にコネクションを切断せずプールに戻して再利用する。
+プールの設定は DATABASES の "POOL"（SIZE / MAX_OVERFLOW / RECYCLE / TIMEOUT）で指定する。
+"""
+
+import functools
+import os
+
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.psycopg_any import IsolationLevel, is_psycopg3
+
+from npi.db.pool import close_idle_connections, get_pool
+
+if not is_psycopg3:
+    import psycopg2.extras
+
+# ワーカーのfork前に、親プロセスの待機中のコネクションを切断しておく
+os.register_at_fork(before=close_idle_connections)
+
+
+def connect(conn_params, isolation_level=None):
+    """
+    プールに追加するコネクションを作成（base.DatabaseWrapper.get_new_connection の接続処理と同じ）
+    プールは同じプロセスのすべてのスレッドで共有するため、特定のスレッドの DatabaseWrapper を参照しない
+    """
+    connection = base.Database.connect(**conn_params)
+    if isolation_level is not None:
+        connection.isolation_level = isolation_level
+    if not is_psycopg3:
+        # JSONField の値を二重にデコードしないよう、jsonb の変換を無効にする（Django と同じ）
+        psycopg2.extras.register_default_jsonb(
+            conn_or_curs=connection, loads=lambda x: x
+        )
+    return connection
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def _configured_isolation_level(self):
+        # OPTIONS で指定された分離レベル（未指定の場合は None）
+        isolation_level = self.settings_dict["OPTIONS"].get("isolation_level")
+        return None if isolation_level is None else IsolationLevel(isolation_level)
+
+    def get_pool(self, conn_params):
+        options = self.settings_dict.get("POOL", {})
+        # テスト用データベースなど接続先が変わる場合に備え、接続先ごとにプールを分ける
+        key = (
+            conn_params.get("dbname") or conn_params.get("database"),
+            repr(sorted(conn_params.items())),
+        )
+        return get_pool(
+            key,
+            functools.partial(
+                connect, dict(conn_params), self._configured_isolation_level()
+            ),
+            size=options.get("SIZE", 5),
+            max_overflow=options.get("MAX_OVERFLOW", 5),
+            recycle=options.get("RECYCLE", 1800),
+            timeout=options.get("TIMEOUT", 10),
+        )
+
+    def get_new_connection(self, conn_params):
+        # プールから再利用する場合は接続処理を通らないため、分離レベルをここで設定しておく
+        self.isolation_level = (
+            self._configured_isolation_level() or IsolationLevel.READ_COMMITTED
+        )
+        self._pool = self.get_pool(conn_params)
+        return self._pool.acquire()
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                # 切断せずにプールへ戻す
+                return self._pool.release(self.connection)
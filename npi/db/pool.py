@@ -0,0 +1,167 @@
+import collections
+import logging
+import threading
+import time
+
+# ロガーの設定
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeout(Exception):
+    """コネクションの取得待ちがタイムアウトした"""
+
+
+class ConnectionPool:
+    """
+    プロセス内のDBコネクションプール
+    size までのコネクションを保持し、max_overflow までは一時的に追加で接続する
+    recycle 秒を超えたコネクションは破棄して接続し直す
+    """
+
+    def __init__(self, connect, size=5, max_overflow=5, recycle=1800, timeout=10):
+        self._connect = connect
+        self.size = size
+        self.max_overflow = max_overflow
+        self.recycle = recycle
+        self.timeout = timeout
+        self._condition = threading.Condition()
+        # 待機中のコネクション（後入れ先出し）
+        self._idle = collections.deque()
+        # コネクションの接続日時
+        self._connected_at = {}
+        self._checked_out = 0
+        self._counters = collections.Counter()
+
+    @property
+    def total(self):
+        return len(self._idle) + self._checked_out
+
+    def _is_expired(self, connection):
+        connected_at = self._connected_at.get(id(connection), 0)
+        return bool(self.recycle) and time.monotonic() - connected_at > self.recycle
+
+    def _discard(self, connection):
+        self._connected_at.pop(id(connection), None)
+        self._counters["discarded"] += 1
+        try:
+            connection.close()
+        except Exception as e:
+            logger.warning(f"Failed to close pooled connection: {str(e)}")
+
+    def acquire(self):
+        """コネクションを取得（空きがない場合は timeout 秒まで待つ）"""
+        deadline = time.monotonic() + self.timeout
+        with self._condition:
+            while True:
+                while self._idle:
+                    connection = self._idle.pop()
+                    if connection.closed or self._is_expired(connection):
+                        self._counters["recycled"] += 1
+                        self._discard(connection)
+                        continue
+                    self._checked_out += 1
+                    self._counters["reused"] += 1
+                    return connection
+
+                if self.total < self.size + self.max_overflow:
+                    # 接続はロックの外で行うため、先に枠を確保しておく
+                    self._checked_out += 1
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._counters["timeouts"] += 1
+                    raise PoolTimeout(
+                        f"Connection pool exhausted (size={self.size}, max_overflow={self.max_overflow})"
+                    )
+                self._counters["waits"] += 1
+                self._condition.wait(remaining)
+
+        try:
+            connection = self._connect()
+        except Exception:
+            with self._condition:
+                self._checked_out -= 1
+                self._condition.notify()
+            raise
+
+        with self._condition:
+            self._connected_at[id(connection)] = time.monotonic()
+            self._counters["created"] += 1
+        return connection
+
+    def _reset(self, connection):
+        """プールに戻す前にトランザクションを終了させる"""
+        if connection.closed:
+            return False
+        try:
+            if not connection.autocommit:
+                connection.rollback()
+            return True
+        except Exception:
+            return False
+
+    def release(self, connection):
+        """コネクションをプールに戻す（size を超える分は切断する）"""
+        reusable = self._reset(connection)
+        with self._condition:
+            self._checked_out -= 1
+            if (
+                reusable
+                and len(self._idle) < self.size
+                and not self._is_expired(connection)
+            ):
+                self._idle.append(connection)
+            else:
+                self._discard(connection)
+            self._condition.notify()
+
+    def close_idle(self):
+        """待機中のコネクションをすべて切断"""
+        with self._condition:
+            while self._idle:
+                self._discard(self._idle.pop())
+
+    def stats(self):
+        """プールの統計情報"""
+        with self._condition:
+            return {
+                "size": self.size,
+                "max_overflow": self.max_overflow,
+                "idle": len(self._idle),
+                "checked_out": self._checked_out,
+                "created": self._counters["created"],
+                "reused": self._counters["reused"],
+                "recycled": self._counters["recycled"],
+                "discarded": self._counters["discarded"],
+                "waits": self._counters["waits"],
+                "timeouts": self._counters["timeouts"],
+            }
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(key, connect, **options):
+    """接続先ごとのコネクションプールを取得（なければ作成）"""
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(connect, **options)
+        return pool
+
+
+def pool_stats():
+    """全コネクションプールの統計情報（接続先のデータベース名ごと）"""
+    with _pools_lock:
+        pools = list(_pools.items())
+    return {name: pool.stats() for (name, _), pool in pools}
+
+
+def close_idle_connections():
+    """全コネクションプールの待機中のコネクションを切断"""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close_idle()
@@ -0,0 +1,51 @@
+"""
+パスワードのハッシュ方式
+
+PASSWORD_HASHING["ITERATIONS"] で PBKDF2 の反復回数を変更できるようにし、
+実行環境（ECSタスクのCPU）に合わせて検証にかかる時間を調整する。
+反復回数を変更しても既存のハッシュはそのまま検証でき、ログインの成功時に新しい反復回数でハッシュし直す（shared.models.Account.check_password）。
+
+反復回数は manage.py calibrate_password_hashing で、目標の検証時間から算出できる。
+"""
+
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.utils.crypto import get_random_string
+
+
+class TunablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """反復回数を設定で変更できる PBKDF2（アルゴリズム名は Django 標準と同じ pbkdf2_sha256）"""
+
+    @property
+    def iterations(self):
+        return (
+            settings.PASSWORD_HASHING.get("ITERATIONS")
+            or PBKDF2PasswordHasher.iterations
+        )
+
+
+def measure_iterations(iterations, samples=5):
+    """指定の反復回数でのハッシュ計算の時間（秒、中央値）"""
+    hasher = TunablePBKDF2PasswordHasher()
+    password = get_random_string(16)
+    salt = hasher.salt()
+    durations = []
+    for _ in range(samples):
+        started_at = time.perf_counter()
+        hasher.encode(password, salt, iterations)
+        durations.append(time.perf_counter() - started_at)
+    return statistics.median(durations)
+
+
+def calibrate_iterations(
+    target_seconds, samples=5, base_iterations=100_000, step=10_000
+):
+    """
+    検証時間が target_seconds 程度になる反復回数を算出
+    PBKDF2 の計算時間は反復回数にほぼ比例するため、base_iterations の計測結果から換算する
+    """
+    per_iteration = measure_iterations(base_iterations, samples) / base_iterations
+    return max(step, round(target_seconds / per_iteration / step) * step)
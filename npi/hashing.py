@@ -0,0 +1,173 @@
+"""
+パスワードのハッシュ化・検証の実行
+
+パスワードのハッシュはあえて計算に時間がかかるため、ログインが集中した際に同じワーカーの他のAPIまで
+遅くならないよう、同時に受け付ける件数を制限する。
+
+- 実行中 + 待機中の件数が PASSWORD_HASHING["WORKERS"] + ["QUEUE_SIZE"] に達している場合は、
+  ["ADMISSION_TIMEOUT"] 秒待っても空かなければ HashingUnavailable（503）とする
+- MODE が inline（既定）の場合は、呼び出したスレッドで計算する
+- MODE が process の場合は、ワーカーごとのプロセスプールで計算する（ワーカーごとにプロセスが増えるため、
+  npi.server のワーカー数の算出でもその分のメモリを見込む）
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from npi.metrics import HASHING_INFLIGHT, HASHING_LATENCY, HASHING_REJECTED
+from npi.utils import ERROR_MESSAGES
+
+MODE_PROCESS = "process"
+MODE_INLINE = "inline"
+
+
+class HashingUnavailable(APIException):
+    """ハッシュの計算が混み合っていて受け付けられない"""
+
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = ERROR_MESSAGES["503_ERRORS"]
+    default_code = "SERVICE_UNAVAILABLE"
+
+
+def _init_worker():
+    # プロセスプールのワーカーでハッシュの設定（PASSWORD_HASHERS）を読み込む
+    import django
+
+    django.setup()
+
+
+def _verify(password, encoded):
+    # 設定のハッシュ方式・反復回数と異なる場合は、同じプロセスでハッシュし直した結果も返す
+    upgraded = []
+    is_correct = hashers.check_password(
+        password,
+        encoded,
+        setter=lambda raw: upgraded.append(hashers.make_password(raw)),
+    )
+    return is_correct, (upgraded[0] if upgraded else None)
+
+
+def _hash(password):
+    return hashers.make_password(password)
+
+
+class HashingExecutor:
+    """ハッシュの計算を同時実行数を制限して実行する"""
+
+    def __init__(
+        self,
+        mode=MODE_INLINE,
+        workers=1,
+        queue_size=8,
+        admission_timeout=1.0,
+        start_method="forkserver",
+    ):
+        self.mode = mode
+        self.workers = workers
+        self.admission_timeout = admission_timeout
+        self.start_method = start_method
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pid = None
+
+    @classmethod
+    def from_settings(cls):
+        options = settings.PASSWORD_HASHING
+        return cls(
+            mode=options.get("MODE", MODE_INLINE),
+            workers=options.get("WORKERS", 1),
+            queue_size=options.get("QUEUE_SIZE", 8),
+            admission_timeout=options.get("ADMISSION_TIMEOUT", 1.0),
+            start_method=options.get("START_METHOD", "forkserver"),
+        )
+
+    def _get_pool(self):
+        with self._lock:
+            # fork後のプロセスでは、親プロセスのプールは使えないため作り直す
+            if self._pool is None or self._pid != os.getpid():
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                    initializer=_init_worker,
+                )
+                self._pid = os.getpid()
+            return self._pool
+
+    def _reset_pool(self, pool):
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def run(self, operation, func, *args):
+        """func を実行して結果を返す（受け付けられない場合は HashingUnavailable）"""
+        if not self._slots.acquire(timeout=self.admission_timeout):
+            HASHING_REJECTED.labels(operation).inc()
+            raise HashingUnavailable()
+        HASHING_INFLIGHT.inc()
+        started_at = time.perf_counter()
+        try:
+            if self.mode == MODE_INLINE:
+                return func(*args)
+            pool = self._get_pool()
+            try:
+                return pool.submit(func, *args).result()
+            except BrokenProcessPool:
+                # ワーカーが異常終了した場合は、次回の呼び出しでプールを作り直す
+                self._reset_pool(pool)
+                raise HashingUnavailable()
+        finally:
+            HASHING_LATENCY.labels(operation).observe(time.perf_counter() - started_at)
+            HASHING_INFLIGHT.dec()
+            self._slots.release()
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_hashing_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = HashingExecutor.from_settings()
+    return _executor
+
+
+def reset_hashing_executor():
+    """設定の変更時（テストなど）に作り直す"""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown()
+
+
+def verify_password(password, encoded):
+    """
+    パスワードがハッシュと一致するか
+    戻り値: (一致するか, ハッシュし直したパスワード（設定のハッシュ方式・反復回数と同じ場合は None）)
+    """
+    return get_hashing_executor().run("verify", _verify, password, encoded)
+
+
+def hash_password(password):
+    """パスワードをハッシュ化"""
+    return get_hashing_executor().run("hash", _hash, password)
@@ -0,0 +1,151 @@
+"""
+ヘルスチェック
+
+- /health, /health/live: プロセスが応答できれば 200（依存先は確認しない。コンテナの再起動の判定用）
+- /health/ready: DB・キャッシュの接続と、ウォームアップの完了を確認する（トラフィックの振り分けの判定用）
+  メール送信（HEALTH_CHECK["INFORMATIONAL_CHECKS"]）は結果を返すのみで、失敗しても 503 にはしない
+  （メールは送信キュー経由のため、送信先の障害でAPIへの振り分けを止めない）
+  公開するホストでも応答するため、レスポンスは確認ごとの ok/fail のみとし、例外の内容と所要時間はログに出力する
+
+readiness の確認結果はプロセス内に HEALTH_CHECK["CACHE_SECONDS"] 秒保持し、
+ヘルスチェックの頻度に関わらず依存先への問い合わせは一定間隔に抑える。
+ウォームアップ（キャッシュの事前読み込み）は各アプリの ready で register_warm_up に登録する。
+ヘルスチェックはいずれか1つのワーカーにしか届かないため、各ワーカーの起動時（gunicorn の post_worker_init）にも実行し、
+すべて成功するまでそのワーカーの readiness は 503 を返す。
+"""
+
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.mail import get_connection
+from django.db import connection
+from django.http import HttpResponse, JsonResponse
+
+# ロガーの設定
+logger = logging.getLogger(__name__)
+
+_warm_up_tasks = []
+
+
+def register_warm_up(name, func):
+    """readiness の前に実行するウォームアップの処理を登録"""
+    _warm_up_tasks.append((name, func))
+
+
+def check_database():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+        cursor.fetchone()
+
+
+def check_cache():
+    # 設定されたすべてのキャッシュ（ワーカー間で共有するバックエンド）に読み書きできるか確認する
+    # 他のワーカーの確認と競合しないよう、キーはプロセスごとに分ける
+    key = f"health:readiness:{os.getpid()}"
+    for alias in settings.CACHES:
+        cache = caches[alias]
+        value = str(time.time())
+        cache.set(key, value, timeout=60)
+        if cache.get(key) != value:
+            raise RuntimeError(f"cache {alias} read-after-write mismatch")
+        cache.delete(key)
+
+
+def check_mail():
+    # 接続のみ確認し、メールは送信しない
+    mail_connection = get_connection(fail_silently=False)
+    mail_connection.open()
+    mail_connection.close()
+
+
+CHECKS = {
+    "database": check_database,
+    "cache": check_cache,
+    "mail": check_mail,
+}
+
+
+class ReadinessProbe:
+    """依存先の確認結果とウォームアップの状態をプロセス内に保持する"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._result = None
+        self._expires_at = 0.0
+        self.warm = False
+
+    def _warm_up(self):
+        for name, func in _warm_up_tasks:
+            try:
+                func()
+            except Exception as e:
+                logger.warning(f"Warm-up {name} failed: {str(e)}")
+                return False
+        return True
+
+    def warm_up(self):
+        """ウォームアップを実行（ワーカーの起動時に呼び出す。失敗した場合は readiness の確認時に再試行する）"""
+        with self._lock:
+            if not self.warm:
+                self.warm = self._warm_up()
+            return self.warm
+
+    def _run_checks(self, names):
+        checks = {}
+        for name in names:
+            started_at = time.perf_counter()
+            try:
+                CHECKS[name]()
+                checks[name] = "ok"
+            except Exception as e:
+                elapsed_ms = round((time.perf_counter() - started_at) * 1000, 2)
+                logger.error(
+                    f"Readiness check {name} failed after {elapsed_ms}ms: {e.__class__.__name__}: {str(e)}"
+                )
+                checks[name] = "fail"
+        return checks
+
+    def check(self):
+        """確認結果（保持期間内であれば前回の結果）を返す"""
+        with self._lock:
+            if self._result is not None and self._expires_at > time.monotonic():
+                return self._result
+            options = settings.HEALTH_CHECK
+            checks = self._run_checks(options["CHECKS"])
+            ready = all(check == "ok" for check in checks.values())
+            # ウォームアップは依存先に接続できる状態で一度だけ成功すればよい
+            if ready and not self.warm:
+                self.warm = self._warm_up()
+            self._result = {
+                "status": "ok" if ready and self.warm else "unavailable",
+                "warm": self.warm,
+                "checks": checks,
+                # 結果は返すが、readiness の判定には含めない
+                "informational": self._run_checks(
+                    options.get("INFORMATIONAL_CHECKS", ())
+                ),
+            }
+            self._expires_at = time.monotonic() + options["CACHE_SECONDS"]
+            return self._result
+
+    def reset(self):
+        with self._lock:
+            self._result = None
+            self._expires_at = 0.0
+            self.warm = False
+
+
+readiness_probe = ReadinessProbe()
+
+
+def liveness_view(request):
+    return HttpResponse(status=200)
+
+
+def readiness_view(request):
+    result = readiness_probe.check()
+    return JsonResponse(result, status=200 if result["status"] == "ok" else 503)
@@ -0,0 +1,96 @@
+"""
+リクエストごとの処理時間の内訳の計測
+
+リクエストの処理中は RequestMetrics をコンテキスト変数に保持し、
+SQL・認証・シリアライズなどの処理時間をそこに加算する。
+コンテキスト変数は sync_to_async で実行されるスレッドにも引き継がれるため、非同期ビューでも計測できる。
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+_current_metrics = ContextVar("request_metrics", default=None)
+
+
+@dataclass
+class RequestMetrics:
+    """1リクエストの計測結果"""
+
+    started_at: float = field(default_factory=time.perf_counter)
+    query_count: int = 0
+    query_time: float = 0.0
+    # 処理の種類（auth / serializer など）ごとの処理時間（秒）
+    timings: dict = field(default_factory=dict)
+    # 計測中の処理の種類（入れ子で二重に加算しないため）
+    active: set = field(default_factory=set)
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started_at
+
+    def add(self, name, duration):
+        self.timings[name] = self.timings.get(name, 0.0) + duration
+
+
+def start_request():
+    """リクエストの計測を開始（戻り値は finish_request に渡す）"""
+    metrics = RequestMetrics()
+    return metrics, _current_metrics.set(metrics)
+
+
+def finish_request(token):
+    _current_metrics.reset(token)
+
+
+def get_current_metrics():
+    """処理中のリクエストの計測結果（リクエストの処理中でない場合は None）"""
+    return _current_metrics.get()
+
+
+@contextmanager
+def timer(name):
+    """ブロックの処理時間を、処理中のリクエストの name の処理時間に加算する"""
+    metrics = _current_metrics.get()
+    if metrics is None or name in metrics.active:
+        yield
+        return
+    metrics.active.add(name)
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.active.discard(name)
+        metrics.add(name, time.perf_counter() - started_at)
+
+
+def record_query(execute, sql, params, many, context):
+    """DB接続の execute_wrapper として登録し、SQLの件数と処理時間を加算する"""
+    metrics = _current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started_at = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.query_count += 1
+        metrics.query_time += time.perf_counter() - started_at
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    """connection_created シグナルで、新しいDB接続に record_query を登録する"""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class TimedSerializerMixin:
+    """シリアライザーに混ぜて、検証と出力の処理時間を serializer として計測する"""
+
+    def is_valid(self, *args, **kwargs):
+        with timer("serializer"):
+            return super().is_valid(*args, **kwargs)
+
+    def to_representation(self, instance):
+        with timer("serializer"):
+            return super().to_representation(instance)
@@ -0,0 +1,197 @@
+"""
+Prometheus形式のメトリクス
+
+gunicornの複数のワーカー（プロセス）の値を集計するため、環境変数 PROMETHEUS_MULTIPROC_DIR を
+指定した場合はマルチプロセスモードで記録し、/metrics の出力時にディレクトリ内の全プロセスの値を合算する。
+PROMETHEUS_MULTIPROC_DIR は prometheus_client の読み込みより前に設定しておく必要がある（Dockerfile で指定）。
+"""
+
+import hmac
+import ipaddress
+import os
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+from npi.db.pool import pool_stats
+
+# URLが解決されなかったリクエストのビュー名（ラベルの種類を増やさないため、パスは使わない）
+UNMATCHED_VIEW = "unmatched"
+
+# ビューの処理時間のバケット（秒）
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REQUEST_LATENCY = Histogram(
+    "npi_request_duration_seconds",
+    "リクエストの処理時間（ビューごと）",
+    ["host", "view", "method"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUESTS = Counter(
+    "npi_requests",
+    "リクエスト数（ビュー・ステータスごと）",
+    ["host", "view", "method", "status"],
+)
+DB_QUERIES = Counter(
+    "npi_db_queries",
+    "実行したSQLの件数（ビューごと）",
+    ["host", "view"],
+)
+DB_QUERY_TIME = Counter(
+    "npi_db_query_seconds",
+    "SQLの処理時間の合計（ビューごと）",
+    ["host", "view"],
+)
+CACHE_REQUESTS = Counter(
+    "npi_cache_requests",
+    "キャッシュの参照数（キャッシュ・結果ごと。ヒット率は hit / 全体で算出する）",
+    ["cache", "result"],
+)
+MAIL_SEND_LATENCY = Histogram(
+    "npi_mail_send_duration_seconds",
+    "メール送信の処理時間",
+    ["kind", "result"],
+    buckets=LATENCY_BUCKETS,
+)
+
+HASHING_INFLIGHT = Gauge(
+    "npi_password_hashing_inflight",
+    "実行中・待機中のパスワードのハッシュ計算の件数",
+    multiprocess_mode="livesum",
+)
+HASHING_LATENCY = Histogram(
+    "npi_password_hashing_duration_seconds",
+    "パスワードのハッシュ計算の処理時間（待機時間を含む）",
+    ["operation"],
+    buckets=LATENCY_BUCKETS,
+)
+HASHING_REJECTED = Counter(
+    "npi_password_hashing_rejected",
+    "混み合っていて受け付けなかったパスワードのハッシュ計算の件数",
+    ["operation"],
+)
+
+# コネクションプール（npi.db.pool）の値はプロセスごとに持つため、終了したワーカーの分は破棄する
+DB_POOL_CONNECTIONS = Gauge(
+    "npi_db_pool_connections",
+    "コネクションプールのコネクション数（データベース・状態ごと。state は idle / checked_out）",
+    ["database", "state"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_EVENTS = Gauge(
+    "npi_db_pool_events",
+    "ワーカーの起動からのコネクションプールの累計件数（データベース・種類ごと。接続・再利用・接続し直し・切断・待機・タイムアウト）",
+    ["database", "event"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_STATES = ("idle", "checked_out")
+DB_POOL_EVENT_NAMES = (
+    "created",
+    "reused",
+    "recycled",
+    "discarded",
+    "waits",
+    "timeouts",
+)
+
+
+def is_multiprocess():
+    return bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+
+def observe_request(record, query_time):
+    """リクエストの計測結果（npi.middleware.RequestMetricsMiddleware）を記録"""
+    host = record["host"] or ""
+    view = record["view"] or UNMATCHED_VIEW
+    REQUEST_LATENCY.labels(host, view, record["method"]).observe(
+        record["total_ms"] / 1000
+    )
+    REQUESTS.labels(host, view, record["method"], str(record["status"])).inc()
+    if record["db_queries"]:
+        DB_QUERIES.labels(host, view).inc(record["db_queries"])
+        DB_QUERY_TIME.labels(host, view).inc(query_time)
+    # リクエストを処理したワーカーのプールの状態を反映する（他のワーカーの値は各ワーカーで更新される）
+    update_pool_metrics()
+
+
+def update_pool_metrics():
+    """このプロセスのコネクションプールの統計情報（npi.db.pool.pool_stats）をゲージに反映"""
+    for database, stats in pool_stats().items():
+        database = database or ""
+        for state in DB_POOL_STATES:
+            DB_POOL_CONNECTIONS.labels(database, state).set(stats[state])
+        for event in DB_POOL_EVENT_NAMES:
+            DB_POOL_EVENTS.labels(database, event).set(stats[event])
+
+
+def record_cache_access(cache, hit):
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+@contextmanager
+def observe_mail_send(kind):
+    """ブロック内のメール送信の処理時間を記録（例外が発生した場合は result=failure）"""
+    started_at = time.perf_counter()
+    result = "failure"
+    try:
+        yield
+        result = "success"
+    finally:
+        MAIL_SEND_LATENCY.labels(kind, result).observe(time.perf_counter() - started_at)
+
+
+def collect():
+    """全プロセス（マルチプロセスモードでない場合はこのプロセス）のメトリクスをテキスト形式で出力"""
+    update_pool_metrics()
+    if is_multiprocess():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry)
+
+
+def mark_process_dead(pid):
+    """終了したワーカーの値のうち、プロセスごとに持つもの（livesum のゲージ）を破棄する"""
+    if is_multiprocess():
+        multiprocess.mark_process_dead(pid)
+
+
+def is_metrics_allowed(request):
+    """
+    /metrics を返してよいリクエストか（settings.METRICS のトークン・接続元で判定）
+    接続元は REMOTE_ADDR で判定する（X-Forwarded-For は偽装できるため使わない）
+    """
+    options = settings.METRICS
+    token = options.get("TOKEN")
+    # compare_digest は ASCII 以外を含む文字列を比較できない（TypeError）ため、バイト列にして比較する
+    authorization = request.META.get("HTTP_AUTHORIZATION", "").encode()
+    if token and hmac.compare_digest(authorization, f"Bearer {token}".encode()):
+        return True
+    try:
+        address = ipaddress.ip_address(request.META.get("REMOTE_ADDR", ""))
+    except ValueError:
+        return False
+    return any(
+        address in ipaddress.ip_network(network, strict=False)
+        for network in options.get("ALLOWED_IPS", ())
+    )
+
+
+def metrics_view(request):
+    # 公開のホストでも応答するため、許可されていない場合はエンドポイントの存在を返さない
+    if not is_metrics_allowed(request):
+        raise Http404
+    return HttpResponse(collect(), content_type=CONTENT_TYPE_LATEST)
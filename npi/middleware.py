@@ -0,0 +1,82 @@
+import json
+import logging
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from npi.instrumentation import finish_request, start_request
+from npi.metrics import observe_request
+
+# 計測結果のロガー（1リクエスト1行のJSON）
+logger = logging.getLogger("npi.performance")
+
+
+class RequestMetricsMiddleware:
+    """
+    リクエストごとに、ホスト・ビュー・SQLの件数と処理時間・認証とシリアライズの処理時間・全体の処理時間を計測し、
+    構造化ログと Server-Timing ヘッダー・Prometheusのメトリクス（npi.metrics）に出力する
+
+    全体の処理時間を計測するため、MIDDLEWARE の先頭（HostsRequestMiddleware より前）に置く
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics, token = start_request()
+        try:
+            response = self.get_response(request)
+        finally:
+            finish_request(token)
+        self.process_metrics(request, response, metrics)
+        return response
+
+    async def __acall__(self, request):
+        metrics, token = start_request()
+        try:
+            response = await self.get_response(request)
+        finally:
+            finish_request(token)
+        self.process_metrics(request, response, metrics)
+        return response
+
+    def build_record(self, request, response, metrics):
+        # ホストは HostsRequestMiddleware、ビューはURLの解決時に設定される
+        host = getattr(request, "host", None)
+        resolver_match = getattr(request, "resolver_match", None)
+        return {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "host": getattr(host, "name", None),
+            "view": resolver_match.view_name if resolver_match else None,
+            "db_queries": metrics.query_count,
+            "db_ms": round(metrics.query_time * 1000, 2),
+            "auth_ms": round(metrics.timings.get("auth", 0.0) * 1000, 2),
+            "serializer_ms": round(metrics.timings.get("serializer", 0.0) * 1000, 2),
+            "total_ms": round(metrics.elapsed * 1000, 2),
+        }
+
+    def process_metrics(self, request, response, metrics):
+        record = self.build_record(request, response, metrics)
+        observe_request(record, metrics.query_time)
+        options = settings.REQUEST_METRICS
+        if options["LOG"]:
+            logger.info(json.dumps(record, ensure_ascii=False))
+        if options["SERVER_TIMING"]:
+            response["Server-Timing"] = ", ".join(
+                [
+                    f'db;dur={record["db_ms"]};desc="{record["db_queries"]} queries"',
+                    f'auth;dur={record["auth_ms"]}',
+                    f'serializer;dur={record["serializer_ms"]}',
+                    f'total;dur={record["total_ms"]}',
+                ]
+            )
+        return record
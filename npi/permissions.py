@@ -0,0 +1,142 @@
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.permissions import BasePermission
+
+from npi.cache import get_version, bump_version
+from npi.utils import ERROR_MESSAGES
+from shared.models import SpaceAccountPermission
+from shared.registry import permission_registry
+
+# キャッシュキーの名前空間
+CACHE_NAMESPACE = "space_permissions"
+
+
+def _cache_key(user_id):
+    return f"{CACHE_NAMESPACE}:{get_version(CACHE_NAMESPACE)}:{user_id}"
+
+
+def _space_permission_rows(user_id):
+    # 権限名は権限の対応表から引くため、権限テーブルは結合しない
+    return SpaceAccountPermission.objects.filter(
+        space_account__account_id=user_id,
+        space_account__deleted_at__isnull=True,
+        deleted_at__isnull=True,
+    ).values_list("space_account__space_id", "permission_id")
+
+
+def _build_matrix(rows, names):
+    matrix = {}
+    for space_id, permission_id in rows:
+        permission_name = names.get(permission_id)
+        # 論理削除済みの権限は除外
+        if permission_name is not None:
+            matrix.setdefault(space_id, set()).add(permission_name)
+    return {space_id: frozenset(names) for space_id, names in matrix.items()}
+
+
+def load_space_permissions(user_id):
+    """ユーザーの全スペースの権限マトリクス（space_id → 権限名の集合）をDBから取得"""
+    rows = list(_space_permission_rows(user_id))
+    permission_registry.ensure_loaded(permission_id for _, permission_id in rows)
+    return _build_matrix(rows, permission_registry.names)
+
+
+async def aload_space_permissions(user_id):
+    """load_space_permissions の非同期版"""
+    rows = [row async for row in _space_permission_rows(user_id)]
+    await permission_registry.aensure_loaded(permission_id for _, permission_id in rows)
+    return _build_matrix(rows, permission_registry.names)
+
+
+def invalidate_space_permissions(user_id=None):
+    """
+    権限マトリクスのキャッシュを無効化
+    user_idを省略した場合は全ユーザー分を無効化する
+    """
+    if user_id is None:
+        bump_version(CACHE_NAMESPACE)
+    else:
+        cache.delete(_cache_key(user_id))
+
+
+class SpacePermissionResolver:
+    """
+    ユーザーのスペース権限を解決する
+    権限マトリクスはリクエスト中に一度だけ読み込み、共有キャッシュにも保持する
+    """
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self._matrix = None
+
+    @property
+    def matrix(self):
+        if self._matrix is None:
+            key = _cache_key(self.user_id)
+            matrix = cache.get(key)
+            if matrix is None:
+                matrix = load_space_permissions(self.user_id)
+                cache.set(key, matrix, timeout=settings.SPACE_PERMISSION_CACHE_TIMEOUT)
+            self._matrix = matrix
+        return self._matrix
+
+    async def aget_matrix(self):
+        """matrix の非同期版"""
+        if self._matrix is None:
+            key = _cache_key(self.user_id)
+            matrix = await cache.aget(key)
+            if matrix is None:
+                matrix = await aload_space_permissions(self.user_id)
+                await cache.aset(
+                    key, matrix, timeout=settings.SPACE_PERMISSION_CACHE_TIMEOUT
+                )
+            self._matrix = matrix
+        return self._matrix
+
+    def permissions_for(self, space_id):
+        """スペースでの権限名の集合を取得"""
+        return self.matrix.get(int(space_id), frozenset())
+
+    def has_any(self, space_id, permission_names):
+        """スペースで指定した権限のいずれかを持っているか"""
+        return not self.permissions_for(space_id).isdisjoint(permission_names)
+
+    async def ahas_any(self, space_id, permission_names):
+        """has_any の非同期版"""
+        matrix = await self.aget_matrix()
+        return not matrix.get(int(space_id), frozenset()).isdisjoint(permission_names)
+
+
+def get_space_permission_resolver(request):
+    """リクエスト単位のリゾルバを取得（同一リクエスト内では使い回す）"""
+    user_id = request.user.id
+    resolver = getattr(request, "_space_permission_resolver", None)
+    if resolver is None or resolver.user_id != user_id:
+        resolver = SpacePermissionResolver(user_id)
+        request._space_permission_resolver = resolver
+    return resolver
+
+
+# ユーザーがそのスペースでの対象の操作権限があるかチェック
+def has_space_permission(request, space_id, permission_names):
+    return get_space_permission_resolver(request).has_any(space_id, permission_names)
+
+
+# has_space_permission の非同期版
+async def ahas_space_permission(request, space_id, permission_names):
+    return await get_space_permission_resolver(request).ahas_any(
+        space_id, permission_names
+    )
+
+
+class IsStaffAccount(BasePermission):
+    """運用担当者（Account.is_staff）のみ許可する"""
+
+    message = ERROR_MESSAGES["403_ERRORS"]
+
+    def has_permission(self, request, view):
+        return bool(
+            request.user
+            and request.user.is_authenticated
+            and getattr(request.user, "is_staff", False)
+        )
@@ -0,0 +1,216 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+
+from npi.cache import CacheStats, LRUCache
+from shared.models import Account
+
+# スナップショットに保持するアカウントの項目
+# 共有キャッシュに書き込むため、パスワード・2要素認証のシークレットキーなどの機密情報は含めない
+SNAPSHOT_FIELDS = (
+    "id",
+    "name",
+    "email",
+    "last_2fa_at",
+    "last_login_at",
+    "deleted_at",
+    # 運用担当者の確認（npi.permissions.IsStaffAccount）でDBに問い合わせないよう保持する
+    "is_staff",
+)
+# スナップショットの形式のバージョン（SNAPSHOT_FIELDS を変更した場合は上げる）
+# 共有キャッシュのキーに含め、デプロイ中に旧バージョンのワーカーが書き込んだ形式の異なる値を読み込まないようにする
+SNAPSHOT_VERSION = 2
+
+
+class AccountSnapshot:
+    """認証済みユーザーとして保持するアカウントの項目"""
+
+    __slots__ = SNAPSHOT_FIELDS
+
+    def __init__(self, *values):
+        for field, value in zip(SNAPSHOT_FIELDS, values):
+            setattr(self, field, value)
+
+    @classmethod
+    def from_account(cls, account):
+        return cls(*(getattr(account, field) for field in SNAPSHOT_FIELDS))
+
+    def to_tuple(self):
+        return tuple(getattr(self, field) for field in SNAPSHOT_FIELDS)
+
+    def to_account(self):
+        """
+        スナップショットからAccountインスタンスを復元
+        スナップショットに含まれない項目は参照時にDBから読み込まれる
+        """
+        return Account.from_db(DEFAULT_DB_ALIAS, SNAPSHOT_FIELDS, self.to_tuple())
+
+
+class PrincipalCache:
+    """
+    認証済みユーザーのキャッシュ
+    全ワーカーで無効化を共有するため、cache_aliasの共有キャッシュに保持する（Noneの場合はキャッシュしない）
+    max_sizeを指定した場合はプロセス内のLRUキャッシュも併用する。
+    プロセス内のキャッシュは他のワーカーの無効化が反映されないため、1プロセスで動かす場合のみ使うこと
+    """
+
+    key_prefix = "principal"
+
+    def __init__(self, max_size=0, ttl=30, cache_alias=None):
+        self.local = LRUCache(max_size, ttl)
+        self.ttl = ttl
+        self.cache_alias = cache_alias
+        self.stats = CacheStats("principal")
+
+    @classmethod
+    def from_settings(cls):
+        options = settings.PRINCIPAL_CACHE
+        return cls(
+            max_size=options.get("MAX_SIZE", 0),
+            ttl=options.get("TTL", 30),
+            cache_alias=options.get("CACHE_ALIAS"),
+        )
+
+    @property
+    def enabled(self):
+        return self.cache_alias is not None
+
+    @property
+    def shared(self):
+        return caches[self.cache_alias] if self.cache_alias else None
+
+    def _key(self, user_id):
+        return f"{self.key_prefix}:v{SNAPSHOT_VERSION}:{user_id}"
+
+    def get(self, user_id):
+        """キャッシュからスナップショットを取得（存在しない場合はNone）"""
+        if not self.enabled:
+            return None
+        snapshot = self.local.get(user_id)
+        if snapshot is None:
+            values = self.shared.get(self._key(user_id))
+            if values is not None:
+                snapshot = AccountSnapshot(*values)
+                self.local.set(user_id, snapshot)
+        if snapshot is None:
+            self.stats.miss()
+        else:
+            self.stats.hit()
+        return snapshot
+
+    async def aget(self, user_id):
+        """get の非同期版"""
+        if not self.enabled:
+            return None
+        snapshot = self.local.get(user_id)
+        if snapshot is None:
+            values = await self.shared.aget(self._key(user_id))
+            if values is not None:
+                snapshot = AccountSnapshot(*values)
+                self.local.set(user_id, snapshot)
+        if snapshot is None:
+            self.stats.miss()
+        else:
+            self.stats.hit()
+        return snapshot
+
+    def set(self, snapshot):
+        if not self.enabled:
+            return
+        self.local.set(snapshot.id, snapshot)
+        self.shared.set(self._key(snapshot.id), snapshot.to_tuple(), timeout=self.ttl)
+
+    async def aset(self, snapshot):
+        """set の非同期版"""
+        if not self.enabled:
+            return
+        self.local.set(snapshot.id, snapshot)
+        await self.shared.aset(
+            self._key(snapshot.id), snapshot.to_tuple(), timeout=self.ttl
+        )
+
+    def invalidate(self, user_id):
+        self.local.delete(user_id)
+        if self.shared is not None:
+            self.shared.delete(self._key(user_id))
+
+    def clear(self):
+        self.local.clear()
+        self.stats.reset()
+
+    def get_account(self, user_id):
+        """
+        ユーザーIDからAccountを取得
+        キャッシュに存在しない場合はDBから取得してキャッシュする
+        """
+        snapshot = self.get(user_id)
+        if snapshot is not None:
+            return snapshot.to_account()
+
+        account = Account.objects.only(*SNAPSHOT_FIELDS).get(id=user_id)
+        self.set(AccountSnapshot.from_account(account))
+        return account
+
+    async def aget_account(self, user_id):
+        """get_account の非同期版"""
+        snapshot = await self.aget(user_id)
+        if snapshot is not None:
+            return snapshot.to_account()
+
+        account = await Account.objects.only(*SNAPSHOT_FIELDS).aget(id=user_id)
+        await self.aset(AccountSnapshot.from_account(account))
+        return account
+
+
+_principal_cache = None
+
+
+def get_principal_cache():
+    """プロセスで共有する認証済みユーザーのキャッシュを取得"""
+    global _principal_cache
+    if _principal_cache is None:
+        _principal_cache = PrincipalCache.from_settings()
+    return _principal_cache
+
+
+class TokenPrincipal:
+    """
+    アクセストークンのクレームから生成する認証済みユーザー
+    トークンに含まれない項目を参照した時点でアカウントを取得する
+    """
+
+    __slots__ = ("id", "is_two_factor_authenticated", "_account")
+
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, user_id, is_two_factor_authenticated=False):
+        self.id = user_id
+        self.is_two_factor_authenticated = is_two_factor_authenticated
+        self._account = None
+
+    @property
+    def pk(self):
+        return self.id
+
+    @property
+    def account(self):
+        """アカウント（初回参照時に取得）"""
+        if self._account is None:
+            self._account = get_principal_cache().get_account(self.id)
+        return self._account
+
+    def __getattr__(self, name):
+        # トークンに含まれない項目はアカウントから取得
+        return getattr(self.account, name)
+
+    def __eq__(self, other):
+        if isinstance(other, (TokenPrincipal, Account)):
+            return self.id == other.id
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __str__(self):
+        return str(self.account)
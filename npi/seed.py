@@ -0,0 +1,221 @@
+"""
+性能検証用のデータ投入
+
+アカウント・スペース・プロジェクト・コンテンツを指定件数だけ作成する。
+論理削除済みの行も一定の割合で混ぜ、本番に近いデータの偏りを再現する。
+"""
+
+import random
+from datetime import timedelta
+from dataclasses import dataclass, field
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.utils import timezone
+
+from shared.models import (
+    Account,
+    Announcement,
+    Permission,
+    Project,
+    Space,
+    SpaceAccount,
+    SpaceAccountPermission,
+)
+from shared.registry import PERM
+from user_app.contents.models import Contents
+
+# 投入したアカウントのメールアドレスの書式
+SEED_EMAIL = "seed-{}@example.com"
+
+
+@dataclass
+class SeedResult:
+    account_ids: list = field(default_factory=list)
+    space_ids: list = field(default_factory=list)
+    project_ids: list = field(default_factory=list)
+    counts: dict = field(default_factory=dict)
+
+
+def _batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _bulk_create(model, rows, batch_size, result, log):
+    ids = []
+    count = 0
+    for batch in _batched(rows, batch_size):
+        created = model.objects.bulk_create(batch, batch_size=batch_size)
+        ids.extend(obj.pk for obj in created)
+        count += len(batch)
+    result.counts[model._meta.db_table] = count
+    log(f"{model._meta.db_table}: {count}")
+    return ids
+
+
+def seed_dataset(
+    accounts=1000,
+    spaces=100,
+    spaces_per_account=3,
+    projects_per_space=50,
+    contents_per_project=20,
+    announcements=50,
+    deleted_ratio=0.3,
+    password="password",
+    batch_size=5000,
+    random_seed=0,
+    log=lambda message: None,
+):
+    """
+    性能検証用のデータを投入する
+
+    deleted_ratio の割合で論理削除済みの行を作成する。
+    作成したアカウントは全て password でログインできる。
+    """
+    rng = random.Random(random_seed)
+    now = timezone.now()
+    result = SeedResult()
+
+    def deleted_at():
+        return now if rng.random() < deleted_ratio else None
+
+    with transaction.atomic():
+        permissions = {
+            name: Permission.objects.get_or_create(name=name, deleted_at=None)[0]
+            for name in (PERM.space_admin, PERM.creator, PERM.distributor, PERM.viewer)
+        }
+
+        # パスワードのハッシュ化は重いため、全アカウントで同じハッシュを使う
+        hashed_password = make_password(password)
+        offset = Account.objects.count()
+        result.account_ids = _bulk_create(
+            Account,
+            (
+                Account(
+                    name=f"seed {offset + i}",
+                    email=SEED_EMAIL.format(offset + i),
+                    password=hashed_password,
+                )
+                for i in range(accounts)
+            ),
+            batch_size,
+            result,
+            log,
+        )
+        result.space_ids = _bulk_create(
+            Space,
+            (
+                Space(name=f"seed space {i}", deleted_at=deleted_at())
+                for i in range(spaces)
+            ),
+            batch_size,
+            result,
+            log,
+        )
+
+        memberships = [
+            (account_id, space_id)
+            for account_id in result.account_ids
+            for space_id in rng.sample(
+                result.space_ids, min(spaces_per_account, len(result.space_ids))
+            )
+        ]
+        space_account_ids = _bulk_create(
+            SpaceAccount,
+            (
+                SpaceAccount(account_id=a, space_id=s, deleted_at=deleted_at())
+                for a, s in memberships
+            ),
+            batch_size,
+            result,
+            log,
+        )
+        permission_ids = [permission.id for permission in permissions.values()]
+        _bulk_create(
+            SpaceAccountPermission,
+            (
+                SpaceAccountPermission(
+                    space_account_id=space_account_id,
+                    permission_id=permission_id,
+                    deleted_at=deleted_at(),
+                )
+                for space_account_id in space_account_ids
+                for permission_id in rng.sample(permission_ids, rng.randint(1, 2))
+            ),
+            batch_size,
+            result,
+            log,
+        )
+
+        result.project_ids = _bulk_create(
+            Project,
+            (
+                Project(
+                    name=f"seed project {i}",
+                    space_id=space_id,
+                    last_updated_at=now,
+                    deleted_at=deleted_at(),
+                )
+                for space_id in result.space_ids
+                for i in range(projects_per_space)
+            ),
+            batch_size,
+            result,
+            log,
+        )
+        # 論理コンテンツIDは乱数だと件数が多い場合に重複するため、連番から作る
+        logical_ids = (f"{i:06x}" for i in range(Contents.objects.count(), 16**6))
+        _bulk_create(
+            Contents,
+            (
+                Contents(
+                    logical_contents_id=next(logical_ids),
+                    name=f"seed contents {i}",
+                    project_id=project_id,
+                    last_updated_at=now,
+                    deleted_at=deleted_at(),
+                )
+                for project_id in result.project_ids
+                for i in range(contents_per_project)
+            ),
+            batch_size,
+            result,
+            log,
+        )
+        # 掲載中・掲載終了・掲載予定のお知らせ
+        _bulk_create(
+            Announcement,
+            (
+                Announcement(
+                    title=f"seed announcement {i}",
+                    content="seed",
+                    announcements_from_at=now + timedelta(days=rng.randint(-30, 3)),
+                    announcements_to_at=now + timedelta(days=rng.randint(-3, 30)),
+                    deleted_at=deleted_at(),
+                )
+                for i in range(announcements)
+            ),
+            batch_size,
+            result,
+            log,
+        )
+
+    # 実行計画が実際の件数に基づくよう、統計情報を更新しておく
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            for model in (
+                Account,
+                Space,
+                SpaceAccount,
+                SpaceAccountPermission,
+                Project,
+                Contents,
+                Announcement,
+            ):
+                cursor.execute(
+                    f"ANALYZE {connection.ops.quote_name(model._meta.db_table)}"
+                )
+    return result
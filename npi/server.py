@@ -0,0 +1,218 @@
+"""
+本番用アプリケーションサーバー（gunicorn）の設定
+
+コンテナ（cgroup）のCPU・メモリの上限からワーカー数・スレッド数を決める。
+環境変数 WEB_CONCURRENCY / GUNICORN_THREADS を指定した場合はそちらを優先する。
+"""
+
+import os
+
+from django.conf import settings
+from django.db import connections
+from gunicorn.app.base import BaseApplication
+
+from npi.hashing import MODE_PROCESS
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+
+# ワーカー1つあたりに見込むメモリ（バイト）
+WORKER_MEMORY = 128 * 1024 * 1024
+# パスワードのハッシュ計算をプロセスプールで行う場合（PASSWORD_HASHING["MODE"] が process）に、
+# ワーカーごとに加わるプロセス（django.setup() 済みのプールのプロセス・forkserver）1つあたりに見込むメモリ（バイト）
+HASHING_PROCESS_MEMORY = 96 * 1024 * 1024
+FORKSERVER_MEMORY = 16 * 1024 * 1024
+# ワーカー以外（マスタープロセスなど）に確保しておくメモリ（バイト）
+RESERVED_MEMORY = 64 * 1024 * 1024
+# ワーカー数の上限
+MAX_WORKERS = 8
+# ワーカー1つあたりのスレッド数（WSGIの場合）
+DEFAULT_THREADS = 4
+# プロセス内にしか保持しないキャッシュのバックエンド
+LOCAL_CACHE_BACKENDS = ("django.core.cache.backends.locmem.LocMemCache",)
+
+
+def _read(path):
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def detect_cpu_limit(cgroup_root=CGROUP_ROOT):
+    """使用できるCPU数（cgroupのクォータがない場合はCPUアフィニティから算出）"""
+    # cgroup v2
+    cpu_max = _read(os.path.join(cgroup_root, "cpu.max"))
+    if cpu_max:
+        quota, _, period = cpu_max.partition(" ")
+        if quota != "max" and period:
+            return int(quota) / int(period)
+    # cgroup v1
+    quota = _read(os.path.join(cgroup_root, "cpu", "cpu.cfs_quota_us"))
+    period = _read(os.path.join(cgroup_root, "cpu", "cpu.cfs_period_us"))
+    if quota and period and int(quota) > 0:
+        return int(quota) / int(period)
+    return float(len(os.sched_getaffinity(0)))
+
+
+def detect_memory_limit(cgroup_root=CGROUP_ROOT):
+    """使用できるメモリ（バイト）。上限がない場合はNone"""
+    # cgroup v2
+    memory_max = _read(os.path.join(cgroup_root, "memory.max"))
+    if memory_max:
+        return None if memory_max == "max" else int(memory_max)
+    # cgroup v1（上限なしの場合は非常に大きな値になる）
+    limit = _read(os.path.join(cgroup_root, "memory", "memory.limit_in_bytes"))
+    if limit and int(limit) < 1 << 60:
+        return int(limit)
+    return None
+
+
+def worker_memory(hashing=None):
+    """ワーカー1つあたりに見込むメモリ（パスワードのハッシュ計算のプロセスプールを含む）"""
+    hashing = settings.PASSWORD_HASHING if hashing is None else hashing
+    if hashing.get("MODE") != MODE_PROCESS:
+        return WORKER_MEMORY
+    return (
+        WORKER_MEMORY
+        + FORKSERVER_MEMORY
+        + HASHING_PROCESS_MEMORY * hashing.get("WORKERS", 1)
+    )
+
+
+def compute_worker_settings(
+    cpu_limit=None, memory_limit=None, environ=os.environ, hashing=None
+):
+    """CPU・メモリの上限からワーカー数・スレッド数を算出"""
+    cpu_limit = detect_cpu_limit() if cpu_limit is None else cpu_limit
+    memory_limit = detect_memory_limit() if memory_limit is None else memory_limit
+
+    # CPUあたり 2n+1 ワーカー（1CPU未満の場合は1ワーカー）
+    workers = max(1, int(2 * cpu_limit + 1)) if cpu_limit >= 1 else 1
+    if memory_limit:
+        workers = min(
+            workers, max(1, (memory_limit - RESERVED_MEMORY) // worker_memory(hashing))
+        )
+    workers = min(workers, MAX_WORKERS)
+
+    return {
+        "workers": int(environ.get("WEB_CONCURRENCY", workers)),
+        "threads": int(environ.get("GUNICORN_THREADS", DEFAULT_THREADS)),
+        "cpu_limit": cpu_limit,
+        "memory_limit": memory_limit,
+    }
+
+
+def check_shared_caches(workers, caches=None, principal_cache=None):
+    """
+    複数のワーカーで動かす場合に、ワーカー間で共有されないキャッシュの設定を返す
+    権限・件数・認証済みユーザーのキャッシュは、他のワーカーでの無効化が反映されなくなるため
+    """
+    if workers <= 1:
+        return []
+    caches = settings.CACHES if caches is None else caches
+    principal_cache = (
+        settings.PRINCIPAL_CACHE if principal_cache is None else principal_cache
+    )
+
+    problems = []
+    for alias, options in caches.items():
+        if options.get("BACKEND") in LOCAL_CACHE_BACKENDS:
+            problems.append(
+                f"CACHES['{alias}'] がプロセス内のキャッシュ（{options['BACKEND']}）です"
+            )
+    if principal_cache.get("MAX_SIZE"):
+        problems.append(
+            "PRINCIPAL_CACHE['MAX_SIZE'] が0ではありません（プロセス内にも保持されます）"
+        )
+    return problems
+
+
+def _post_fork(server, worker):
+    # マスタープロセスから引き継いだDBコネクションは使わない
+    connections.close_all()
+
+
+def _post_worker_init(worker):
+    # ヘルスチェックはいずれか1つのワーカーにしか届かないため、各ワーカーでリクエストを受け付ける前に温めておく
+    from npi.health import readiness_probe
+
+    readiness_probe.warm_up()
+    connections.close_all()
+
+
+def _child_exit(server, worker):
+    # 終了したワーカーのメトリクスを後片付けする
+    from npi.metrics import mark_process_dead
+
+    mark_process_dead(worker.pid)
+
+
+def _worker_exit(server, worker):
+    # 溜めておいたアカウントの利用状況を書き込んでから終了する
+    from npi.activity import shutdown_activity_buffer
+
+    shutdown_activity_buffer()
+
+
+def prepare_metrics_dir(environ=os.environ):
+    """
+    マルチプロセスモードのメトリクスの保存先を作成し、前回の起動時のファイルを削除する
+    ワーカーをforkする前（マスタープロセス）で呼び出す
+    """
+    path = environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if not path:
+        return None
+    os.makedirs(path, exist_ok=True)
+    for name in os.listdir(path):
+        if name.endswith(".db"):
+            os.remove(os.path.join(path, name))
+    return path
+
+
+def build_options(bind="0.0.0.0:8000", workers=None, threads=None, asgi=False):
+    """gunicornの設定を生成"""
+    worker_settings = compute_worker_settings()
+    options = {
+        "bind": bind,
+        "workers": workers or worker_settings["workers"],
+        # アプリケーションはマスタープロセスで読み込み、ワーカーはforkして共有する
+        "preload_app": True,
+        # SIGTERM受信後、処理中のリクエストを待つ時間（ECSのstopTimeout 30秒より短くする）
+        "graceful_timeout": 25,
+        "timeout": 60,
+        "keepalive": 5,
+        # メモリリーク対策として一定数のリクエストでワーカーを再起動
+        "max_requests": 1000,
+        "max_requests_jitter": 100,
+        "worker_tmp_dir": "/dev/shm" if os.path.isdir("/dev/shm") else None,
+        "accesslog": "-",
+        "errorlog": "-",
+        "post_fork": _post_fork,
+        "post_worker_init": _post_worker_init,
+        "child_exit": _child_exit,
+        "worker_exit": _worker_exit,
+    }
+    if asgi:
+        options["worker_class"] = "uvicorn.workers.UvicornWorker"
+    else:
+        options["worker_class"] = "gthread"
+        options["threads"] = threads or worker_settings["threads"]
+    return options
+
+
+class GunicornApplication(BaseApplication):
+    """読み込み済みのWSGI/ASGIアプリケーションをgunicornで動かす"""
+
+    def __init__(self, application, options):
+        self.application = application
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            if value is not None and key in self.cfg.settings:
+                self.cfg.set(key, value)
+
+    def load(self):
+        return self.application
@@ -63,9 +63,12 @@ INSTALLED_APPS = [
     "user_app.announcements",
     "user_app.projects",
     "user_app.contents",
+    "mail_templates",
 ]
 
 MIDDLEWARE = [
+    # リクエストごとの処理時間の計測（全体の処理時間を計測するため先頭に置く）
+    "npi.middleware.RequestMetricsMiddleware",
     "django_hosts.middleware.HostsRequestMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -84,6 +87,9 @@ REST_FRAMEWORK = {
 
 ROOT_URLCONF = "npi.urls"
 
+# ASGIで動かす場合に、主要な参照系APIを非同期ビューで処理する
+ASYNC_VIEWS = os.environ.get("ASYNC_VIEWS", "false").lower() == "true"
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
@@ -94,6 +100,210 @@ SIMPLE_JWT = {
 
 TWO_FACTOR_AUTH_TIMEOUT = timedelta(hours=24)
 
+# キャッシュ（権限マトリクス・一覧の件数など）
+# 変更時の無効化を全ワーカーに反映するため、プロセス間で共有する Redis を使う（REDIS_URL は必須）
+# DBのテーブル（DatabaseCache）ではキャッシュの読み書きのたびにクエリが発生し、キャッシュの効果がなくなるため使わない
+# ローカル（local.py）・テスト（github_actions.py）ではプロセス内のキャッシュに置き換える
+REDIS_URL = os.environ.get("REDIS_URL")
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": REDIS_URL,
+        "KEY_PREFIX": "npi",
+    }
+}
+
+# スペース権限マトリクスのキャッシュ有効期間（秒）
+SPACE_PERMISSION_CACHE_TIMEOUT = 60
+
+# 権限マスタの変更有無を確認する間隔（秒）
+PERMISSION_REGISTRY_CHECK_INTERVAL = 30
+
+# リクエストごとの処理時間の計測（npi.middleware.RequestMetricsMiddleware）
+REQUEST_METRICS = {
+    # 計測結果を npi.performance ロガーに出力する
+    "LOG": os.environ.get("REQUEST_METRICS_LOG", "true").lower() == "true",
+    # 計測結果を Server-Timing ヘッダーで返す（SQLの件数・処理時間が外部から見えるため、既定では返さない）
+    "SERVER_TIMING": os.environ.get("REQUEST_METRICS_SERVER_TIMING", "false").lower()
+    == "true",
+}
+
+# /metrics（npi.metrics）へのアクセス制限（いずれかを満たす場合のみ返し、それ以外は404）
+METRICS = {
+    # Authorization: Bearer <TOKEN> で許可する（未指定の場合はトークンでは許可しない）
+    "TOKEN": os.environ.get("METRICS_TOKEN"),
+    # 接続元のIPアドレス・CIDR（カンマ区切り）で許可する。既定は同じタスク内のコンテナ（ループバック）のみ
+    "ALLOWED_IPS": [
+        value.strip()
+        for value in os.environ.get("METRICS_ALLOWED_IPS", "127.0.0.1,::1").split(",")
+        if value.strip()
+    ],
+}
+
+# ロガーの設定（計測結果は標準エラー出力に1行ずつ出力する）
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "npi.performance": {
+            "handlers": ["console"],
+            "level": "INFO",
+            "propagate": False,
+        },
+    },
+}
+
+# 一覧の件数（total_items）の取得方法（npi.counts）
+PAGINATION_COUNT = {
+    # 既定の取得方法（exact / cached / estimate / none）
+    "STRATEGY": os.environ.get("PAGINATION_COUNT_STRATEGY", "cached"),
+    # 件数のキャッシュの有効期間（秒）
+    "TIMEOUT": 300,
+    # estimate の場合に、推定行数がこれより少なければ正確な件数を取得する
+    "ESTIMATE_THRESHOLD": 10000,
+}
+
+# パスワードのハッシュ計算（npi.hashing）
+PASSWORD_HASHING = {
+    # inline: リクエストのスレッドで計算する / process: プロセスプールで計算する
+    # process はワーカーごとに forkserver と django.setup() 済みのプロセスが加わるため、メモリに余裕がある場合のみ指定する
+    "MODE": os.environ.get("PASSWORD_HASHING_MODE", "inline"),
+    # プロセスプールのプロセス数（gunicornのワーカーごと。MODE が process の場合のみ）
+    "WORKERS": int(os.environ.get("PASSWORD_HASHING_WORKERS", "1")),
+    # 実行中の他に待機させる件数の上限
+    "QUEUE_SIZE": int(os.environ.get("PASSWORD_HASHING_QUEUE_SIZE", "8")),
+    # 待機の上限に達している場合に、空きを待つ秒数（超えた場合は503）
+    "ADMISSION_TIMEOUT": 1.0,
+    # プロセスプールの起動方法（スレッドを持つワーカーからforkしないよう forkserver を使う）
+    "START_METHOD": "forkserver",
+    # PBKDF2 の反復回数（未指定の場合は Django の既定値。manage.py calibrate_password_hashing で算出する）
+    "ITERATIONS": (
+        int(os.environ["PASSWORD_HASHING_ITERATIONS"])
+        if os.environ.get("PASSWORD_HASHING_ITERATIONS")
+        else None
+    ),
+}
+
+# パスワードのハッシュ方式（先頭の方式でハッシュ化し、それ以外は既存のハッシュの検証に使う）
+PASSWORD_HASHERS = [
+    "npi.hashers.TunablePBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+
+# メールの送信キュー（mail_templates.outbox）
+MAIL_OUTBOX = {
+    # ワーカーが1回に送信する件数
+    "BATCH_SIZE": 50,
+    # 送信対象がない場合にワーカーが待つ秒数
+    "POLL_INTERVAL": 5,
+    # 送信の試行回数の上限
+    "MAX_ATTEMPTS": 5,
+    # 再送までの秒数（試行のたびに2倍にする）と上限
+    "RETRY_BACKOFF": 60,
+    "MAX_BACKOFF": 3600,
+    # 送信中のままワーカーが停止した場合に、再送の対象に戻すまでの秒数
+    "SENDING_TIMEOUT": 300,
+    # 一括送信の受信者数の上限と、送信キューに登録する際の1回あたりの件数
+    "BULK_MAX_RECIPIENTS": 10000,
+    "BULK_CREATE_BATCH_SIZE": 1000,
+    # 一括送信APIの1アカウントあたりの呼び出し回数の上限（DRFのスロットルの書式）
+    "BULK_RATE": os.environ.get("BULK_MAIL_RATE", "10/hour"),
+}
+
+# アカウントの利用状況の更新（npi.activity）
+ACCOUNT_ACTIVITY = {
+    # sync: リクエストの中で書き込む / buffered: プロセス内に溜めてまとめて書き込む
+    # buffered は異常終了（SIGKILL・メモリ不足での強制終了など）の際に最大 FLUSH_INTERVAL 秒分の記録が失われるため、明示的に指定した場合のみ使う
+    "DURABILITY": os.environ.get("ACCOUNT_ACTIVITY_DURABILITY", "sync"),
+    # sync の場合に、最終ログイン日時・最終利用日時を更新する間隔（秒）。この間隔内の再ログインなどでは更新しない
+    "TOUCH_INTERVAL": int(os.environ.get("ACCOUNT_ACTIVITY_TOUCH_INTERVAL", "60")),
+    # buffered の場合に、溜めた記録を書き込む間隔（秒）と、間隔を待たずに書き込む件数（アカウント数）
+    "FLUSH_INTERVAL": int(os.environ.get("ACCOUNT_ACTIVITY_FLUSH_INTERVAL", "10")),
+    "MAX_PENDING": 1000,
+}
+
+# ヘルスチェック（npi.health）
+HEALTH_CHECK = {
+    # readiness で確認する依存先（database / cache / mail）。失敗した場合は 503 を返す
+    "CHECKS": ("database", "cache"),
+    # 結果を返すのみで、readiness の判定には含めない依存先
+    "INFORMATIONAL_CHECKS": ("mail",),
+    # 確認結果をプロセス内に保持する時間（秒）
+    "CACHE_SECONDS": int(os.environ.get("HEALTH_CHECK_CACHE_SECONDS", "5")),
+}
+
+# 掲載中のお知らせ一覧のキャッシュの最長有効期間（秒）
+# 掲載の開始・終了日時やお知らせの変更があった場合は、それより前に取り直す
+ANNOUNCEMENT_CACHE_TIMEOUT = 300
+
+# 認証済みユーザーのキャッシュ
+PRINCIPAL_CACHE = {
+    # プロセス内にも保持する件数（0の場合はプロセス内に保持しない）
+    # 他のワーカーでの変更・削除が反映されないため、複数のワーカーで動かす場合は0にすること
+    "MAX_SIZE": 0,
+    # 有効期間（秒）
+    "TTL": 30,
+    # 共有キャッシュのエイリアス（Noneの場合はキャッシュしない）
+    "CACHE_ALIAS": "default",
+}
+
+# 署名検証済みアクセストークンのキャッシュ
+VERIFIED_TOKEN_CACHE = {
+    # プロセス内に保持する件数（0の場合は保持しない）
+    "MAX_SIZE": 4096,
+}
+
+# データベース接続の設定
+# 接続を使い回す秒数（0の場合はリクエストごとに切断する）
+DATABASE_CONN_MAX_AGE = int(os.environ.get("DATABASE_CONN_MAX_AGE", "60"))
+
+# コネクションプールの方式
+# none: 持続的接続のみ / inprocess: プロセス内のプールを使う / pgbouncer: PgBouncer（transactionモード）経由で接続する
+DATABASE_POOL_MODE = os.environ.get("DATABASE_POOL_MODE", "none").lower()
+
+# プロセス内のコネクションプールの設定（DATABASE_POOL_MODE=inprocess の場合のみ有効）
+DATABASE_POOL = {
+    # 常に保持しておく接続数
+    "SIZE": int(os.environ.get("DATABASE_POOL_SIZE", "5")),
+    # SIZEを超えて一時的に作成できる接続数
+    "MAX_OVERFLOW": int(os.environ.get("DATABASE_POOL_MAX_OVERFLOW", "5")),
+    # 接続を作り直すまでの秒数
+    "RECYCLE": int(os.environ.get("DATABASE_POOL_RECYCLE", "1800")),
+    # 空き接続を待つ秒数
+    "TIMEOUT": float(os.environ.get("DATABASE_POOL_TIMEOUT", "10")),
+}
+
+
+def database_config(**params):
+    """
+    DATABASES の設定を DATABASE_POOL_MODE に応じて組み立てる
+    """
+    config = {
+        "ENGINE": "django.db.backends.postgresql",
+        "CONN_MAX_AGE": DATABASE_CONN_MAX_AGE,
+        # 使い回す接続がサーバー側で切断されていないか、リクエストの開始時に確認する
+        "CONN_HEALTH_CHECKS": True,
+        **params,
+    }
+    if DATABASE_POOL_MODE == "inprocess":
+        # 接続の保持はプールが行うため、リクエストごとにプールへ返却する
+        config["ENGINE"] = "npi.db.backends.postgresql"
+        config["CONN_MAX_AGE"] = 0
+        config["POOL"] = dict(DATABASE_POOL)
+    elif DATABASE_POOL_MODE == "pgbouncer":
+        # transactionモードではトランザクションをまたいでカーソルを保持できない
+        config["DISABLE_SERVER_SIDE_CURSORS"] = True
+    elif DATABASE_POOL_MODE != "none":
+        raise ValueError(f"DATABASE_POOL_MODE の値が不正です: {DATABASE_POOL_MODE}")
+    return config
+
+
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
@@ -159,5 +369,5 @@ AWS_SES_REGION_NAME = os.environ.get("AWS_REGION")
 AWS_SES_REGION_ENDPOINT = f"email.{AWS_SES_REGION_NAME}.amazonaws.com"
 
 # django-hosts の設定
-ROOT_HOSTCONF = 'npi.hosts'
-DEFAULT_HOST = 'user_app'
+ROOT_HOSTCONF = "npi.hosts"
+DEFAULT_HOST = "user_app"
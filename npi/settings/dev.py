@@ -1,20 +1,27 @@
 import os
 
+from django.core.exceptions import ImproperlyConfigured
+
 from .base import *  # noqa
 
 DEBUG = True
 
 DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.postgresql",
-        "NAME": os.getenv("DATABASE_NAME"),
-        "USER": os.getenv("DATABASE_USER"),
-        "PASSWORD": os.getenv("DATABASE_PASSWORD"),
-        "HOST": os.getenv("DATABASE_HOST", "localhost"),
-        "PORT": os.getenv("DATABASE_PORT", "5432"),
-    }
+    "default": database_config(
+        NAME=os.getenv("DATABASE_NAME"),
+        USER=os.getenv("DATABASE_USER"),
+        PASSWORD=os.getenv("DATABASE_PASSWORD"),
+        HOST=os.getenv("DATABASE_HOST", "localhost"),
+        PORT=os.getenv("DATABASE_PORT", "5432"),
+    )
 }
 
+# キャッシュは Redis が必須（未指定の場合は起動しない）
+if not REDIS_URL:  # noqa: F405
+    raise ImproperlyConfigured(
+        "環境変数 REDIS_URL にキャッシュ用の Redis の接続先を指定してください"
+    )
+
 EMAIL_BACKEND = "django_ses.SESBackend"
 
 SECURE_COOKIES = True
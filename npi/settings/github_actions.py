@@ -3,15 +3,23 @@ from .base import *  # noqa
 DEBUG = True
 
 DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.postgresql",
-        "NAME": "npi_db",
-        "USER": "npi",
-        "PASSWORD": "password",
-        "HOST": "localhost",
-        "PORT": "5432",
-    }
+    "default": database_config(
+        NAME="npi_db",
+        USER="npi",
+        PASSWORD="password",
+        HOST="localhost",
+        PORT="5432",
+    )
 }
 
+# テストは1プロセスで実行するため、キャッシュはプロセス内に保持する（クエリ数の検証にキャッシュの読み書きを含めない）
+CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
 SECURE_COOKIES = True
 HTTPONLY_COOKIES = True
+
+# テストの出力に計測結果を混ぜない
+REQUEST_METRICS = {**REQUEST_METRICS, "LOG": False}  # noqa: F405
+
+# テストのトランザクション内の変更はバックグラウンドのスレッドから見えないため、リクエストの中で書き込む
+ACCOUNT_ACTIVITY = {**ACCOUNT_ACTIVITY, "DURABILITY": "sync"}  # noqa: F405
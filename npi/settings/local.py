@@ -5,18 +5,28 @@ from .base import *  # noqa
 DEBUG = True
 
 DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.postgresql",
-        "NAME": os.getenv("DATABASE_NAME", "npi-db"),
-        "USER": os.getenv("DATABASE_USER", "npi"),
-        "PASSWORD": os.getenv("DATABASE_PASSWORD", "password"),
-        "HOST": os.getenv("DATABASE_HOST", "localhost"),
-        "PORT": os.getenv("DATABASE_PORT", "5435"),
-    }
+    "default": database_config(
+        NAME=os.getenv("DATABASE_NAME", "npi-db"),
+        USER=os.getenv("DATABASE_USER", "npi"),
+        PASSWORD=os.getenv("DATABASE_PASSWORD", "password"),
+        HOST=os.getenv("DATABASE_HOST", "localhost"),
+        PORT=os.getenv("DATABASE_PORT", "5435"),
+    )
 }
 
+# runserver（1プロセス）で動かすため、REDIS_URL を指定しない場合はプロセス内のキャッシュを使う
+if not REDIS_URL:  # noqa: F405
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
 EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
 
+# ローカルではブラウザの開発者ツールで計測結果を確認できるよう、Server-Timing ヘッダーを返す
+REQUEST_METRICS = {
+    **REQUEST_METRICS,  # noqa: F405
+    "SERVER_TIMING": os.environ.get("REQUEST_METRICS_SERVER_TIMING", "true").lower()
+    == "true",
+}
+
 SECURE_COOKIES = False
 HTTPONLY_COOKIES = False
 
@@ -0,0 +1,176 @@
+"""
+APIの性能の予算（クエリ数・DB時間・処理時間）を検証するテスト用のユーティリティ
+
+予算はビューの performance_budgets に HTTPメソッドごとに定義する。
+
+    class ContentsListCreateAPIView(APIView):
+        performance_budgets = {
+            "GET": {"queries": 3, "db_time": 0.05, "wall_time": 0.5},
+        }
+
+テストでは PerformanceBudgetMixin の assertWithinBudget で呼び出すと、
+予算を超えた場合に実行されたクエリの一覧とともに失敗する。
+クエリ数は常に検証する。DB時間・処理時間は実行環境の負荷で揺れるため、
+環境変数 PERFORMANCE_BUDGET_TIMING=true を指定した場合のみ検証する。
+"""
+
+import os
+import time
+from dataclasses import dataclass, field
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django_hosts.resolvers import reverse
+from rest_framework import status
+
+from shared.models import (
+    Account,
+    Permission,
+    Project,
+    Space,
+    SpaceAccount,
+    SpaceAccountPermission,
+)
+from shared.registry import permission_registry
+from user_app.contents.models import Contents
+
+# DB時間・処理時間の予算も検証するか（既定ではクエリ数のみ）
+TIME_BUDGETS_ENABLED = (
+    os.environ.get("PERFORMANCE_BUDGET_TIMING", "false").lower() == "true"
+)
+# CIなど遅い環境向けに、時間の予算に掛ける倍率
+TIME_BUDGET_FACTOR = float(os.environ.get("PERFORMANCE_BUDGET_TIME_FACTOR", "1"))
+
+
+@dataclass
+class Measurement:
+    """APIの1回の呼び出しの計測結果"""
+
+    wall_time: float
+    queries: list = field(default_factory=list)
+
+    @property
+    def query_count(self):
+        return len(self.queries)
+
+    @property
+    def db_time(self):
+        return sum(float(query["time"]) for query in self.queries)
+
+
+def get_performance_budget(view_class, method):
+    """ビューに定義された、HTTPメソッドの予算を取得（未定義の場合は None）"""
+    return getattr(view_class, "performance_budgets", {}).get(method.upper())
+
+
+class PerformanceBudgetMixin:
+    """
+    APITestCase に混ぜて使う
+    APIの呼び出しごとにクエリ数・DB時間・処理時間を計測し、ビューの予算と比較する
+    """
+
+    def set_up_space(self, permission_name, projects=1, contents_per_project=0):
+        """
+        予算の検証用のアカウント・スペース・権限・プロジェクト・コンテンツを作成してログインする
+        件数によってクエリ数が増えないことを確認するため、プロジェクト・コンテンツは複数作成できる
+        """
+        self.account1 = Account.objects.create(
+            email="test@example.com",
+            password=make_password("securepassword1"),
+            name="Test User",
+        )
+        self.space1 = Space.objects.create(
+            name="Test Space 1",
+            icon_image_path="path/to/icon1.png",
+            description="This is a test space description.",
+        )
+        self.space_id = self.space1.id
+        self.space_account1 = SpaceAccount.objects.create(
+            space=self.space1, account=self.account1
+        )
+        SpaceAccountPermission.objects.create(
+            space_account=self.space_account1,
+            permission=Permission.objects.create(name=permission_name),
+        )
+        for i in range(projects):
+            self.project = Project.objects.create(
+                name=f"Project {i}", space=self.space1, last_updated_at=timezone.now()
+            )
+            for j in range(contents_per_project):
+                self.contents = Contents.objects.create(
+                    name=f"Contents {j}",
+                    description="This is a test content description.",
+                    project=self.project,
+                    script_path="/path/to/script",
+                    last_updated_at=timezone.now(),
+                )
+
+        # JWTトークンの取得
+        login_response = self.client.post(
+            reverse("login", host="user_app"),
+            {"email": "test@example.com", "password": "securepassword1"},
+        )
+        self.assertEqual(login_response.status_code, status.HTTP_200_OK)
+        self.client.cookies["access_token"] = login_response.cookies.get(
+            "access_token"
+        ).value
+
+    def measure(self, method, url, data=None, **kwargs):
+        """APIを呼び出して計測する"""
+        with CaptureQueriesContext(connection) as context:
+            started_at = time.perf_counter()
+            response = getattr(self.client, method.lower())(url, data, **kwargs)
+            wall_time = time.perf_counter() - started_at
+        return response, Measurement(
+            wall_time=wall_time, queries=list(context.captured_queries)
+        )
+
+    def assertWithinBudget(self, method, url, data=None, warm_up=None, **kwargs):
+        """
+        APIを呼び出し、ビューの予算内に収まっていることを検証する
+        warm_up: 計測の前に1回呼び出してキャッシュを温める（省略時は GET の場合のみ）
+        """
+        # 権限マスタの変更時のみ発生する読み込みは、計測の対象外とする
+        permission_registry.load()
+        if warm_up is None:
+            warm_up = method.upper() == "GET"
+        if warm_up:
+            getattr(self.client, method.lower())(url, data, **kwargs)
+
+        response, measurement = self.measure(method, url, data, **kwargs)
+        view_class = response.resolver_match.func.view_class
+        budget = get_performance_budget(view_class, method)
+        if budget is None:
+            self.fail(
+                f"{view_class.__name__} に {method.upper()} の予算が定義されていません"
+            )
+
+        errors = []
+        if "queries" in budget and measurement.query_count > budget["queries"]:
+            errors.append(f"クエリ数: {measurement.query_count} > {budget['queries']}")
+        if (
+            TIME_BUDGETS_ENABLED
+            and "db_time" in budget
+            and measurement.db_time > budget["db_time"] * TIME_BUDGET_FACTOR
+        ):
+            errors.append(
+                f"DB時間: {measurement.db_time:.3f}s > {budget['db_time'] * TIME_BUDGET_FACTOR:.3f}s"
+            )
+        if (
+            TIME_BUDGETS_ENABLED
+            and "wall_time" in budget
+            and measurement.wall_time > budget["wall_time"] * TIME_BUDGET_FACTOR
+        ):
+            errors.append(
+                f"処理時間: {measurement.wall_time:.3f}s > {budget['wall_time'] * TIME_BUDGET_FACTOR:.3f}s"
+            )
+        if errors:
+            queries = "\n".join(f"  {query['sql']}" for query in measurement.queries)
+            self.fail(
+                f"{view_class.__name__} {method.upper()} {url} が予算を超えました\n"
+                + "\n".join(errors)
+                + f"\n実行されたクエリ:\n{queries}"
+            )
+        return response
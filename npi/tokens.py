@@ -0,0 +1,107 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.utils.timezone import localtime, now
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework_simplejwt.utils import aware_utcnow
+
+from npi.cache import LRUCache
+
+
+class VerifiedTokenCache:
+    """
+    署名検証済みアクセストークンのキャッシュ
+    トークンのダイジェストをキーに、有効期限（exp）までクレームを保持する
+    """
+
+    def __init__(self, max_size=4096):
+        self.cache = LRUCache(max_size, name="verified_token")
+
+    @classmethod
+    def from_settings(cls):
+        return cls(max_size=settings.VERIFIED_TOKEN_CACHE.get("MAX_SIZE", 4096))
+
+    @property
+    def stats(self):
+        return self.cache.stats
+
+    @staticmethod
+    def _key(raw_token):
+        return hashlib.sha256(raw_token.encode()).digest()
+
+    @staticmethod
+    def _build_token(raw_token, payload):
+        # 署名検証を行わずに、検証済みのクレームからトークンを生成
+        token = AccessToken.__new__(AccessToken)
+        token.token = raw_token
+        token.current_time = aware_utcnow()
+        token.payload = dict(payload)
+        return token
+
+    def get_access_token(self, raw_token):
+        """
+        アクセストークンを検証して返す
+        検証済みの場合は署名検証を省略し、有効期限のみ確認する
+        """
+        key = self._key(raw_token)
+        payload = self.cache.get(key)
+        if payload is not None:
+            token = self._build_token(raw_token, payload)
+            try:
+                token.check_exp()
+            except TokenError:
+                self.cache.delete(key)
+                raise
+            return token
+
+        token = AccessToken(raw_token)
+        ttl = token["exp"] - time.time()
+        if ttl > 0:
+            self.cache.set(key, dict(token.payload), ttl=ttl)
+        return token
+
+    def clear(self):
+        self.cache.clear()
+        self.stats.reset()
+
+
+_verified_token_cache = None
+
+
+def get_verified_token_cache():
+    """プロセスで共有する検証済みトークンのキャッシュを取得"""
+    global _verified_token_cache
+    if _verified_token_cache is None:
+        _verified_token_cache = VerifiedTokenCache.from_settings()
+    return _verified_token_cache
+
+
+def is_two_factor_authenticated(account, at=None):
+    """最後の2要素認証から TWO_FACTOR_AUTH_TIMEOUT が経っていないか"""
+    if not account.last_2fa_at:
+        return False
+    return localtime(
+        account.last_2fa_at
+    ) + settings.TWO_FACTOR_AUTH_TIMEOUT >= localtime(at or now())
+
+
+def rotate_refresh_token(refresh):
+    """
+    リフレッシュトークンを更新（SIMPLE_JWT["ROTATE_REFRESH_TOKENS"] の場合）
+    BLACKLIST_AFTER_ROTATION の場合は、更新前のトークンを1回だけブラックリストに登録する
+    戻り値: 新しいリフレッシュトークン（更新しない場合は None）
+    """
+    if not api_settings.ROTATE_REFRESH_TOKENS:
+        return None
+    if api_settings.BLACKLIST_AFTER_ROTATION:
+        # ブラックリストのアプリ（token_blacklist）を使わない場合は blacklist メソッドがない
+        blacklist = getattr(refresh, "blacklist", None)
+        if blacklist is not None:
+            blacklist()
+    refresh.set_jti()
+    refresh.set_exp()
+    refresh.set_iat()
+    return refresh
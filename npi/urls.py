@@ -16,10 +16,15 @@ Including another URLconf
 """
 
 from django.contrib import admin
-from django.http import HttpResponse
 from django.urls import path
 
+from npi.health import liveness_view, readiness_view
+from npi.metrics import metrics_view
+
 urlpatterns = [
     path("admin/", admin.site.urls),
-    path("health", lambda request: HttpResponse(status=200), name="health_check"),
+    path("health", liveness_view, name="health_check"),
+    path("health/live", liveness_view, name="health_live"),
+    path("health/ready", readiness_view, name="health_ready"),
+    path("metrics", metrics_view, name="metrics"),
 ]
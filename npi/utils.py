@@ -1,7 +1,19 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import EmptyPage, InvalidPage, PageNotAnInteger, Paginator
+from django.conf import settings
+from django.db.models import F, Q, QuerySet
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy
 from rest_framework import status
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 from rest_framework.pagination import PageNumberPagination
-from shared.models import SpaceAccountPermission
+
+from npi.counts import COUNT_NONE, COUNT_STRATEGIES, aget_count, get_count
 
 
 # エラーメッセージの定義
@@ -22,6 +34,13 @@ ERROR_MESSAGES = {
         "status": "error",
         "error": {"code": "NOT_FOUND", "message": "リソースが見つかりません"},
     },
+    "429_ERRORS": {
+        "status": "error",
+        "error": {
+            "code": "TOO_MANY_REQUESTS",
+            "message": "リクエストが多すぎます。しばらくしてから再度お試しください",
+        },
+    },
     "500_ERRORS": {
         "status": "error",
         "error": {
@@ -29,38 +48,422 @@ ERROR_MESSAGES = {
             "message": "サーバーエラーが発生しました",
         },
     },
+    "503_ERRORS": {
+        "status": "error",
+        "error": {
+            "code": "SERVICE_UNAVAILABLE",
+            "message": "混み合っています。しばらくしてから再度お試しください",
+        },
+    },
 }
 
 
+# 件数の取得方法（npi.counts）を指定できるPaginator
+class CountingPaginator(Paginator):
+
+    def __init__(self, object_list, per_page, count_strategy=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_strategy = count_strategy or settings.PAGINATION_COUNT["STRATEGY"]
+
+    @cached_property
+    def count(self):
+        return get_count(self.object_list, self.count_strategy)
+
+    def page(self, number):
+        """
+        指定のページ（行は遅延評価のまま）
+        件数はキャッシュ・推定値の場合に実際と異なるため、ページの範囲は件数で切り詰めずに LIMIT/OFFSET で取得する
+        （件数は total_items / total_pages の表示にのみ使い、存在しないページかどうかは取得した行で判定する）
+        """
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(gettext_lazy("That page number is not an integer"))
+        if number < 1:
+            raise EmptyPage(gettext_lazy("That page number is less than 1"))
+        bottom = (number - 1) * self.per_page
+        return self._get_page(
+            self.object_list[bottom : bottom + self.per_page], number, self
+        )
+
+    def finish_page(self, page):
+        """
+        取得したページの行を確認（行がない場合は EmptyPage）
+        件数が実際より少ない場合も、表示する件数には取得したページまでの行を含める
+        """
+        if not page.object_list and page.number > 1:
+            raise EmptyPage(gettext_lazy("That page contains no results"))
+        seen = (page.number - 1) * self.per_page + len(page.object_list)
+        if self.count < seen:
+            self.count = seen
+        return page
+
+
+# 件数の取得方法の指定（count=cached / estimate / none など）
+COUNT_QUERY_PARAM = "count"
+
+
+def get_count_strategy(request, default=None):
+    """リクエストで指定された件数の取得方法（未指定・不正な場合は default）"""
+    strategy = request.GET.get(COUNT_QUERY_PARAM)
+    if strategy in COUNT_STRATEGIES:
+        return strategy
+    return default or settings.PAGINATION_COUNT["STRATEGY"]
+
+
 # 共通のページネーション付きレスポンス
 class CustomPagination(PageNumberPagination):
 
     page_size_query_param = "per_page"
     max_page_size = 100
+    django_paginator_class = CountingPaginator
+
+    def __init__(self, count_strategy=None):
+        self.count_strategy = count_strategy or settings.PAGINATION_COUNT["STRATEGY"]
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.count_strategy == COUNT_NONE:
+            return self._finish_without_count(
+                list(self._page_without_count(queryset, request))
+            )
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(
+            queryset, page_size, count_strategy=self.count_strategy
+        )
+        page_number = self.get_page_number(request, paginator)
+        page = self._get_page(paginator, page_number)
+        page.object_list = list(page.object_list)
+        return self._finish_page(paginator, page, request)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset の非同期版（件数とページの取得に非同期ORMを使う）"""
+        if self.count_strategy == COUNT_NONE:
+            rows = self._page_without_count(queryset, request)
+            if isinstance(rows, QuerySet):
+                rows = [obj async for obj in rows]
+            return self._finish_without_count(list(rows))
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(
+            queryset, page_size, count_strategy=self.count_strategy
+        )
+        # 件数は事前に取得しておく（Paginator.count はキャッシュされるプロパティ）
+        paginator.count = await aget_count(queryset, self.count_strategy)
+        page_number = self.get_page_number(request, paginator)
+        page = self._get_page(paginator, page_number)
+        if isinstance(page.object_list, QuerySet):
+            page.object_list = [obj async for obj in page.object_list]
+        else:
+            page.object_list = list(page.object_list)
+        return self._finish_page(paginator, page, request)
+
+    def _get_page(self, paginator, page_number):
+        try:
+            return paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(
+                self.invalid_page_message.format(
+                    page_number=page_number, message=str(exc)
+                )
+            )
+
+    def _finish_page(self, paginator, page, request):
+        try:
+            self.page = paginator.finish_page(page)
+        except InvalidPage as exc:
+            raise NotFound(
+                self.invalid_page_message.format(
+                    page_number=page.number, message=str(exc)
+                )
+            )
+        self.request = request
+        return list(self.page)
+
+    def _page_without_count(self, queryset, request):
+        """件数を取得しない場合のページの範囲（次のページの有無の判定のため1件多く取得する）"""
+        try:
+            self.page_size_value = int(self.get_page_size(request))
+            self.page_number = int(request.GET.get(self.page_query_param, 1))
+            if self.page_number < 1:
+                raise ValueError
+        except ValueError:
+            raise NotFound(
+                self.invalid_page_message.format(
+                    page_number=request.GET.get(self.page_query_param), message=""
+                )
+            )
+        self.request = request
+        offset = (self.page_number - 1) * self.page_size_value
+        return queryset[offset : offset + self.page_size_value + 1]
+
+    def _finish_without_count(self, rows):
+        if not rows and self.page_number > 1:
+            raise NotFound(
+                self.invalid_page_message.format(
+                    page_number=self.page_number, message=""
+                )
+            )
+        self.has_next = len(rows) > self.page_size_value
+        self.page = rows[: self.page_size_value]
+        return self.page
+
+    def get_paginated_response(self, data):
+        if self.count_strategy == COUNT_NONE:
+            pagination = {
+                "current_page": self.page_number,
+                "per_page": self.page_size_value,
+                "has_next": self.has_next,
+            }
+        else:
+            pagination = {
+                "current_page": self.page.number,
+                "per_page": self.page.paginator.per_page,
+                "total_pages": self.page.paginator.num_pages,
+                "total_items": self.page.paginator.count,
+            }
+        return Response(
+            {"status": "success", "data": data, "pagination": pagination},
+            status=status.HTTP_200_OK,
+        )
+
+
+# キーセット（カーソル）方式のページネーション
+# OFFSETと件数の取得を行わず、前のページの最後の行のキーより後ろを取得する
+class KeysetPagination:
+
+    page_size = 10
+    page_size_query_param = "per_page"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    # 並び順の指定（orderings のキー）
+    ordering_query_param = "order"
+    # true の場合のみ total_items を返す（件数の取得は重いため既定では行わない）
+    count_query_param = "with_count"
+    invalid_cursor_message = "カーソルが無効です"
+
+    def __init__(self, orderings, count_strategy=None):
+        """
+        orderings: 並び順の名前 → 並び順のフィールド（"-" 始まりは降順、最後は一意なキー）
+        例: {"id": ("id",), "last_updated_at": ("-last_updated_at", "-id")}
+        """
+        self.orderings = orderings
+        self.count_strategy = count_strategy or settings.PAGINATION_COUNT["STRATEGY"]
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.GET.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def get_keys(self, request):
+        self.ordering_name = request.GET.get(self.ordering_query_param) or next(
+            iter(self.orderings)
+        )
+        if self.ordering_name not in self.orderings:
+            raise NotFound(self.invalid_cursor_message)
+        # (フィールド名, 降順かどうか)
+        return [
+            (field.lstrip("-"), field.startswith("-"))
+            for field in self.orderings[self.ordering_name]
+        ]
+
+    def decode_cursor(self, request, keys, model=None):
+        encoded = request.GET.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            if cursor["order"] != self.ordering_name or len(cursor["values"]) != len(
+                keys
+            ):
+                raise ValueError
+            values = cursor["values"]
+            if model is not None:
+                values = [
+                    (
+                        None
+                        if value is None
+                        else model._meta.get_field(name).to_python(value)
+                    )
+                    for (name, _), value in zip(keys, values)
+                ]
+        except (binascii.Error, ValueError, KeyError, TypeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    def encode_cursor(self, keys, item):
+        values = []
+        for name, _ in keys:
+            value = item[name] if isinstance(item, dict) else getattr(item, name)
+            values.append(value.isoformat() if hasattr(value, "isoformat") else value)
+        cursor = json.dumps({"order": self.ordering_name, "values": values})
+        return base64.urlsafe_b64encode(cursor.encode()).decode()
+
+    @staticmethod
+    def _nullable(model, name):
+        return model._meta.get_field(name).null
+
+    def _order_by(self, model, keys):
+        # NULLは最後に並べる
+        return [
+            (
+                (
+                    F(name).desc(nulls_last=True)
+                    if descending
+                    else F(name).asc(nulls_last=True)
+                )
+                if self._nullable(model, name)
+                else (F(name).desc() if descending else F(name).asc())
+            )
+            for name, descending in keys
+        ]
+
+    def _after(self, model, keys, values):
+        """カーソルより後ろの行の条件（辞書順での比較）"""
+        condition = Q(pk__in=[])
+        equal = Q()
+        for (name, descending), value in zip(keys, values):
+            nullable = self._nullable(model, name)
+            if value is None:
+                # NULLは最後に並ぶため、同じ値（NULL）の中でのみ後ろの行がある
+                equal &= Q(**{f"{name}__isnull": True})
+                continue
+            beyond = Q(**{f"{name}__{'lt' if descending else 'gt'}": value})
+            if nullable:
+                beyond |= Q(**{f"{name}__isnull": True})
+            condition |= equal & beyond
+            equal &= Q(**{name: value})
+        return condition
+
+    def _list_after(self, items, keys, values):
+        """paginate_queryset にリストを渡した場合の絞り込み（並び順は呼び出し側で揃えておく）"""
+
+        def position(item):
+            return [
+                item[name] if isinstance(item, dict) else getattr(item, name)
+                for name, _ in keys
+            ]
+
+        def is_after(item):
+            for (_, descending), value, cursor_value in zip(
+                keys, position(item), values
+            ):
+                if value == cursor_value:
+                    continue
+                if value is None or cursor_value is None:
+                    return value is None
+                return value < cursor_value if descending else value > cursor_value
+            return False
+
+        return [item for item in items if is_after(item)]
+
+    def _prepare(self, queryset, request):
+        self.request = request
+        self.page_size_value = self.get_page_size(request)
+        self.keys = self.get_keys(request)
+        self.with_count = request.GET.get(self.count_query_param, "").lower() == "true"
+        if not isinstance(queryset, QuerySet):
+            values = self.decode_cursor(request, self.keys)
+            return queryset, (
+                list(queryset)
+                if values is None
+                else self._list_after(queryset, self.keys, values)
+            )
+
+        model = queryset.model
+        values = self.decode_cursor(request, self.keys, model)
+        ordered = queryset.order_by(*self._order_by(model, self.keys))
+        page_queryset = (
+            ordered
+            if values is None
+            else ordered.filter(self._after(model, self.keys, values))
+        )
+        # 次のページの有無を判定するため、1件多く取得する
+        return ordered, page_queryset[: self.page_size_value + 1]
+
+    def _finish(self, rows):
+        self.has_next = len(rows) > self.page_size_value
+        self.page = list(rows[: self.page_size_value])
+        self.next_cursor = (
+            self.encode_cursor(self.keys, self.page[-1]) if self.has_next else None
+        )
+        return self.page
+
+    def paginate_queryset(self, queryset, request, view=None):
+        ordered, rows = self._prepare(queryset, request)
+        if not isinstance(ordered, QuerySet):
+            self.total_items = len(ordered) if self.with_count else None
+            return self._finish(rows)
+        self.total_items = (
+            get_count(ordered, self.count_strategy) if self.with_count else None
+        )
+        return self._finish(list(rows))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset の非同期版"""
+        ordered, rows = self._prepare(queryset, request)
+        if not isinstance(ordered, QuerySet):
+            self.total_items = len(ordered) if self.with_count else None
+            return self._finish(rows)
+        self.total_items = (
+            await aget_count(ordered, self.count_strategy) if self.with_count else None
+        )
+        return self._finish([obj async for obj in rows])
 
     def get_paginated_response(self, data):
+        pagination = {
+            "per_page": self.page_size_value,
+            "next_cursor": self.next_cursor,
+            "has_next": self.has_next,
+        }
+        if self.total_items is not None:
+            pagination["total_items"] = self.total_items
         return Response(
-            {
-                "status": "success",
-                "data": data,
-                "pagination": {
-                    "current_page": self.page.number,
-                    "per_page": self.page.paginator.per_page,
-                    "total_pages": self.page.paginator.num_pages,
-                    "total_items": self.page.paginator.count,
-                },
-            },
+            {"status": "success", "data": data, "pagination": pagination},
             status=status.HTTP_200_OK,
         )
 
 
-# ユーザーがそのスペースでの対象の操作権限があるかチェック
-def check_space_permission(user, space_id, permissions):
-    return SpaceAccountPermission.objects.filter(
-        space_account__space_id=space_id,
-        space_account__account=user,
-        space_account__deleted_at__isnull=True,
-        permission__id__in=permissions,
-        permission__deleted_at__isnull=True,
-        deleted_at__isnull=True
-    ).exists()
+# ページネーション方式の指定（pagination=cursor の場合はキーセット方式）
+PAGINATION_QUERY_PARAM = "pagination"
+
+
+def is_cursor_pagination(request):
+    """キーセット方式のページネーションが指定されているか"""
+    return request.GET.get(PAGINATION_QUERY_PARAM) == "cursor"
+
+
+def list_params_error(request):
+    """
+    一覧取得の必須パラメータ（page・per_page）のチェック
+    不足している場合は400エラーのレスポンス、問題ない場合は None を返す
+    """
+    if request.GET.get("page") is None and not is_cursor_pagination(request):
+        return Response(
+            ERROR_MESSAGES["400_ERRORS"], status=status.HTTP_400_BAD_REQUEST
+        )
+    if request.GET.get("per_page") is None:
+        return Response(
+            ERROR_MESSAGES["400_ERRORS"], status=status.HTTP_400_BAD_REQUEST
+        )
+    return None
+
+
+def get_paginator(request, orderings, count_strategy=None):
+    """リクエストで指定された方式のページネーションを作成"""
+    count_strategy = get_count_strategy(request, count_strategy)
+    if is_cursor_pagination(request):
+        return KeysetPagination(orderings, count_strategy)
+    paginator = CustomPagination(count_strategy)
+    paginator.page_size = request.GET.get("per_page", 10)
+    return paginator
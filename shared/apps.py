@@ -4,3 +4,20 @@ from django.apps import AppConfig
 class SharedConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "shared"
+
+    def ready(self):
+        # シグナルの登録
+        from shared import signals  # noqa: F401
+        from django.db.backends.signals import connection_created
+        from npi.health import register_warm_up
+        from npi.instrumentation import install_query_recorder
+        from shared.registry import permission_registry
+
+        # リクエストごとのSQLの件数と処理時間の計測
+        connection_created.connect(
+            install_query_recorder, dispatch_uid="npi.instrumentation"
+        )
+
+        # 権限マスタは各ワーカーの起動時・readiness の前に読み込む
+        # （ready ではDBに問い合わせない。管理コマンドやテストDBの作成前にも呼ばれるため）
+        register_warm_up("permission_registry", permission_registry.load)
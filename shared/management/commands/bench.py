@@ -0,0 +1,131 @@
+import functools
+import json
+import platform
+import subprocess
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from npi.bench import (
+    DEFAULT_HOST,
+    HttpClient,
+    InProcessClient,
+    find_targets,
+    run_benchmark,
+)
+from npi.seed import seed_dataset
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = "user_app のAPIに同時にリクエストを送り、RPS・レイテンシ・クエリ数をJSONに書き出す（検証用DBで実行すること）"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seed", action="store_true", help="計測の前に検証用のデータを投入する"
+        )
+        parser.add_argument(
+            "--accounts", type=int, default=100_000, help="投入するアカウント数"
+        )
+        parser.add_argument(
+            "--spaces", type=int, default=5_000, help="投入するスペース数"
+        )
+        parser.add_argument(
+            "--spaces-per-account",
+            type=int,
+            default=3,
+            help="アカウントあたりの所属スペース数",
+        )
+        parser.add_argument(
+            "--projects-per-space",
+            type=int,
+            default=10,
+            help="スペースあたりのプロジェクト数",
+        )
+        parser.add_argument(
+            "--contents-per-project",
+            type=int,
+            default=5,
+            help="プロジェクトあたりのコンテンツ数",
+        )
+        parser.add_argument(
+            "--password", default="password", help="投入するアカウントのパスワード"
+        )
+        parser.add_argument(
+            "--clients", type=int, default=10, help="同時に実行するクライアント数"
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=50,
+            help="クライアントあたり・APIあたりのリクエスト数",
+        )
+        parser.add_argument(
+            "--per-page", type=int, default=10, help="一覧APIの1ページの件数"
+        )
+        parser.add_argument(
+            "--base-url",
+            help="起動済みのサーバーのURL（省略時はプロセス内でアプリを呼び出す）",
+        )
+        parser.add_argument("--host", default=DEFAULT_HOST, help="Hostヘッダー")
+        parser.add_argument(
+            "--output", default="bench.json", help="結果を書き出すJSONファイル"
+        )
+
+    def handle(self, *args, **options):
+        if options["seed"]:
+            seed_dataset(
+                accounts=options["accounts"],
+                spaces=options["spaces"],
+                spaces_per_account=options["spaces_per_account"],
+                projects_per_space=options["projects_per_space"],
+                contents_per_project=options["contents_per_project"],
+                password=options["password"],
+                log=self.stdout.write,
+            )
+
+        targets = find_targets(options["clients"])
+        if len(targets) < options["clients"]:
+            raise CommandError(
+                "計測に使えるアカウントが足りません。--seed を指定してデータを投入してください"
+            )
+
+        if options["base_url"]:
+            make_client = functools.partial(
+                HttpClient, options["base_url"], options["host"]
+            )
+        else:
+            make_client = functools.partial(InProcessClient, options["host"])
+
+        endpoints = run_benchmark(
+            targets,
+            make_client,
+            password=options["password"],
+            requests_per_client=options["requests"],
+            per_page=options["per_page"],
+            log=self.stdout.write,
+        )
+        report = {
+            "commit": _git_commit(),
+            "measured_at": timezone.now().isoformat(),
+            "mode": "http" if options["base_url"] else "in_process",
+            "database": connection.vendor,
+            "python": platform.python_version(),
+            "clients": options["clients"],
+            "requests_per_client": options["requests"],
+            "endpoints": endpoints,
+        }
+        with open(options["output"], "w") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        self.stdout.write(
+            self.style.SUCCESS(f"結果を {options['output']} に書き出しました")
+        )
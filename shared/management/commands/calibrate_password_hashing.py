@@ -0,0 +1,28 @@
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.core.management.base import BaseCommand
+
+from npi.hashers import calibrate_iterations, measure_iterations
+
+
+class Command(BaseCommand):
+    help = "この環境でパスワードの検証が目標の時間になる PBKDF2 の反復回数を算出する（本番と同じCPUの環境で実行すること）"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--target-ms", type=float, default=250, help="目標の検証時間（ミリ秒）"
+        )
+        parser.add_argument("--samples", type=int, default=5, help="計測の回数")
+
+    def handle(self, *args, **options):
+        iterations = calibrate_iterations(
+            options["target_ms"] / 1000, samples=options["samples"]
+        )
+        # 算出した反復回数で計測し直して確認する
+        duration = measure_iterations(iterations, samples=options["samples"])
+        self.stdout.write(f"iterations: {iterations} ({duration * 1000:.1f} ms)")
+        if iterations < PBKDF2PasswordHasher.iterations:
+            self.stderr.write(
+                f"Django の既定値（{PBKDF2PasswordHasher.iterations}）より少ない反復回数です。"
+                "目標の検証時間とタスクのCPUの割り当てを見直してください"
+            )
+        self.stdout.write(f"PASSWORD_HASHING_ITERATIONS={iterations}")
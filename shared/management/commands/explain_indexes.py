@@ -0,0 +1,154 @@
+import json
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from npi.permissions import _space_permission_rows
+from npi.seed import seed_dataset
+from shared.models import Project, SpaceAccount, SpaceAccountPermission
+from user_app.contents.models import Contents
+
+# 比較対象の部分インデックスを持つモデル
+INDEXED_MODELS = (SpaceAccount, SpaceAccountPermission, Project, Contents)
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _partial_index_names():
+    return [
+        index.name
+        for model in INDEXED_MODELS
+        for index in model._meta.indexes
+        if index.condition is not None
+    ]
+
+
+def _hot_queries():
+    """論理削除の条件付きで頻繁に実行されるクエリ（一覧・権限の解決）"""
+    space_account = (
+        SpaceAccount.objects.filter(deleted_at__isnull=True).order_by("id").first()
+    )
+    project = (
+        Project.objects.filter(deleted_at__isnull=True, space__deleted_at__isnull=True)
+        .order_by("id")
+        .first()
+    )
+    if space_account is None or project is None:
+        raise CommandError(
+            "検証用のデータがありません。--seed を指定してデータを投入してください"
+        )
+    return {
+        "所属スペースの一覧": SpaceAccount.objects.filter(
+            account_id=space_account.account_id, deleted_at__isnull=True
+        ).values_list("space_id", flat=True),
+        "スペース権限の解決": _space_permission_rows(space_account.account_id),
+        "プロジェクトの一覧": Project.objects.filter(
+            space_id=project.space_id, deleted_at__isnull=True
+        ).order_by("id")[:20],
+        "プロジェクトの取得": Project.objects.filter(
+            id=project.id, space_id=project.space_id, deleted_at__isnull=True
+        ),
+        "コンテンツの一覧": Contents.objects.filter(
+            project_id=project.id, deleted_at__isnull=True
+        ).order_by("id")[:20],
+    }
+
+
+def _explain(queries):
+    results = {}
+    for label, queryset in queries.items():
+        plan = queryset.explain(analyze=True, buffers=True)
+        match = re.search(r"Execution Time: ([\d.]+) ms", plan)
+        results[label] = {
+            "execution_ms": float(match.group(1)) if match else None,
+            "plan": plan,
+        }
+    return results
+
+
+class Command(BaseCommand):
+    help = "論理削除用の部分インデックスの有無で、主要なクエリの実行計画を比較する（PostgreSQLのみ）"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seed", action="store_true", help="比較の前に検証用のデータを投入する"
+        )
+        parser.add_argument(
+            "--accounts", type=int, default=1_000_000, help="投入するアカウント数"
+        )
+        parser.add_argument(
+            "--spaces", type=int, default=10_000, help="投入するスペース数"
+        )
+        parser.add_argument(
+            "--spaces-per-account",
+            type=int,
+            default=3,
+            help="アカウントあたりの所属スペース数",
+        )
+        parser.add_argument(
+            "--projects-per-space",
+            type=int,
+            default=50,
+            help="スペースあたりのプロジェクト数",
+        )
+        parser.add_argument(
+            "--contents-per-project",
+            type=int,
+            default=5,
+            help="プロジェクトあたりのコンテンツ数",
+        )
+        parser.add_argument(
+            "--deleted-ratio",
+            type=float,
+            default=0.3,
+            help="論理削除済みにする行の割合",
+        )
+        parser.add_argument("--output", help="結果をJSONで書き出すファイル")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("このコマンドはPostgreSQLでのみ実行できます")
+
+        if options["seed"]:
+            seed_dataset(
+                accounts=options["accounts"],
+                spaces=options["spaces"],
+                spaces_per_account=options["spaces_per_account"],
+                projects_per_space=options["projects_per_space"],
+                contents_per_project=options["contents_per_project"],
+                deleted_ratio=options["deleted_ratio"],
+                log=self.stdout.write,
+            )
+
+        queries = _hot_queries()
+        index_names = _partial_index_names()
+
+        # インデックスを削除した状態で計測し、ロールバックして元に戻す
+        try:
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    for name in index_names:
+                        cursor.execute(f"DROP INDEX {connection.ops.quote_name(name)}")
+                before = _explain(queries)
+                raise _Rollback
+        except _Rollback:
+            pass
+        after = _explain(queries)
+
+        for label in queries:
+            self.stdout.write(self.style.MIGRATE_HEADING(f"== {label}"))
+            for phase, results in (("before", before), ("after", after)):
+                self.stdout.write(f"-- {phase}: {results[label]['execution_ms']} ms")
+                self.stdout.write(results[label]["plan"])
+
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump(
+                    {"indexes": index_names, "before": before, "after": after},
+                    f,
+                    ensure_ascii=False,
+                    indent=2,
+                )
@@ -0,0 +1,69 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from npi.server import (
+    GunicornApplication,
+    build_options,
+    check_shared_caches,
+    prepare_metrics_dir,
+)
+
+
+class Command(BaseCommand):
+    help = "本番用のアプリケーションサーバー（gunicorn）を起動する"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--bind", default="0.0.0.0:8000", help="待ち受けるアドレス")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="ワーカー数（省略時はCPU・メモリの上限から算出）",
+        )
+        parser.add_argument(
+            "--threads", type=int, help="ワーカーあたりのスレッド数（WSGIの場合のみ）"
+        )
+        parser.add_argument(
+            "--asgi",
+            action="store_true",
+            default=settings.ASYNC_VIEWS,
+            help="ASGI（uvicornワーカー）で起動する（ASYNC_VIEWS=true の場合は既定で有効）",
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true", help="設定を表示して終了する"
+        )
+
+    def handle(self, *args, **options):
+        server_options = build_options(
+            bind=options["bind"],
+            workers=options["workers"],
+            threads=options["threads"],
+            asgi=options["asgi"],
+        )
+        for key in (
+            "bind",
+            "worker_class",
+            "workers",
+            "threads",
+            "preload_app",
+            "graceful_timeout",
+        ):
+            if key in server_options:
+                self.stdout.write(f"{key}: {server_options[key]}")
+
+        # 複数のワーカーで動かす場合は、キャッシュをワーカー間で共有する必要がある
+        problems = check_shared_caches(server_options["workers"])
+        if problems:
+            raise CommandError(
+                "複数のワーカーで起動するには、ワーカー間で共有するキャッシュを設定してください: "
+                + " / ".join(problems)
+            )
+        if options["dry_run"]:
+            return
+
+        prepare_metrics_dir()
+        # アプリケーションを読み込んでからワーカーをforkする
+        if options["asgi"]:
+            from npi.asgi import application
+        else:
+            from npi.wsgi import application
+        GunicornApplication(application, server_options).run()
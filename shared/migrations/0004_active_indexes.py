@@ -0,0 +1,40 @@
+# Generated by Django 4.2.16 on 2026-10-18 17:40
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # 本番のテーブルへの書き込みを止めないよう、インデックスはトランザクションの外で CONCURRENTLY で作成する
+    atomic = False
+
+    dependencies = [
+        ("shared", "0003_account_last_2fa_at"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="project",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", True)),
+                fields=["space", "id"],
+                name="project_space_active_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="spaceaccount",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", True)),
+                fields=["account", "space"],
+                name="space_acc_account_active_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="spaceaccountpermission",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", True)),
+                fields=["space_account", "permission"],
+                name="space_acc_perm_active_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.16 on 2026-10-18 17:42
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # 本番のテーブルへの書き込みを止めないよう、インデックスはトランザクションの外で CONCURRENTLY で作成する
+    atomic = False
+
+    dependencies = [
+        ("shared", "0004_active_indexes"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="announcement",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", True)),
+                fields=["announcements_from_at", "announcements_to_at"],
+                name="announcement_active_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shared", "0005_announcement_active_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="account",
+            name="last_active_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
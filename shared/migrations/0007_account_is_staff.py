@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shared", "0006_account_last_active_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="account",
+            name="is_staff",
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -1,4 +1,3 @@
-from django.contrib.auth.hashers import check_password
 from django.db import models
 import uuid
 from django.utils.timezone import now
@@ -12,18 +11,20 @@ class Account(models.Model):
     secret_key = models.CharField(max_length=32, null=True, blank=True)
     last_2fa_at = models.DateTimeField(null=True, blank=True)
     last_login_at = models.DateTimeField(null=True, blank=True)
+    # 最後にログインまたはトークンを更新した日時（npi.activity で記録する）
+    last_active_at = models.DateTimeField(null=True, blank=True)
     reset_token = models.CharField(
         max_length=128,
         blank=True,
         null=True,
-        help_text="パスワードリセット用のトークン"
+        help_text="パスワードリセット用のトークン",
     )
     token_expiration = models.DateTimeField(
-        blank=True,
-        null=True,
-        help_text="トークンの有効期限"
+        blank=True, null=True, help_text="トークンの有効期限"
     )
     deleted_at = models.DateTimeField(null=True, blank=True)
+    # 運用担当者（一括送信などの運用向けのAPIを利用できる）
+    is_staff = models.BooleanField(default=False)
 
     @property
     def is_authenticated(self):
@@ -35,8 +36,17 @@ class Account(models.Model):
     def check_password(self, raw_password):
         """
         パスワードを検証
+        ハッシュの計算は npi.hashing で同時実行数を制限して行う（混み合っている場合は npi.hashing.HashingUnavailable）
+        設定のハッシュ方式・反復回数（PASSWORD_HASHING）と異なる場合は、検証に成功した時点でハッシュし直す
         """
-        return check_password(raw_password, self.password)
+        # モデルの読み込み時に、ハッシュ計算の実行環境（DRF・メトリクス）まで読み込まないよう、ここで読み込む
+        from npi.hashing import verify_password
+
+        is_correct, upgraded = verify_password(raw_password, self.password)
+        if is_correct and upgraded and self.pk is not None:
+            self.password = upgraded
+            self.save(update_fields=["password"])
+        return is_correct
 
     def is_reset_token_valid(self):
         """トークンが有効かをチェックする"""
@@ -56,6 +66,16 @@ class Announcement(models.Model):
     )
     deleted_at = models.DateTimeField(null=True, blank=True, verbose_name="削除日時")
 
+    class Meta:
+        indexes = [
+            # 掲載期間での絞り込み（掲載開始日時・終了日時 + 未削除）
+            models.Index(
+                fields=["announcements_from_at", "announcements_to_at"],
+                name="announcement_active_idx",
+                condition=models.Q(deleted_at__isnull=True),
+            ),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -89,6 +109,14 @@ class SpaceAccount(models.Model):
 
     class Meta:
         db_table = "space_accounts"
+        indexes = [
+            # 所属スペースの一覧・権限の解決（account_id + 未削除）
+            models.Index(
+                fields=["account", "space"],
+                name="space_acc_account_active_idx",
+                condition=models.Q(deleted_at__isnull=True),
+            ),
+        ]
 
 
 class Permission(models.Model):
@@ -114,16 +142,54 @@ class SpaceAccountPermission(models.Model):
 
     class Meta:
         db_table = "space_accounts_permissions"
+        indexes = [
+            # スペースアカウントに付与された権限の参照（space_account_id + 未削除）
+            models.Index(
+                fields=["space_account", "permission"],
+                name="space_acc_perm_active_idx",
+                condition=models.Q(deleted_at__isnull=True),
+            ),
+        ]
 
 
 class Project(models.Model):
     id = models.BigAutoField(primary_key=True, verbose_name="プロジェクトID")
-    logical_project_id = models.UUIDField(default=uuid.uuid4, editable=False, unique=True, verbose_name="論理プロジェクトID")
-    name = models.CharField(null=False, blank=False, max_length=100, verbose_name="プロジェクト名", help_text="全角100文字以内")
-    description = models.TextField(null=False, blank=True, verbose_name="プロジェクトの説明", help_text="全角1000文字以内")
-    last_updated_at = models.DateTimeField(null=True, blank=True, verbose_name="最終更新日時")
-    space = models.ForeignKey(Space, on_delete=models.CASCADE, verbose_name="スペースID")
+    logical_project_id = models.UUIDField(
+        default=uuid.uuid4,
+        editable=False,
+        unique=True,
+        verbose_name="論理プロジェクトID",
+    )
+    name = models.CharField(
+        null=False,
+        blank=False,
+        max_length=100,
+        verbose_name="プロジェクト名",
+        help_text="全角100文字以内",
+    )
+    description = models.TextField(
+        null=False,
+        blank=True,
+        verbose_name="プロジェクトの説明",
+        help_text="全角1000文字以内",
+    )
+    last_updated_at = models.DateTimeField(
+        null=True, blank=True, verbose_name="最終更新日時"
+    )
+    space = models.ForeignKey(
+        Space, on_delete=models.CASCADE, verbose_name="スペースID"
+    )
     deleted_at = models.DateTimeField(null=True, blank=True, verbose_name="削除日時")
 
+    class Meta:
+        indexes = [
+            # スペース内のプロジェクトの一覧・取得（space_id + 未削除）
+            models.Index(
+                fields=["space", "id"],
+                name="project_space_active_idx",
+                condition=models.Q(deleted_at__isnull=True),
+            ),
+        ]
+
     def __str__(self):
         return self.name
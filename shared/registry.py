@@ -0,0 +1,100 @@
+import threading
+import time
+from typing import Final
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from npi.cache import get_version, bump_version
+from shared.models import Permission
+
+# キャッシュのバージョン管理に使う名前空間
+CACHE_NAMESPACE = "permission_registry"
+
+# 未知の権限IDによる再読み込みの最短間隔（秒）
+MIN_RELOAD_INTERVAL = 1
+
+
+class PERM:
+    """権限名の定数"""
+
+    space_admin: Final = "space_admin"
+    creator: Final = "creator"
+    # DB上の権限名に合わせている
+    distributor: Final = "disrtibutor"
+    viewer: Final = "viewer"
+
+
+class PermissionRegistry:
+    """
+    権限名 → 権限IDの対応表をプロセス内に保持する
+    権限マスタの変更はシグナルとバージョン番号で検知して再読み込みする
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids = None
+        self._names = {}
+        self._known_ids = frozenset()
+        self._version = None
+        self._loaded_at = 0.0
+        self._checked_at = 0.0
+
+    @property
+    def is_warm(self):
+        return self._ids is not None
+
+    def load(self):
+        """DBから権限マスタを読み込む"""
+        with self._lock:
+            version = get_version(CACHE_NAMESPACE)
+            rows = list(Permission.objects.values_list("id", "name", "deleted_at"))
+            self._ids = {
+                name: id for id, name, deleted_at in rows if deleted_at is None
+            }
+            self._names = {id: name for name, id in self._ids.items()}
+            self._known_ids = frozenset(id for id, _, _ in rows)
+            self._version = version
+            self._loaded_at = self._checked_at = time.monotonic()
+
+    def invalidate(self):
+        """全プロセスの対応表を無効化"""
+        bump_version(CACHE_NAMESPACE)
+        # 次回参照時にバージョンを確認させる
+        self._checked_at = 0.0
+
+    def _needs_load(self, permission_ids=()):
+        if self._ids is None:
+            return True
+        now = time.monotonic()
+        if now - self._checked_at >= settings.PERMISSION_REGISTRY_CHECK_INTERVAL:
+            self._checked_at = now
+            if get_version(CACHE_NAMESPACE) != self._version:
+                return True
+        # 他プロセスで追加された権限の可能性があるため再読み込み
+        return now - self._loaded_at >= MIN_RELOAD_INTERVAL and any(
+            permission_id not in self._known_ids for permission_id in permission_ids
+        )
+
+    def ensure_loaded(self, permission_ids=()):
+        """必要に応じて権限マスタを（再）読み込みする"""
+        if self._needs_load(permission_ids):
+            self.load()
+
+    async def aensure_loaded(self, permission_ids=()):
+        """ensure_loaded の非同期版"""
+        if self._needs_load(permission_ids):
+            await sync_to_async(self.load)()
+
+    @property
+    def names(self):
+        """読み込み済みの権限ID → 権限名の対応表"""
+        return self._names
+
+    def name_of(self, permission_id):
+        """権限IDから権限名を取得（論理削除済みの場合はNone）"""
+        self.ensure_loaded((permission_id,))
+        return self._names.get(permission_id)
+
+
+permission_registry = PermissionRegistry()
@@ -0,0 +1,66 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from npi.counts import invalidate_counts
+from npi.permissions import invalidate_space_permissions
+from npi.principals import get_principal_cache
+from shared.models import (
+    Account,
+    Permission,
+    Project,
+    Space,
+    SpaceAccount,
+    SpaceAccountPermission,
+)
+from shared.registry import permission_registry
+
+
+# スペースアカウントの変更時に、対象ユーザーの権限キャッシュを無効化
+@receiver([post_save, post_delete], sender=SpaceAccount)
+def invalidate_space_account_permissions(sender, instance, **kwargs):
+    invalidate_space_permissions(instance.account_id)
+
+
+# スペースアカウント権限の変更時に、対象ユーザーの権限キャッシュを無効化
+@receiver([post_save, post_delete], sender=SpaceAccountPermission)
+def invalidate_space_account_permission_permissions(sender, instance, **kwargs):
+    account_id = (
+        SpaceAccount.objects.filter(id=instance.space_account_id)
+        .values_list("account_id", flat=True)
+        .first()
+    )
+    if account_id is not None:
+        invalidate_space_permissions(account_id)
+
+
+# 権限マスタの変更時は、権限の対応表と全ユーザーの権限キャッシュを無効化
+@receiver([post_save, post_delete], sender=Permission)
+def invalidate_permission_registry(sender, instance, **kwargs):
+    permission_registry.invalidate()
+    invalidate_space_permissions()
+
+
+# アカウント作成時に、同じIDで残っている権限キャッシュを破棄
+@receiver(post_save, sender=Account)
+def invalidate_new_account_permissions(sender, instance, created, **kwargs):
+    if created:
+        invalidate_space_permissions(instance.id)
+
+
+# アカウントの更新・論理削除・削除時に、認証済みユーザーのキャッシュを無効化
+@receiver([post_save, post_delete], sender=Account)
+def invalidate_principal_cache(sender, instance, **kwargs):
+    get_principal_cache().invalidate(instance.id)
+
+
+# 一覧の対象のモデルの変更時に、件数のキャッシュを無効化
+@receiver([post_save, post_delete], sender=Project)
+@receiver([post_save, post_delete], sender=Space)
+def invalidate_list_counts(sender, **kwargs):
+    invalidate_counts(sender)
+
+
+# スペース一覧の件数はスペースアカウントの件数で決まるため、スペースアカウントの変更時も無効化
+@receiver([post_save, post_delete], sender=SpaceAccount)
+def invalidate_space_list_counts(sender, **kwargs):
+    invalidate_counts(Space)
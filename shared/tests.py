@@ -0,0 +1,736 @@
+import gc
+import json
+import os
+import tempfile
+import threading
+import weakref
+from io import StringIO
+from unittest import mock, skipIf, skipUnless
+
+from django.core.cache import caches
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django_hosts.resolvers import reverse
+from rest_framework import status
+
+from prometheus_client import REGISTRY
+
+from npi import health, server
+from npi.db import pool as db_pool
+from npi.db.backends.postgresql import base as pool_backend
+from npi.db.pool import ConnectionPool, PoolTimeout
+from npi.metrics import update_pool_metrics
+from npi.health import readiness_probe
+from npi.principals import SNAPSHOT_FIELDS, AccountSnapshot, PrincipalCache
+from npi.seed import SEED_EMAIL, seed_dataset
+from npi.server import (
+    FORKSERVER_MEMORY,
+    HASHING_PROCESS_MEMORY,
+    MAX_WORKERS,
+    WORKER_MEMORY,
+    RESERVED_MEMORY,
+    check_shared_caches,
+    compute_worker_settings,
+    detect_cpu_limit,
+    detect_memory_limit,
+)
+from shared.models import Account, Permission, Project, Space
+from shared.registry import MIN_RELOAD_INTERVAL, PermissionRegistry
+from user_app.contents.models import Contents
+
+
+class HealthCheckTests(TestCase):
+    def setUp(self):
+        self.live_url = reverse("health_live", host="user_app")
+        self.ready_url = reverse("health_ready", host="user_app")
+        readiness_probe.reset()
+        self.addCleanup(readiness_probe.reset)
+
+    def test_liveness(self):
+        """liveness は依存先を確認せずに 200 を返すこと"""
+        with self.assertNumQueries(0):
+            response = self.client.get(self.live_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_readiness(self):
+        """readiness は依存先に接続でき、ウォームアップが完了していれば 200 を返すこと"""
+        response = self.client.get(self.ready_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["status"], "ok")
+        self.assertTrue(response.json()["warm"])
+        self.assertEqual(response.json()["checks"], {"database": "ok", "cache": "ok"})
+        self.assertEqual(set(response.json()["informational"]), {"mail"})
+
+    def test_readiness_mail_unavailable(self):
+        """メール送信に接続できない場合も結果を返すのみで、readiness は 200 を返すこと"""
+
+        def unavailable():
+            raise ConnectionError("mail is unavailable")
+
+        with mock.patch.dict(health.CHECKS, {"mail": unavailable}):
+            response = self.client.get(self.ready_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["informational"]["mail"], "fail")
+
+    def test_readiness_cache_checks_every_alias(self):
+        """設定されたすべてのキャッシュに読み書きできるか確認し、確認用のキーは残さないこと"""
+        caches_setting = {
+            "default": {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                "LOCATION": "health-default",
+            },
+            "other": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+        }
+        with override_settings(CACHES=caches_setting):
+            response = self.client.get(self.ready_url)
+            self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+            self.assertEqual(response.json()["checks"]["cache"], "fail")
+
+            caches_setting["other"] = {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                "LOCATION": "health-other",
+            }
+            with override_settings(CACHES=caches_setting):
+                health.check_cache()
+                self.assertIsNone(
+                    caches["other"].get(f"health:readiness:{os.getpid()}")
+                )
+
+    def test_worker_warm_up(self):
+        """ワーカーの起動時にウォームアップを実行し、成功していれば readiness で再実行しないこと"""
+        calls = []
+        with mock.patch.object(
+            health, "_warm_up_tasks", [("counting", lambda: calls.append(1))]
+        ):
+            server._post_worker_init(mock.Mock())
+            self.assertTrue(readiness_probe.warm)
+            response = self.client.get(self.ready_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(calls, [1])
+
+    def test_readiness_cached(self):
+        """保持期間内の readiness はDBに問い合わせないこと"""
+        self.client.get(self.ready_url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.ready_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_readiness_database_unavailable(self):
+        """DBに接続できない場合は 503 を返し、ウォームアップも行わないこと"""
+
+        def unavailable():
+            raise ConnectionError("database is unavailable")
+
+        with mock.patch.dict(health.CHECKS, {"database": unavailable}):
+            response = self.client.get(self.ready_url)
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response.json()["checks"]["database"], "fail")
+        self.assertFalse(response.json()["warm"])
+
+    def test_readiness_hides_failure_details(self):
+        """失敗した確認の例外の内容はレスポンスに含めず、ログに出力すること"""
+
+        def unavailable():
+            raise ConnectionError("could not connect to server db.internal")
+
+        with mock.patch.dict(health.CHECKS, {"database": unavailable}):
+            with self.assertLogs("npi.health", level="ERROR") as logs:
+                response = self.client.get(self.ready_url)
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response.json()["checks"], {"database": "fail", "cache": "ok"})
+        self.assertNotIn("ConnectionError", response.content.decode())
+        self.assertNotIn("db.internal", response.content.decode())
+        self.assertIn(
+            "ConnectionError: could not connect to server db.internal", logs.output[0]
+        )
+
+    @override_settings(HEALTH_CHECK={"CHECKS": ("database",), "CACHE_SECONDS": 0})
+    def test_readiness_warming_up(self):
+        """ウォームアップが失敗した場合は 503 を返し、次回の確認で再試行すること"""
+
+        def failing():
+            raise RuntimeError("not ready")
+
+        with mock.patch.object(health, "_warm_up_tasks", [("failing", failing)]):
+            response = self.client.get(self.ready_url)
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response.json()["status"], "unavailable")
+        self.assertFalse(response.json()["warm"])
+
+        # 次回の確認でウォームアップを再試行する
+        response = self.client.get(self.ready_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.json()["warm"])
+
+
+class PrincipalCacheTests(TestCase):
+
+    def setUp(self):
+        self.account = Account.objects.create(
+            email="test@example.com",
+            password="x",
+            name="Test User",
+            secret_key="SECRETKEY",
+        )
+
+    def test_snapshot_excludes_secrets(self):
+        """
+        共有キャッシュに書き込むスナップショットに、パスワード・シークレットキーを含めないことをテスト
+        """
+        self.assertNotIn("password", SNAPSHOT_FIELDS)
+        self.assertNotIn("secret_key", SNAPSHOT_FIELDS)
+        self.assertNotIn(
+            "SECRETKEY", AccountSnapshot.from_account(self.account).to_tuple()
+        )
+
+    def test_invalidation_is_shared_between_workers(self):
+        """
+        あるワーカーでの無効化が、同じ共有キャッシュを使う他のワーカーにも反映されることをテスト
+        """
+        worker1 = PrincipalCache(cache_alias="default")
+        worker2 = PrincipalCache(cache_alias="default")
+        worker1.get_account(self.account.id)
+        self.assertIsNotNone(worker2.get(self.account.id))
+
+        worker1.invalidate(self.account.id)
+        self.assertIsNone(worker2.get(self.account.id))
+
+        # 運用担当者の権限の変更（保存時のシグナル）でも無効化され、変更後の値をDBに問い合わせずに参照できること
+        worker1.get_account(self.account.id)
+        self.assertFalse(worker2.get(self.account.id).is_staff)
+        self.account.is_staff = True
+        self.account.save(update_fields=["is_staff"])
+        self.assertIsNone(worker2.get(self.account.id))
+        worker1.get_account(self.account.id)
+        with self.assertNumQueries(0):
+            self.assertTrue(worker2.get_account(self.account.id).is_staff)
+
+    def test_disabled_without_cache_alias(self):
+        """
+        共有キャッシュを指定しない場合はキャッシュしないことをテスト
+        """
+        cache = PrincipalCache(max_size=10, cache_alias=None)
+        cache.get_account(self.account.id)
+        self.assertIsNone(cache.get(self.account.id))
+        with self.assertNumQueries(1):
+            cache.get_account(self.account.id)
+
+
+class PermissionRegistryTests(TestCase):
+
+    def setUp(self):
+        self.creator = Permission.objects.create(name="creator")
+        self.viewer = Permission.objects.create(name="viewer")
+        self.removed = Permission.objects.create(
+            name="removed", deleted_at="2024-01-01T00:00:00+09:00"
+        )
+        self.registry = PermissionRegistry()
+
+    def test_load(self):
+        """
+        論理削除されていない権限のみ、権限ID → 権限名の対応表に読み込むことをテスト
+        """
+        self.assertFalse(self.registry.is_warm)
+        self.registry.load()
+        self.assertTrue(self.registry.is_warm)
+        self.assertEqual(
+            self.registry.names, {self.creator.id: "creator", self.viewer.id: "viewer"}
+        )
+        with self.assertNumQueries(0):
+            self.assertIsNone(self.registry.name_of(self.removed.id))
+
+    def test_name_of_loads_on_first_access(self):
+        """
+        読み込み前に参照した場合は、その時点で読み込むことをテスト
+        """
+        self.assertEqual(self.registry.name_of(self.creator.id), "creator")
+        self.assertTrue(self.registry.is_warm)
+
+    @override_settings(PERMISSION_REGISTRY_CHECK_INTERVAL=0)
+    def test_invalidate_is_shared_between_workers(self):
+        """
+        あるワーカーでの無効化（権限マスタの変更）を、他のワーカーがバージョン番号で検知することをテスト
+        """
+        self.registry.load()
+        self.assertFalse(self.registry._needs_load())
+
+        PermissionRegistry().invalidate()
+        self.assertTrue(self.registry._needs_load())
+        self.registry.ensure_loaded()
+        self.assertFalse(self.registry._needs_load())
+
+    def test_unknown_permission_id_reloads(self):
+        """
+        未知の権限IDを参照した場合は、最短間隔を空けて読み込み直すことをテスト
+        """
+        self.registry.load()
+        added = Permission.objects.create(name="added")
+        # 読み込み直後は再読み込みしない
+        self.assertFalse(self.registry._needs_load((added.id,)))
+
+        self.registry._loaded_at -= MIN_RELOAD_INTERVAL
+        self.assertFalse(self.registry._needs_load((self.creator.id, self.removed.id)))
+        self.assertTrue(self.registry._needs_load((added.id,)))
+        self.assertEqual(self.registry.name_of(added.id), "added")
+
+
+class ServerSettingsTests(SimpleTestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cgroup_root = directory.name
+
+    def write(self, path, value):
+        path = os.path.join(self.cgroup_root, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(value + "\n")
+
+    def test_cpu_limit_cgroup_v2(self):
+        """
+        cgroup v2 の cpu.max からCPU数を算出することをテスト
+        """
+        self.write("cpu.max", "150000 100000")
+        self.assertEqual(detect_cpu_limit(self.cgroup_root), 1.5)
+
+    def test_cpu_limit_cgroup_v2_unlimited(self):
+        """
+        cgroup v2 でクォータがない場合はCPUアフィニティから算出することをテスト
+        """
+        self.write("cpu.max", "max 100000")
+        self.assertEqual(
+            detect_cpu_limit(self.cgroup_root), float(len(os.sched_getaffinity(0)))
+        )
+
+    def test_cpu_limit_cgroup_v1(self):
+        """
+        cgroup v1 のクォータからCPU数を算出し、-1（上限なし）は無視することをテスト
+        """
+        self.write("cpu/cpu.cfs_quota_us", "200000")
+        self.write("cpu/cpu.cfs_period_us", "100000")
+        self.assertEqual(detect_cpu_limit(self.cgroup_root), 2.0)
+
+        self.write("cpu/cpu.cfs_quota_us", "-1")
+        self.assertEqual(
+            detect_cpu_limit(self.cgroup_root), float(len(os.sched_getaffinity(0)))
+        )
+
+    def test_memory_limit(self):
+        """
+        cgroup v2・v1 のメモリの上限を読み取り、上限なしの場合は None を返すことをテスト
+        """
+        self.assertIsNone(detect_memory_limit(self.cgroup_root))
+
+        self.write("memory/memory.limit_in_bytes", str(1 << 62))
+        self.assertIsNone(detect_memory_limit(self.cgroup_root))
+        self.write("memory/memory.limit_in_bytes", "536870912")
+        self.assertEqual(detect_memory_limit(self.cgroup_root), 536870912)
+
+        self.write("memory.max", "max")
+        self.assertIsNone(detect_memory_limit(self.cgroup_root))
+        self.write("memory.max", "1073741824")
+        self.assertEqual(detect_memory_limit(self.cgroup_root), 1073741824)
+
+    def test_compute_worker_settings(self):
+        """
+        CPU・メモリの上限からワーカー数を算出することをテスト
+        """
+        # CPUあたり 2n+1（1CPU未満は1）
+        self.assertEqual(
+            compute_worker_settings(cpu_limit=2, memory_limit=0, environ={})["workers"],
+            5,
+        )
+        self.assertEqual(
+            compute_worker_settings(cpu_limit=0.5, memory_limit=0, environ={})[
+                "workers"
+            ],
+            1,
+        )
+        # 上限
+        self.assertEqual(
+            compute_worker_settings(cpu_limit=16, memory_limit=0, environ={})[
+                "workers"
+            ],
+            MAX_WORKERS,
+        )
+        # メモリで制限される
+        memory_limit = RESERVED_MEMORY + 2 * WORKER_MEMORY
+        self.assertEqual(
+            compute_worker_settings(cpu_limit=4, memory_limit=memory_limit, environ={})[
+                "workers"
+            ],
+            2,
+        )
+
+    def test_compute_worker_settings_hashing_process(self):
+        """
+        パスワードのハッシュ計算をプロセスプールで行う場合は、そのプロセスの分のメモリを見込むことをテスト
+        """
+        memory_limit = RESERVED_MEMORY + 2 * WORKER_MEMORY
+        inline = {"MODE": "inline", "WORKERS": 1}
+        self.assertEqual(
+            compute_worker_settings(
+                cpu_limit=4, memory_limit=memory_limit, environ={}, hashing=inline
+            )["workers"],
+            2,
+        )
+        process = {"MODE": "process", "WORKERS": 1}
+        self.assertEqual(
+            compute_worker_settings(
+                cpu_limit=4, memory_limit=memory_limit, environ={}, hashing=process
+            )["workers"],
+            1,
+        )
+        memory_limit = RESERVED_MEMORY + 2 * (
+            WORKER_MEMORY + FORKSERVER_MEMORY + 2 * HASHING_PROCESS_MEMORY
+        )
+        process = {"MODE": "process", "WORKERS": 2}
+        self.assertEqual(
+            compute_worker_settings(
+                cpu_limit=4, memory_limit=memory_limit, environ={}, hashing=process
+            )["workers"],
+            2,
+        )
+
+    def test_compute_worker_settings_environ(self):
+        """
+        WEB_CONCURRENCY / GUNICORN_THREADS の指定を優先することをテスト
+        """
+        worker_settings = compute_worker_settings(
+            cpu_limit=4,
+            memory_limit=0,
+            environ={"WEB_CONCURRENCY": "3", "GUNICORN_THREADS": "8"},
+        )
+        self.assertEqual(worker_settings["workers"], 3)
+        self.assertEqual(worker_settings["threads"], 8)
+
+    def test_check_shared_caches(self):
+        """
+        複数のワーカーで動かす場合に、ワーカー間で共有されないキャッシュを検出することをテスト
+        """
+        locmem = {
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+        }
+        redis = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache"}}
+
+        self.assertEqual(check_shared_caches(1, locmem, {"MAX_SIZE": 100}), [])
+        self.assertEqual(check_shared_caches(4, redis, {"MAX_SIZE": 0}), [])
+        self.assertEqual(len(check_shared_caches(4, locmem, {"MAX_SIZE": 0})), 1)
+        self.assertEqual(len(check_shared_caches(4, redis, {"MAX_SIZE": 100})), 1)
+
+    def test_serve_requires_shared_caches(self):
+        """
+        プロセス内のキャッシュの設定では、複数のワーカーで起動できないことをテスト
+        """
+        # テストの設定はプロセス内のキャッシュ（LocMemCache）
+        with self.assertRaises(CommandError):
+            call_command("serve", "--workers", "2", "--dry-run", stdout=StringIO())
+        call_command("serve", "--workers", "1", "--dry-run", stdout=StringIO())
+
+
+class FakeConnection:
+    """コネクションプールのテスト用のコネクション"""
+
+    def __init__(self):
+        self.closed = False
+        self.autocommit = True
+        self.rollbacks = 0
+
+    def close(self):
+        self.closed = True
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+class ConnectionPoolTests(SimpleTestCase):
+
+    def create_pool(self, **options):
+        self.connections = []
+
+        def connect():
+            connection = FakeConnection()
+            self.connections.append(connection)
+            return connection
+
+        return ConnectionPool(connect, **options)
+
+    def test_acquire_reuses_released_connection(self):
+        """
+        戻したコネクションを再利用し、トランザクション中のコネクションはロールバックしてから戻すことをテスト
+        """
+        pool = self.create_pool(size=2, max_overflow=0)
+        connection = pool.acquire()
+        connection.autocommit = False
+        pool.release(connection)
+
+        self.assertIs(pool.acquire(), connection)
+        self.assertEqual(connection.rollbacks, 1)
+        stats = pool.stats()
+        self.assertEqual(
+            (stats["created"], stats["reused"], stats["checked_out"], stats["idle"]),
+            (1, 1, 1, 0),
+        )
+
+    def test_overflow(self):
+        """
+        size を超える分は max_overflow まで接続し、戻した時に切断することをテスト
+        """
+        pool = self.create_pool(size=1, max_overflow=1, timeout=0)
+        first, second = pool.acquire(), pool.acquire()
+        with self.assertRaises(PoolTimeout):
+            pool.acquire()
+
+        pool.release(first)
+        pool.release(second)
+        self.assertFalse(first.closed)
+        self.assertTrue(second.closed)
+        stats = pool.stats()
+        self.assertEqual(
+            (stats["idle"], stats["checked_out"], stats["discarded"]), (1, 0, 1)
+        )
+
+    def test_recycle(self):
+        """
+        recycle 秒を超えたコネクション・切断済みのコネクションは破棄して接続し直すことをテスト
+        """
+        pool = self.create_pool(size=2, max_overflow=0, recycle=60)
+        with mock.patch.object(db_pool.time, "monotonic", return_value=1000):
+            connection = pool.acquire()
+            pool.release(connection)
+        with mock.patch.object(db_pool.time, "monotonic", return_value=1061):
+            renewed = pool.acquire()
+        self.assertIsNot(renewed, connection)
+        self.assertTrue(connection.closed)
+
+        renewed.close()
+        pool.release(renewed)
+        self.assertEqual(pool.stats()["idle"], 0)
+        self.assertEqual(pool.stats()["recycled"], 1)
+
+    def test_timeout(self):
+        """
+        空きがない場合は timeout 秒まで待ち、それでも空かなければ PoolTimeout になることをテスト
+        """
+        pool = self.create_pool(size=1, max_overflow=0, timeout=0.05)
+        pool.acquire()
+        with self.assertRaises(PoolTimeout):
+            pool.acquire()
+        self.assertEqual(pool.stats()["timeouts"], 1)
+        self.assertEqual(pool.stats()["waits"], 1)
+
+    def test_waiter_receives_released_connection(self):
+        """
+        待機中の取得が、他のスレッドが戻したコネクションを受け取ることをテスト
+        """
+        pool = self.create_pool(size=1, max_overflow=0, timeout=5)
+        connection = pool.acquire()
+        acquired = []
+        waiter = threading.Thread(target=lambda: acquired.append(pool.acquire()))
+        waiter.start()
+        while not pool.stats()["waits"]:
+            waiter.join(0.01)
+        pool.release(connection)
+        waiter.join()
+        self.assertEqual(acquired, [connection])
+
+    def test_connect_failure_frees_slot(self):
+        """
+        接続に失敗した場合は確保した枠を戻すことをテスト
+        """
+        pool = ConnectionPool(
+            mock.Mock(side_effect=OSError("refused")), size=1, max_overflow=0, timeout=0
+        )
+        with self.assertRaises(OSError):
+            pool.acquire()
+        self.assertEqual(pool.stats()["checked_out"], 0)
+
+    def test_backend_pool_does_not_keep_wrapper(self):
+        """
+        プールのコネクションの作成処理が、プールを作成したスレッドの DatabaseWrapper を参照しないことをテスト
+        """
+        settings_dict = {"OPTIONS": {}, "POOL": {"SIZE": 1, "MAX_OVERFLOW": 0}}
+        conn_params = {"dbname": "pool_test", "host": "db.example.invalid"}
+        existing = set(db_pool._pools)
+
+        def remove_pools():
+            for key in set(db_pool._pools) - existing:
+                del db_pool._pools[key]
+
+        self.addCleanup(remove_pools)
+        first = pool_backend.DatabaseWrapper(settings_dict, "first")
+        pool = first.get_pool(conn_params)
+        # 他のスレッドの DatabaseWrapper も同じプールを使う
+        self.assertIs(
+            pool_backend.DatabaseWrapper(settings_dict, "second").get_pool(conn_params),
+            pool,
+        )
+
+        first_ref = weakref.ref(first)
+        del first
+        gc.collect()
+        self.assertIsNone(first_ref())
+
+        with mock.patch.object(
+            pool_backend.base.Database, "connect", return_value=mock.Mock()
+        ) as connect, mock.patch.object(
+            pool_backend.psycopg2.extras, "register_default_jsonb"
+        ):
+            pool.acquire()
+        connect.assert_called_once_with(**conn_params)
+
+    def test_pool_metrics(self):
+        """
+        プールの統計情報が /metrics のゲージに反映されることをテスト
+        """
+        key = ("pool_metrics_test", "")
+        self.addCleanup(db_pool._pools.pop, key, None)
+        pool = db_pool.get_pool(key, FakeConnection, size=2, max_overflow=0)
+        pool.release(pool.acquire())
+        pool.acquire()
+
+        update_pool_metrics()
+        labels = {"database": "pool_metrics_test"}
+        self.assertEqual(
+            REGISTRY.get_sample_value(
+                "npi_db_pool_connections", {**labels, "state": "checked_out"}
+            ),
+            1,
+        )
+        self.assertEqual(
+            REGISTRY.get_sample_value(
+                "npi_db_pool_connections", {**labels, "state": "idle"}
+            ),
+            0,
+        )
+        self.assertEqual(
+            REGISTRY.get_sample_value(
+                "npi_db_pool_events", {**labels, "event": "reused"}
+            ),
+            1,
+        )
+
+
+class SeedTests(TestCase):
+
+    def test_seed_dataset(self):
+        """
+        指定した件数のデータを投入し、投入したアカウントでログインできることをテスト
+        """
+        result = seed_dataset(
+            accounts=3,
+            spaces=2,
+            spaces_per_account=2,
+            projects_per_space=2,
+            contents_per_project=2,
+            announcements=2,
+        )
+        self.assertEqual(len(result.account_ids), 3)
+        self.assertEqual(Space.objects.filter(id__in=result.space_ids).count(), 2)
+        self.assertEqual(Project.objects.filter(id__in=result.project_ids).count(), 4)
+        self.assertEqual(result.counts[Contents._meta.db_table], 8)
+        response = self.client.post(
+            reverse("login", host="user_app"),
+            {"email": SEED_EMAIL.format(0), "password": "password"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class BenchCommandTests(TransactionTestCase):
+    # 計測は複数のスレッドから別々のDB接続でリクエストを送るため、投入したデータをコミットしておく
+
+    def test_bench_in_process(self):
+        """
+        データを投入してプロセス内で計測し、結果をJSONに書き出すことをテスト
+        """
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        output = os.path.join(directory.name, "bench.json")
+        call_command(
+            # 権限・論理削除は乱数で割り当てるため、計測に使えるアカウントが揃うよう多めに投入する
+            "bench",
+            "--seed",
+            "--accounts",
+            "20",
+            "--spaces",
+            "2",
+            "--spaces-per-account",
+            "2",
+            "--projects-per-space",
+            "1",
+            "--contents-per-project",
+            "2",
+            "--clients",
+            "2",
+            "--requests",
+            "2",
+            "--output",
+            output,
+            stdout=StringIO(),
+        )
+        with open(output) as f:
+            report = json.load(f)
+        self.assertEqual(report["mode"], "in_process")
+        self.assertEqual(report["clients"], 2)
+        self.assertEqual(
+            set(report["endpoints"]),
+            {"login", "refresh", "spaces", "projects", "contents", "announcements"},
+        )
+        for name, summary in report["endpoints"].items():
+            self.assertEqual(summary["requests"], 4, name)
+            self.assertEqual(summary["errors"], 0, name)
+            self.assertIn("queries_per_request", summary)
+
+    def test_bench_without_targets(self):
+        """
+        計測に使えるアカウントがない場合はエラーになることをテスト
+        """
+        with self.assertRaises(CommandError):
+            call_command(
+                "bench", "--clients", "1", "--output", os.devnull, stdout=StringIO()
+            )
+
+
+class ExplainIndexesCommandTests(TestCase):
+
+    @skipUnless(connection.vendor == "postgresql", "実行計画の比較はPostgreSQLのみ")
+    def test_explain_indexes(self):
+        """
+        データを投入して部分インデックスの有無で実行計画を比較し、結果をJSONに書き出すことをテスト
+        """
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        output = os.path.join(directory.name, "explain.json")
+        call_command(
+            "explain_indexes",
+            "--seed",
+            "--accounts",
+            "4",
+            "--spaces",
+            "2",
+            "--projects-per-space",
+            "2",
+            "--contents-per-project",
+            "2",
+            "--deleted-ratio",
+            "0",
+            "--output",
+            output,
+            stdout=StringIO(),
+        )
+        with open(output) as f:
+            report = json.load(f)
+        self.assertTrue(report["indexes"])
+        self.assertEqual(set(report["before"]), set(report["after"]))
+        for label, result in report["after"].items():
+            self.assertIsNotNone(result["execution_ms"], label)
+
+    @skipIf(connection.vendor == "postgresql", "PostgreSQL以外のデータベースでの動作")
+    def test_explain_indexes_requires_postgresql(self):
+        """
+        PostgreSQL以外ではエラーになることをテスト
+        """
+        with self.assertRaises(CommandError):
+            call_command("explain_indexes", stdout=StringIO())
@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class AccountsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "user_app.accounts"
+
+    def ready(self):
+        from mail_templates.outbox import register_message_builder
+        from user_app.accounts.mails import (
+            PASSWORD_RESET_MAIL,
+            build_password_reset_message,
+        )
+
+        # パスワード再設定のメールはワーカーが送信の直前に組み立てる（トークンを送信キューに保存しない）
+        register_message_builder(PASSWORD_RESET_MAIL, build_password_reset_message)
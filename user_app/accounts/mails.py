@@ -0,0 +1,26 @@
+"""
+アカウント関連のメール
+
+パスワード再設定のメールは、トークンを送信キュー（outgoing_mails）に保存しないよう、
+送信キューには再設定用のURLを含まない本文を登録し、ワーカーが送信の直前にトークンを生成して組み立てる。
+"""
+
+from shared.models import Account
+from user_app.accounts.serializer import PasswordResetSerializer
+
+PASSWORD_RESET_MAIL = "password_reset"
+PASSWORD_RESET_URL = "https://example.com/reset-password?token={token}"
+
+
+def build_password_reset_message(mail):
+    """
+    パスワード再設定のメールの本文（本文の {reset_url} を再設定用のURLに置き換える）
+    再送の場合もトークンを生成し直す（前回のトークンは無効になる）
+    """
+    account = Account.objects.filter(
+        email=mail.recipients[0], deleted_at__isnull=True
+    ).first()
+    if account is None:
+        return None
+    raw_token = PasswordResetSerializer().create_reset_token(account)
+    return mail.body.format(reset_url=PASSWORD_RESET_URL.format(token=raw_token))
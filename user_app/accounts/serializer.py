@@ -1,4 +1,3 @@
-from django.contrib.auth.hashers import make_password
 from rest_framework import serializers
 from django.core.validators import (
     RegexValidator,
@@ -6,13 +5,16 @@ from django.core.validators import (
     MaxLengthValidator,
 )
 from shared.models import Account
+from npi.activity import update_account
+from npi.hashing import hash_password
 import hashlib
 import secrets
 from django.utils.timezone import now
 from datetime import timedelta
+from npi.instrumentation import TimedSerializerMixin
 
 
-class AccountSerializer(serializers.ModelSerializer):
+class AccountSerializer(TimedSerializerMixin, serializers.ModelSerializer):
 
     name = serializers.CharField(
         required=True,
@@ -51,13 +53,13 @@ class AccountSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         # パスワードを暗号化して保存
-        validated_data["password"] = make_password(validated_data["password"])
+        validated_data["password"] = hash_password(validated_data["password"])
         return super().create(validated_data)
 
     def update(self, instance, validated_data):
         # パスワードの更新時も暗号化
         if "password" in validated_data:
-            validated_data["password"] = make_password(validated_data["password"])
+            validated_data["password"] = hash_password(validated_data["password"])
         return super().update(instance, validated_data)
 
 
@@ -70,7 +72,9 @@ class PasswordResetSerializer(serializers.Serializer):
 
     def validate_email(self, value):
         if not Account.objects.filter(email=value).exists():
-            raise serializers.ValidationError("このメールアドレスは登録されていません。")
+            raise serializers.ValidationError(
+                "このメールアドレスは登録されていません。"
+            )
         return value
 
     def create_reset_token(self, user):
@@ -79,26 +83,30 @@ class PasswordResetSerializer(serializers.Serializer):
         hashed_token = hashlib.sha256(raw_token.encode()).hexdigest()
         expiration = now() + timedelta(hours=24)  # トークン有効期限 24時間
 
-        user.reset_token = hashed_token
-        user.token_expiration = expiration
-        user.save()
+        update_account(user, reset_token=hashed_token, token_expiration=expiration)
 
         return raw_token  # 生成されたトークン（非ハッシュ化）を返す
 
 
 class PasswordResetVerifySerializer(serializers.Serializer):
-    email = serializers.EmailField(required=True,)
-    token = serializers.CharField(required=True,)
+    email = serializers.EmailField(
+        required=True,
+    )
+    token = serializers.CharField(
+        required=True,
+    )
 
     def validate_email(self, value):
         if not Account.objects.filter(email=value).exists():
-            raise serializers.ValidationError("このメールアドレスは登録されていません。")
+            raise serializers.ValidationError(
+                "このメールアドレスは登録されていません。"
+            )
         return value
 
     def validate(self, data):
         try:
-            hashed_token = hashlib.sha256(data['token'].encode()).hexdigest()
-            user = Account.objects.get(email=data['email'], reset_token=hashed_token)
+            hashed_token = hashlib.sha256(data["token"].encode()).hexdigest()
+            user = Account.objects.get(email=data["email"], reset_token=hashed_token)
 
             if not user.is_reset_token_valid():
                 raise serializers.ValidationError("トークンが無効または期限切れです。")
@@ -111,8 +119,12 @@ class PasswordResetVerifySerializer(serializers.Serializer):
 
 
 class PasswordResetConfirmSerializer(serializers.Serializer):
-    email = serializers.EmailField(required=True,)
-    token = serializers.CharField(required=True,)
+    email = serializers.EmailField(
+        required=True,
+    )
+    token = serializers.CharField(
+        required=True,
+    )
     new_password = serializers.CharField(
         write_only=True,
         required=True,
@@ -126,13 +138,15 @@ class PasswordResetConfirmSerializer(serializers.Serializer):
 
     def validate_email(self, value):
         if not Account.objects.filter(email=value).exists():
-            raise serializers.ValidationError("このメールアドレスは登録されていません。")
+            raise serializers.ValidationError(
+                "このメールアドレスは登録されていません。"
+            )
         return value
 
     def validate(self, data):
         try:
-            hashed_token = hashlib.sha256(data['token'].encode()).hexdigest()
-            user = Account.objects.get(email=data['email'], reset_token=hashed_token)
+            hashed_token = hashlib.sha256(data["token"].encode()).hexdigest()
+            user = Account.objects.get(email=data["email"], reset_token=hashed_token)
 
             if not user.is_reset_token_valid():
                 raise serializers.ValidationError("トークンが無効または期限切れです。")
@@ -146,8 +160,12 @@ class PasswordResetConfirmSerializer(serializers.Serializer):
     def save(self):
         """新しいパスワードを保存"""
         # パスワードは暗号化して保存
-        self.validated_data["new_password"] = make_password(self.validated_data["new_password"])
-        self.user.password = self.validated_data['new_password']
-        self.user.reset_token = None
-        self.user.token_expiration = None
-        self.user.save()
+        self.validated_data["new_password"] = hash_password(
+            self.validated_data["new_password"]
+        )
+        update_account(
+            self.user,
+            password=self.validated_data["new_password"],
+            reset_token=None,
+            token_expiration=None,
+        )
@@ -1,9 +1,16 @@
+import hashlib
+from django.core import mail
+from django.db import connection
+from django.utils import timezone
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 from rest_framework.test import APITestCase
 from npi.utils import ERROR_MESSAGES
 from django_hosts.resolvers import reverse
 from django.contrib.auth.hashers import make_password
 from shared.models import Account
+from mail_templates.models import OutgoingMail, OutgoingMailStatus
+from mail_templates.outbox import process_outbox
 from user_app.accounts.serializer import PasswordResetSerializer
 import logging
 import pyotp
@@ -15,8 +22,8 @@ logger = logging.getLogger(__name__)
 class MeViewTestCase(APITestCase):
 
     def setUp(self):
-        self.login_url = reverse("login", host='user_app')
-        self.me_url = reverse("me", host='user_app')
+        self.login_url = reverse("login", host="user_app")
+        self.me_url = reverse("me", host="user_app")
 
         # テスト用ユーザーを作成
         self.account1 = Account.objects.create(
@@ -29,8 +36,9 @@ class MeViewTestCase(APITestCase):
 
         # JWTトークンの取得
         login_response = self.client.post(
-            self.login_url, {"email": "test@example.com", "password": "securepassword1"},
-            HTTP_HOST='user-app.localhost'
+            self.login_url,
+            {"email": "test@example.com", "password": "securepassword1"},
+            HTTP_HOST="user-app.localhost",
         )
         self.assertEqual(login_response.status_code, status.HTTP_200_OK)
         self.client.cookies["access_token"] = login_response.cookies.get(
@@ -53,6 +61,46 @@ class MeViewTestCase(APITestCase):
         for key in expected_response:
             self.assertEqual(response.data[key], expected_response[key])
 
+    def test_get_me_from_principal_cache(self):
+        """
+        2回目以降はキャッシュからアカウントを取得し、DBにアクセスしない
+        """
+        response = self.client.get(self.me_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.me_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["email"], self.account1.email)
+
+    def test_get_me_with_tampered_token(self):
+        """
+        検証済みのトークンを改ざんした場合は認証に失敗する
+        """
+        response = self.client.get(self.me_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        access_token = self.client.cookies["access_token"].value
+        self.client.cookies["access_token"] = access_token[:-4] + (
+            "AAAA" if not access_token.endswith("AAAA") else "BBBB"
+        )
+        response = self.client.get(self.me_url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_get_me_after_account_updated(self):
+        """
+        アカウント更新後はキャッシュが無効化され、更新後の情報を返す
+        """
+        response = self.client.get(self.me_url)
+        self.assertEqual(response.data["name"], "Test User")
+
+        self.account1.name = "Updated User"
+        self.account1.save()
+
+        response = self.client.get(self.me_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["name"], "Updated User")
+
     def test_get_me_unauthorized(self):
         """
         認証されていない状態で自身のアカウント情報を取得しようとする
@@ -121,8 +169,8 @@ class MeViewTestCase(APITestCase):
 
 class AccountViewTestCase(APITestCase):
     def setUp(self):
-        self.login_url = reverse("login", host='user_app')
-        self.account_url = reverse("account_create", host='user_app')
+        self.login_url = reverse("login", host="user_app")
+        self.account_url = reverse("account_create", host="user_app")
 
         self.valid_account_data = {
             "name": "New User",
@@ -166,8 +214,8 @@ class AccountViewTestCase(APITestCase):
 class Generate2FAViewTestCase(APITestCase):
 
     def setUp(self):
-        self.login_url = reverse("login", host='user_app')
-        self.generate_2fa_url = reverse("2fa-generate", host='user_app')
+        self.login_url = reverse("login", host="user_app")
+        self.generate_2fa_url = reverse("2fa-generate", host="user_app")
 
         # テスト用ユーザーを作成
         self.account1 = Account.objects.create(
@@ -221,8 +269,8 @@ class Generate2FAViewTestCase(APITestCase):
 class Verify2FAViewTestCase(APITestCase):
 
     def setUp(self):
-        self.login_url = reverse("login", host='user_app')
-        self.verify_2fa_url = reverse("2fa-verify", host='user_app')
+        self.login_url = reverse("login", host="user_app")
+        self.verify_2fa_url = reverse("2fa-verify", host="user_app")
 
         # テスト用ユーザーを作成
         self.account1 = Account.objects.create(
@@ -253,6 +301,25 @@ class Verify2FAViewTestCase(APITestCase):
         self.assertEqual(response.data["status"], "success")
         self.assertEqual(response.data["message"], "2FA検証が成功しました")
         self.account1.refresh_from_db()
+        self.assertIsNotNone(self.account1.last_2fa_at)
+
+    def test_verify_2fa_updates_only_last_2fa_at(self):
+        """
+        2FAコードの検証成功時にlast_2fa_atの列のみ更新することをテスト
+        """
+        totp = pyotp.TOTP(self.account1.secret_key)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(self.verify_2fa_url, data={"code": totp.now()})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        updates = [
+            q["sql"]
+            for q in context.captured_queries
+            if q["sql"].startswith('UPDATE "shared_account"')
+        ]
+        self.assertEqual(len(updates), 1)
+        self.assertRegex(
+            updates[0], r'^UPDATE "shared_account" SET "last_2fa_at" = [^,]+ WHERE'
+        )
 
     def test_verify_2fa_invalid_code(self):
         """
@@ -290,7 +357,7 @@ class Verify2FAViewTestCase(APITestCase):
 class PasswordResetViewTestCase(APITestCase):
 
     def setUp(self):
-        self.password_reset_url = reverse("reset_token_generate", host='user_app')
+        self.password_reset_url = reverse("reset_token_generate", host="user_app")
         self.account1 = Account.objects.create(
             email="test@example.com",
             password="securepassword1",
@@ -302,16 +369,59 @@ class PasswordResetViewTestCase(APITestCase):
         """
         パスワードリセットリンクの送信成功
         """
-        response = self.client.post(self.password_reset_url, data={"email": "test@example.com"})
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.post(
+            self.password_reset_url, data={"email": "test@example.com"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
         self.assertEqual(response.data["status"], "success")
-        self.assertEqual(response.data["message"], "パスワードリセットリンクを送信しました。")
+        self.assertEqual(
+            response.data["message"], "パスワードリセットリンクの送信を受け付けました。"
+        )
+
+        # 送信キューに登録されていることを確認
+        queued = OutgoingMail.objects.get(kind="password_reset")
+        self.assertEqual(queued.recipients, ["test@example.com"])
+
+    def test_password_reset_token_not_stored(self):
+        """
+        トークンは送信の直前にワーカーが生成し、送信キューには保存しないこと
+        """
+        self.client.post(self.password_reset_url, data={"email": "test@example.com"})
+        self.account1.refresh_from_db()
+        self.assertIsNone(self.account1.reset_token)
+
+        self.assertEqual(process_outbox(), {"sent": 1, "retried": 0, "failed": 0})
+        body = mail.outbox[0].body
+        raw_token = body.split("token=")[1].strip()
+        self.account1.refresh_from_db()
+        self.assertEqual(
+            self.account1.reset_token, hashlib.sha256(raw_token.encode()).hexdigest()
+        )
+        self.assertNotIn(
+            raw_token, OutgoingMail.objects.get(kind="password_reset").body
+        )
+
+    def test_password_reset_deleted_account(self):
+        """
+        送信までにアカウントが削除された場合は送信しないこと
+        """
+        self.client.post(self.password_reset_url, data={"email": "test@example.com"})
+        Account.objects.filter(pk=self.account1.pk).update(deleted_at=timezone.now())
+
+        self.assertEqual(process_outbox(), {"sent": 0, "retried": 0, "failed": 1})
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(
+            OutgoingMail.objects.get(kind="password_reset").status,
+            OutgoingMailStatus.FAILED,
+        )
 
     def test_password_reset_invalid_email(self):
         """
         無効なメールアドレスでパスワードリセットリンクを送信
         """
-        response = self.client.post(self.password_reset_url, data={"email": "invalid@example.com"})
+        response = self.client.post(
+            self.password_reset_url, data={"email": "invalid@example.com"}
+        )
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         expected_response = ERROR_MESSAGES["400_ERRORS"]
         self.assertEqual(response.data, expected_response)
@@ -329,7 +439,7 @@ class PasswordResetViewTestCase(APITestCase):
 class PasswordResetVerifyViewTestCase(APITestCase):
 
     def setUp(self):
-        self.password_reset_verify_url = reverse("reset_token_verify", host='user_app')
+        self.password_reset_verify_url = reverse("reset_token_verify", host="user_app")
         self.account1 = Account.objects.create(
             email="test@example.com",
             password="securepassword1",
@@ -381,7 +491,7 @@ class PasswordResetVerifyViewTestCase(APITestCase):
 class PasswordResetConfirmViewTestCase(APITestCase):
 
     def setUp(self):
-        self.password_reset_confirm_url = reverse("reset_password", host='user_app')
+        self.password_reset_confirm_url = reverse("reset_password", host="user_app")
         self.account1 = Account.objects.create(
             email="test@example.com",
             password="securepassword1",
@@ -1,11 +1,30 @@
+import threading
+from io import StringIO
+from unittest import mock, skipUnless
+from django.conf import settings
+from django.core.management import call_command
+from datetime import timedelta
+from django.db import DatabaseError, connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth.hashers import make_password
 from rest_framework import status
 from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
 from npi.utils import ERROR_MESSAGES
 from django_hosts.resolvers import reverse
 from django.utils.timezone import now, localtime
 
 from shared.models import Account
+from npi.activity import (
+    ACTIVITY_FIELDS,
+    DURABILITY_BUFFERED,
+    REFRESH_FIELDS,
+    ActivityBuffer,
+    shutdown_activity_buffer,
+    write_activity,
+)
+from npi.hashing import MODE_INLINE, MODE_PROCESS, HashingExecutor
 
 
 class AuthViewsTestCase(APITestCase):
@@ -18,9 +37,9 @@ class AuthViewsTestCase(APITestCase):
             name="Test User",
             last_2fa_at=localtime(now()),
         )
-        self.login_url = reverse("login", host='user_app')
-        self.refresh_url = reverse("refresh", host='user_app')
-        self.logout_url = reverse("logout", host='user_app')
+        self.login_url = reverse("login", host="user_app")
+        self.refresh_url = reverse("refresh", host="user_app")
+        self.logout_url = reverse("logout", host="user_app")
 
     def test_login_success(self):
         """
@@ -83,6 +102,77 @@ class AuthViewsTestCase(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn("access_token", response.cookies)
 
+    def refresh_with_login(self):
+        login_response = self.client.post(
+            self.login_url, {"email": "test@example.com", "password": "securepassword1"}
+        )
+        self.client.cookies["refresh_token"] = login_response.cookies.get(
+            "refresh_token"
+        ).value
+        return self.client.post(self.refresh_url)
+
+    def test_refresh_token_without_email(self):
+        """
+        リクエストの本文にメールアドレスがなくても、トークンのユーザーでアクセストークンを再発行できることをテスト
+        """
+        response = self.refresh_with_login()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data), {"access", "refresh"})
+        self.assertEqual(
+            response.cookies["access_token"].value, response.data["access"]
+        )
+        # 更新したリフレッシュトークンをCookieにも設定すること
+        self.assertEqual(
+            response.cookies["refresh_token"].value, response.data["refresh"]
+        )
+        self.assertEqual(AccessToken(response.data["access"])["user_id"], self.user.id)
+
+    def test_refresh_token_two_factor_flag(self):
+        """
+        最後の2要素認証からの経過時間に応じて、isTwoFactorAuthenticatedを設定することをテスト
+        """
+        response = self.refresh_with_login()
+        self.assertTrue(
+            AccessToken(response.data["access"])["isTwoFactorAuthenticated"]
+        )
+
+        self.user.last_2fa_at = (
+            localtime(now()) - settings.TWO_FACTOR_AUTH_TIMEOUT - timedelta(minutes=1)
+        )
+        self.user.save(update_fields=["last_2fa_at"])
+        response = self.client.post(self.refresh_url)
+        self.assertFalse(
+            AccessToken(response.data["access"])["isTwoFactorAuthenticated"]
+        )
+
+    @override_settings(
+        ACCOUNT_ACTIVITY={
+            **settings.ACCOUNT_ACTIVITY,
+            "DURABILITY": DURABILITY_BUFFERED,
+        }
+    )
+    def test_refresh_token_from_principal_cache(self):
+        """
+        キャッシュ済みのユーザーの場合は、DBにアクセスせずにアクセストークンを再発行できることをテスト
+        """
+        buffer = ActivityBuffer(flush_interval=3600)
+        self.addCleanup(buffer.shutdown)
+        with mock.patch("npi.activity._buffer", buffer):
+            self.assertEqual(self.refresh_with_login().status_code, status.HTTP_200_OK)
+            with self.assertNumQueries(0):
+                response = self.client.post(self.refresh_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_refresh_token_deleted_user(self):
+        """
+        削除済みユーザーのリフレッシュトークンではアクセストークンを再発行しないことをテスト
+        """
+        self.refresh_with_login()
+        self.user.deleted_at = localtime(now())
+        self.user.save(update_fields=["deleted_at"])
+        response = self.client.post(self.refresh_url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
     def test_refresh_token_missing(self):
         """
         リフレッシュトークンがない場合にエラーを返すことをテスト
@@ -124,3 +214,325 @@ class AuthViewsTestCase(APITestCase):
         # Cookieが削除されていることを確認
         self.assertEqual(response.cookies.get("access_token").value, "")
         self.assertEqual(response.cookies.get("refresh_token").value, "")
+
+
+class PasswordHashingTestCase(APITestCase):
+
+    def setUp(self):
+        self.user = Account.objects.create(
+            email="test@example.com",
+            password=make_password("securepassword1"),
+            name="Test User",
+        )
+        self.login_url = reverse("login", host="user_app")
+
+    def test_verify_in_process_pool(self):
+        """
+        プロセスプールでパスワードを検証できることをテスト
+        """
+        executor = HashingExecutor(mode=MODE_PROCESS, workers=1)
+        self.addCleanup(executor.shutdown)
+        with mock.patch("npi.hashing._executor", executor):
+            self.assertTrue(self.user.check_password("securepassword1"))
+            self.assertFalse(self.user.check_password("wrongpassword"))
+
+    def test_login_rejected_when_saturated(self):
+        """
+        ハッシュの計算が混み合っている場合に、待たずに503エラーを返すことをテスト
+        """
+        executor = HashingExecutor(
+            mode=MODE_INLINE, workers=1, queue_size=0, admission_timeout=0.01
+        )
+        started = threading.Event()
+        release = threading.Event()
+
+        def blocking():
+            started.set()
+            release.wait(5)
+
+        # 実行中の1件で上限に達した状態にする
+        worker = threading.Thread(target=executor.run, args=("verify", blocking))
+        worker.start()
+        self.addCleanup(worker.join)
+        self.addCleanup(release.set)
+        started.wait(5)
+
+        with mock.patch("npi.hashing._executor", executor):
+            response = self.client.post(
+                self.login_url,
+                {"email": "test@example.com", "password": "securepassword1"},
+            )
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response.data, ERROR_MESSAGES["503_ERRORS"])
+
+        # 空きができれば受け付けること
+        release.set()
+        worker.join()
+        with mock.patch("npi.hashing._executor", executor):
+            response = self.client.post(
+                self.login_url,
+                {"email": "test@example.com", "password": "securepassword1"},
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @override_settings(
+        PASSWORD_HASHING={**settings.PASSWORD_HASHING, "ITERATIONS": 2000}
+    )
+    def test_rehash_on_login(self):
+        """
+        ハッシュの反復回数が設定と異なる場合に、ログインの成功時にpasswordのみハッシュし直すことをテスト
+        """
+        with mock.patch("npi.hashing._executor", HashingExecutor(mode=MODE_INLINE)):
+            with CaptureQueriesContext(connection) as context:
+                self.assertTrue(self.user.check_password("securepassword1"))
+            self.assertEqual(len(context.captured_queries), 1)
+            self.assertRegex(
+                context.captured_queries[0]["sql"],
+                r'^UPDATE "shared_account" SET "password" = \S+ WHERE',
+            )
+
+            self.user.refresh_from_db()
+            self.assertTrue(self.user.password.startswith("pbkdf2_sha256$2000$"))
+
+            # ハッシュし直した後は更新しないこと
+            with self.assertNumQueries(0):
+                self.assertTrue(self.user.check_password("securepassword1"))
+
+            response = self.client.post(
+                self.login_url,
+                {"email": "test@example.com", "password": "securepassword1"},
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @override_settings(
+        PASSWORD_HASHING={**settings.PASSWORD_HASHING, "ITERATIONS": 2000}
+    )
+    def test_no_rehash_on_failed_login(self):
+        """
+        パスワードが間違っている場合はハッシュし直さないことをテスト
+        """
+        password = self.user.password
+        with mock.patch("npi.hashing._executor", HashingExecutor(mode=MODE_INLINE)):
+            with self.assertNumQueries(0):
+                self.assertFalse(self.user.check_password("wrongpassword"))
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.password, password)
+
+    def test_calibrate_password_hashing(self):
+        """
+        目標の検証時間から反復回数を算出できることをテスト
+        """
+        stdout = StringIO()
+        call_command(
+            "calibrate_password_hashing",
+            "--target-ms",
+            "5",
+            "--samples",
+            "1",
+            stdout=stdout,
+            stderr=StringIO(),
+        )
+        self.assertRegex(stdout.getvalue(), r"PASSWORD_HASHING_ITERATIONS=\d+0000")
+
+
+class AccountActivityTestCase(APITestCase):
+
+    def setUp(self):
+        self.user = Account.objects.create(
+            email="test@example.com",
+            password=make_password("securepassword1"),
+            name="Test User",
+        )
+        self.login_url = reverse("login", host="user_app")
+        self.refresh_url = reverse("refresh", host="user_app")
+
+    def login(self):
+        return self.client.post(
+            self.login_url, {"email": "test@example.com", "password": "securepassword1"}
+        )
+
+    def account_updates(self, context):
+        return [
+            q["sql"]
+            for q in context.captured_queries
+            if q["sql"].startswith('UPDATE "shared_account"')
+        ]
+
+    def test_login_updates_only_activity_columns(self):
+        """
+        ログイン時にlast_login_at・last_active_atの列のみ更新することをテスト
+        """
+        with CaptureQueriesContext(connection) as context:
+            response = self.login()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        updates = self.account_updates(context)
+        self.assertEqual(len(updates), 1)
+        self.assertRegex(
+            updates[0],
+            r'^UPDATE "shared_account" SET "last_login_at" = [^,]+, "last_active_at" = [^,]+ WHERE',
+        )
+
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.last_login_at)
+        self.assertEqual(self.user.last_active_at, self.user.last_login_at)
+
+    def test_login_coalesces_last_login_at(self):
+        """
+        TOUCH_INTERVAL秒以内の再ログインではlast_login_atを更新しないことをテスト
+        """
+        self.login()
+        self.user.refresh_from_db()
+        last_login_at = self.user.last_login_at
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.login()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.account_updates(context), [])
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.last_login_at, last_login_at)
+
+        # 間隔を過ぎていれば更新すること
+        with override_settings(
+            ACCOUNT_ACTIVITY={**settings.ACCOUNT_ACTIVITY, "TOUCH_INTERVAL": 0}
+        ):
+            self.login()
+        self.user.refresh_from_db()
+        self.assertGreater(self.user.last_login_at, last_login_at)
+
+    @override_settings(
+        ACCOUNT_ACTIVITY={**settings.ACCOUNT_ACTIVITY, "TOUCH_INTERVAL": 0}
+    )
+    def test_refresh_updates_last_active_at(self):
+        """
+        トークンの更新時にlast_active_atのみ更新することをテスト
+        """
+        self.client.cookies["refresh_token"] = (
+            self.login().cookies.get("refresh_token").value
+        )
+        self.user.refresh_from_db()
+        last_login_at = self.user.last_login_at
+
+        response = self.client.post(self.refresh_url, {"email": "test@example.com"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.last_login_at, last_login_at)
+        self.assertGreater(self.user.last_active_at, last_login_at)
+
+    @override_settings(
+        ACCOUNT_ACTIVITY={
+            **settings.ACCOUNT_ACTIVITY,
+            "DURABILITY": DURABILITY_BUFFERED,
+        }
+    )
+    def test_buffered_login(self):
+        """
+        bufferedの場合はログインのリクエストの中では書き込まず、バッファの書き込み時に更新することをテスト
+        """
+        buffer = ActivityBuffer(flush_interval=3600)
+        self.addCleanup(buffer.shutdown)
+        with mock.patch("npi.activity._buffer", buffer):
+            with CaptureQueriesContext(connection) as context:
+                response = self.login()
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(self.account_updates(context), [])
+            self.assertEqual(len(buffer), 1)
+
+            # ワーカーの終了時に残りを書き込むこと
+            shutdown_activity_buffer()
+        self.assertEqual(len(buffer), 0)
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.last_login_at)
+
+    def test_no_lost_updates_on_shutdown(self):
+        """
+        複数のスレッドから記録した利用状況が、停止時にすべて書き込まれることをテスト
+        """
+        accounts = [self.user] + [
+            Account.objects.create(
+                email=f"user{i}@example.com", password="x", name=f"User {i}"
+            )
+            for i in range(4)
+        ]
+        base = localtime(now())
+        buffer = ActivityBuffer(flush_interval=3600)
+        buffer.start()
+
+        def record(offset):
+            for i in range(50):
+                for account in accounts:
+                    at = base + timedelta(seconds=offset * 50 + i)
+                    buffer.record(
+                        account.pk, ACTIVITY_FIELDS if i % 2 else REFRESH_FIELDS, at
+                    )
+
+        threads = [
+            threading.Thread(target=record, args=(offset,)) for offset in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # 記録より新しい値は古い日時で上書きしないこと
+        future = base + timedelta(days=1)
+        Account.objects.filter(pk=self.user.pk).update(last_login_at=future)
+
+        buffer.shutdown()
+        self.assertEqual(len(buffer), 0)
+        for account in accounts:
+            account.refresh_from_db()
+            self.assertEqual(
+                account.last_active_at, base + timedelta(seconds=7 * 50 + 49)
+            )
+            if account.pk == self.user.pk:
+                self.assertEqual(account.last_login_at, future)
+            else:
+                self.assertEqual(
+                    account.last_login_at, base + timedelta(seconds=7 * 50 + 49)
+                )
+
+    @skipUnless(
+        connection.vendor == "postgresql",
+        "UPDATE ... FROM (VALUES ...) は PostgreSQL のみ",
+    )
+    def test_write_activity_in_single_statement(self):
+        """
+        複数のアカウントの利用状況を1つのUPDATE文で書き込むことをテスト
+        """
+        other = Account.objects.create(
+            email="other@example.com", password="x", name="Other User"
+        )
+        at = localtime(now())
+        with CaptureQueriesContext(connection) as context:
+            write_activity(
+                {
+                    self.user.pk: {"last_login_at": at, "last_active_at": at},
+                    other.pk: {"last_active_at": at},
+                }
+            )
+        updates = self.account_updates(context)
+        self.assertEqual(len(updates), 1)
+        self.assertIn("FROM (VALUES", updates[0])
+        self.user.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(self.user.last_login_at, at)
+        self.assertIsNone(other.last_login_at)
+        self.assertEqual(other.last_active_at, at)
+
+    def test_failed_flush_keeps_records(self):
+        """
+        書き込みに失敗した記録は、次回の書き込みで再試行することをテスト
+        """
+        buffer = ActivityBuffer()
+        at = localtime(now())
+        buffer.record(self.user.pk, ACTIVITY_FIELDS, at)
+        with mock.patch(
+            "npi.activity.write_activity", side_effect=DatabaseError("connection lost")
+        ):
+            with self.assertRaises(DatabaseError):
+                buffer.flush()
+        self.assertEqual(len(buffer), 1)
+
+        self.assertEqual(buffer.flush(), 1)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.last_login_at, at)
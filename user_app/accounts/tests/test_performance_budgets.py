@@ -0,0 +1,166 @@
+import pyotp
+from django.contrib.auth.hashers import make_password
+from django_hosts.resolvers import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from npi.testing import PerformanceBudgetMixin
+from shared.models import Account
+from user_app.accounts.serializer import PasswordResetSerializer
+
+
+class AuthPerformanceBudgetTests(PerformanceBudgetMixin, APITestCase):
+    def setUp(self):
+        self.account1 = Account.objects.create(
+            email="test@example.com",
+            password=make_password("securepassword1"),
+            name="Test User",
+            secret_key=pyotp.random_base32(),
+        )
+        self.login_url = reverse("login", host="user_app")
+        login_response = self.client.post(
+            self.login_url, {"email": "test@example.com", "password": "securepassword1"}
+        )
+        self.assertEqual(login_response.status_code, status.HTTP_200_OK)
+        self.client.cookies["access_token"] = login_response.cookies.get(
+            "access_token"
+        ).value
+        self.client.cookies["refresh_token"] = login_response.cookies.get(
+            "refresh_token"
+        ).value
+
+    def test_login_budget(self):
+        """
+        ログインが予算内に収まること
+        """
+        # 最終ログイン日時の更新も計測の対象にする
+        Account.objects.filter(pk=self.account1.pk).update(
+            last_login_at=None, last_active_at=None
+        )
+        response = self.assertWithinBudget(
+            "post",
+            self.login_url,
+            {"email": "test@example.com", "password": "securepassword1"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_refresh_budget(self):
+        """
+        トークンの更新が予算内に収まること
+        """
+        response = self.assertWithinBudget("post", reverse("refresh", host="user_app"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_logout_budget(self):
+        """
+        ログアウトが予算内に収まること
+        """
+        response = self.assertWithinBudget("post", reverse("logout", host="user_app"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_get_me_budget(self):
+        """
+        自身のアカウント情報の取得が予算内に収まること
+        """
+        response = self.assertWithinBudget("get", reverse("me", host="user_app"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_get_me_cold_budget(self):
+        """
+        キャッシュがない状態での自身のアカウント情報の取得が予算内に収まること
+        """
+        response = self.assertWithinBudget(
+            "get", reverse("me", host="user_app"), warm_up=False
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_update_me_budget(self):
+        """
+        自身のアカウント情報の更新が予算内に収まること
+        """
+        response = self.assertWithinBudget(
+            "put",
+            reverse("me", host="user_app"),
+            {"name": "Updated User"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_generate_2fa_budget(self):
+        """
+        2FAのQRコードの生成（シークレットキーの登録を含む）が予算内に収まること
+        """
+        Account.objects.filter(pk=self.account1.pk).update(secret_key=None)
+        response = self.assertWithinBudget(
+            "get", reverse("2fa-generate", host="user_app")
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_verify_2fa_budget(self):
+        """
+        2FAコードの検証が予算内に収まること
+        """
+        code = pyotp.TOTP(self.account1.secret_key).now()
+        response = self.assertWithinBudget(
+            "post", reverse("2fa-verify", host="user_app"), {"code": code}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class AccountPerformanceBudgetTests(PerformanceBudgetMixin, APITestCase):
+    def setUp(self):
+        self.account1 = Account.objects.create(
+            email="test@example.com",
+            password=make_password("securepassword1"),
+            name="Test User",
+        )
+
+    def test_create_account_budget(self):
+        """
+        アカウントの作成が予算内に収まること
+        """
+        data = {
+            "name": "New User",
+            "email": "new@example.com",
+            "password": "securepassword1",
+        }
+        response = self.assertWithinBudget(
+            "post", reverse("account_create", host="user_app"), data
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_password_reset_budget(self):
+        """
+        パスワード再設定のメールの受け付けが予算内に収まること
+        """
+        response = self.assertWithinBudget(
+            "post",
+            reverse("reset_token_generate", host="user_app"),
+            {"email": "test@example.com"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+
+    def test_password_reset_verify_budget(self):
+        """
+        パスワード再設定のトークンの検証が予算内に収まること
+        """
+        raw_token = PasswordResetSerializer().create_reset_token(self.account1)
+        data = {"email": "test@example.com", "token": raw_token}
+        response = self.assertWithinBudget(
+            "post", reverse("reset_token_verify", host="user_app"), data
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_password_reset_confirm_budget(self):
+        """
+        パスワードの再設定が予算内に収まること
+        """
+        raw_token = PasswordResetSerializer().create_reset_token(self.account1)
+        data = {
+            "email": "test@example.com",
+            "token": raw_token,
+            "new_password": "securepassword2",
+        }
+        response = self.assertWithinBudget(
+            "post", reverse("reset_password", host="user_app"), data
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
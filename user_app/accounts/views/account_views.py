@@ -7,13 +7,21 @@ import pyotp
 import qrcode
 from io import BytesIO
 import base64
-from django.core.mail import send_mail
 from django.conf import settings
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.utils.timezone import now, localtime
 
-from user_app.accounts.serializer import AccountSerializer, TOTPVerifySerializer, PasswordResetSerializer, PasswordResetVerifySerializer, PasswordResetConfirmSerializer
+from user_app.accounts.serializer import (
+    AccountSerializer,
+    TOTPVerifySerializer,
+    PasswordResetSerializer,
+    PasswordResetVerifySerializer,
+    PasswordResetConfirmSerializer,
+)
+from npi.activity import update_account
 from npi.utils import ERROR_MESSAGES
+from mail_templates.outbox import enqueue_mail
+from user_app.accounts.mails import PASSWORD_RESET_MAIL
 from shared.models import Account
 
 # ロガーの設定
@@ -23,6 +31,13 @@ logger = logging.getLogger(__name__)
 class MeView(APIView):
     # 認証が必要
     permission_classes = (IsAuthenticated,)
+    # 性能の予算（npi.testing）
+    performance_budgets = {
+        # アカウント（キャッシュがない場合）
+        "GET": {"queries": 1, "db_time": 0.05, "wall_time": 0.5},
+        # アカウント（キャッシュがない場合） + メールアドレスの重複チェック（変更する場合） + 更新
+        "PUT": {"queries": 3, "db_time": 0.05, "wall_time": 0.5},
+    }
 
     def get(self, request):
         account = request.user
@@ -54,6 +69,11 @@ class MeView(APIView):
 class AccountView(APIView):
     # 認証クラスを無効にする
     authentication_classes = []
+    # 性能の予算（npi.testing）
+    performance_budgets = {
+        # メールアドレスの重複チェック + 登録（処理時間はパスワードのハッシュ化を含む）
+        "POST": {"queries": 2, "db_time": 0.05, "wall_time": 1.0},
+    }
 
     def post(self, request):
         serializer = AccountSerializer(data=request.data)
@@ -69,38 +89,33 @@ class AccountView(APIView):
 class PasswordResetView(APIView):
     # 認証クラスを無効にする
     authentication_classes = []
+    # 性能の予算（npi.testing）
+    performance_budgets = {
+        # アカウントの存在チェック + 送信キューへの登録
+        "POST": {"queries": 2, "db_time": 0.05, "wall_time": 0.5},
+    }
 
     def post(self, request):
         serializer = PasswordResetSerializer(data=request.data)
         if serializer.is_valid():
             sender_email = settings.DEFAULT_FROM_EMAIL
-            email = serializer.validated_data['email']
-            user = Account.objects.get(email=email)
-
-            # トークン生成
-            raw_token = serializer.create_reset_token(user)
-
-            # メール送信
-            reset_url = f"https://example.com/reset-password?token={raw_token}"
-            try:
-                send_mail(
-                    subject="パスワード再設定",
-                    message=f"以下のリンクからパスワードを再設定してください: {reset_url}",
-                    from_email=sender_email,
-                    recipient_list=[email],
-                    fail_silently=False,
-                )
-                return Response(
-                    {
-                        "status": "success",
-                        "message": "パスワードリセットリンクを送信しました。"
-                    }, status=status.HTTP_200_OK
-                )
-            except Exception as e:
-                return Response(
-                    {"error": f"メールの送信に失敗しました: {str(e)}"},
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                )
+            email = serializer.validated_data["email"]
+
+            # 送信キューに登録（トークンの生成と再設定用のURLの埋め込みは、送信の直前にワーカーが行う）
+            enqueue_mail(
+                PASSWORD_RESET_MAIL,
+                subject="パスワード再設定",
+                message="以下のリンクからパスワードを再設定してください: {reset_url}",
+                recipient_list=[email],
+                from_email=sender_email,
+            )
+            return Response(
+                {
+                    "status": "success",
+                    "message": "パスワードリセットリンクの送信を受け付けました。",
+                },
+                status=status.HTTP_202_ACCEPTED,
+            )
         return Response(
             ERROR_MESSAGES["400_ERRORS"], status=status.HTTP_400_BAD_REQUEST
         )
@@ -109,6 +124,11 @@ class PasswordResetView(APIView):
 class PasswordResetVerifyView(APIView):
     # 認証クラスを無効にする
     authentication_classes = []
+    # 性能の予算（npi.testing）
+    performance_budgets = {
+        # アカウントの存在チェック + アカウント（トークンの検証）
+        "POST": {"queries": 2, "db_time": 0.05, "wall_time": 0.5},
+    }
 
     def post(self, request):
         serializer = PasswordResetVerifySerializer(data=request.data)
@@ -122,6 +142,11 @@ class PasswordResetVerifyView(APIView):
 class PasswordResetConfirmView(APIView):
     # 認証クラスを無効にする
     authentication_classes = []
+    # 性能の予算（npi.testing）
+    performance_budgets = {
+        # アカウントの存在チェック + アカウント（トークンの検証） + 更新（処理時間はパスワードのハッシュ化を含む）
+        "POST": {"queries": 3, "db_time": 0.05, "wall_time": 1.0},
+    }
 
     def post(self, request):
         serializer = PasswordResetConfirmSerializer(data=request.data)
@@ -136,14 +161,18 @@ class PasswordResetConfirmView(APIView):
 class Generate2FAView(views.APIView):
     # 認証が必要
     permission_classes = (IsAuthenticated,)
+    # 性能の予算（npi.testing）
+    performance_budgets = {
+        # アカウント（キャッシュがない場合） + シークレットキー + シークレットキーの登録（未登録の場合）
+        "GET": {"queries": 3, "db_time": 0.05, "wall_time": 0.5},
+    }
 
     def get(self, request):
         """QRコードとシークレットキーを生成"""
         user_totp = request.user
 
         if not user_totp.secret_key:
-            user_totp.secret_key = pyotp.random_base32()
-            user_totp.save()
+            update_account(user_totp, secret_key=pyotp.random_base32())
 
         totp = pyotp.TOTP(user_totp.secret_key)
         provisioning_url = totp.provisioning_uri(
@@ -182,6 +211,11 @@ class Verify2FAView(views.APIView):
     # 認証が必要
     permission_classes = (IsAuthenticated,)
     serializer_class = TOTPVerifySerializer
+    # 性能の予算（npi.testing）
+    performance_budgets = {
+        # アカウント（キャッシュがない場合） + シークレットキー + 最終2FA日時の更新
+        "POST": {"queries": 3, "db_time": 0.05, "wall_time": 0.5},
+    }
 
     def post(self, request):
         """2FAコードを検証"""
@@ -203,14 +237,13 @@ class Verify2FAView(views.APIView):
 
         if totp.verify(verification_code):
             # アカウントのlast_2fa_atを現在時刻で更新
-            user_totp.last_2fa_at = localtime(now())
-            user_totp.save()
+            update_account(user_totp, last_2fa_at=localtime(now()))
 
             # 2要素認証完了フラグを追加してアクセストークンを再発行
             refresh = RefreshToken.for_user(user_totp)
             access = refresh.access_token
 
-            access['isTwoFactorAuthenticated'] = True
+            access["isTwoFactorAuthenticated"] = True
 
             access_max_age = int(
                 settings.SIMPLE_JWT["ACCESS_TOKEN_LIFETIME"].total_seconds()
@@ -220,7 +253,8 @@ class Verify2FAView(views.APIView):
             )
 
             response = Response(
-                {"status": "success", "message": "2FA検証が成功しました"}, status=status.HTTP_200_OK
+                {"status": "success", "message": "2FA検証が成功しました"},
+                status=status.HTTP_200_OK,
             )
             response.set_cookie(
                 key="access_token",
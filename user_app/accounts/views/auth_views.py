@@ -1,14 +1,15 @@
 import logging
-from django.utils.timezone import now, localtime
 from django.conf import settings
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from rest_framework_simplejwt.settings import api_settings
 from rest_framework_simplejwt.tokens import RefreshToken
-from rest_framework_simplejwt.views import TokenRefreshView
+from npi.activity import record_login, record_refresh
+from npi.principals import get_principal_cache
+from npi.tokens import is_two_factor_authenticated, rotate_refresh_token
 from npi.utils import ERROR_MESSAGES
 from rest_framework.permissions import IsAuthenticated
-from django.http import HttpRequest
 
 from shared.models import Account
 
@@ -19,6 +20,12 @@ logger = logging.getLogger(__name__)
 class LoginView(APIView):
     # 認証クラスを無効にする
     authentication_classes = []
+    # 性能の予算（npi.testing）
+    performance_budgets = {
+        # アカウント + 最終ログイン日時の更新（ハッシュの方式・反復回数の変更後は + パスワードの再ハッシュ）
+        # 処理時間はパスワードのハッシュの検証を含む
+        "POST": {"queries": 3, "db_time": 0.05, "wall_time": 1.0},
+    }
 
     def post(self, request):
         email = request.data.get("email")
@@ -55,7 +62,7 @@ class LoginView(APIView):
             access = refresh.access_token
 
             # アクセストークンに２要素認証完了フラグを追加
-            access['isTwoFactorAuthenticated'] = False
+            access["isTwoFactorAuthenticated"] = False
 
             access_max_age = int(
                 settings.SIMPLE_JWT["ACCESS_TOKEN_LIFETIME"].total_seconds()
@@ -64,9 +71,8 @@ class LoginView(APIView):
                 settings.SIMPLE_JWT["REFRESH_TOKEN_LIFETIME"].total_seconds()
             )
 
-            # アカウントのlast_login_atを現在時刻で更新
-            user.last_login_at = localtime(now())
-            user.save()
+            # アカウントのlast_login_atを現在時刻で更新（ACCOUNT_ACTIVITYの設定に応じて後でまとめて書き込む）
+            record_login(user)
 
             # HttpOnly Cookie にトークンを設定
             response = Response(
@@ -99,7 +105,15 @@ class LoginView(APIView):
             )
 
 
-class RefreshTokenView(TokenRefreshView):
+class RefreshTokenView(APIView):
+    # 認証クラスを無効にする（リフレッシュトークンで認証する）
+    authentication_classes = []
+    permission_classes = []
+    # 性能の予算（npi.testing）
+    performance_budgets = {
+        # アカウント（キャッシュがない場合） + 最終利用日時の更新
+        "POST": {"queries": 2, "db_time": 0.05, "wall_time": 0.5},
+    }
 
     def post(self, request, *args, **kwargs):
         # Cookieからリフレッシュトークンを取得
@@ -112,46 +126,53 @@ class RefreshTokenView(TokenRefreshView):
             )
         # リフレッシュトークンで新しいアクセストークンを生成
         try:
-            new_data = request.data.copy()
-            new_data["refresh"] = refresh_token
-
-            # 新しいデータを使用して新しいリクエストを作成
-            new_request = HttpRequest()
-            new_request.method = request.method
-            new_request.META = request.META
-            new_request.COOKIES = request.COOKIES
-            new_request.data = new_data
+            # トークンの検証は1回だけ行う
+            refresh = RefreshToken(refresh_token)
 
-            # 親クラスのpostメソッドを呼び出し
-            response = super().post(new_request, *args, **kwargs)
-            access_token = response.data.get("access")
+            # トークンのユーザーIDからアカウントを取得（キャッシュ済みの場合はDBにアクセスしない）
+            user = get_principal_cache().get_account(
+                refresh[api_settings.USER_ID_CLAIM]
+            )
+            if user.deleted_at is not None:
+                # 削除済みユーザーのトークンは更新しない
+                logger.error(f"User with ID {user.id} is deleted")
+                return Response(
+                    ERROR_MESSAGES["401_ERRORS"], status=status.HTTP_401_UNAUTHORIZED
+                )
 
-            # アクセストークンにカスタムクレームを追加
-            refresh = RefreshToken(refresh_token)
             access_token = refresh.access_token
-
             # 最後の２FA認証からの経過時間をチェック
-            user = Account.objects.get(email=new_data["email"])
+            access_token["isTwoFactorAuthenticated"] = is_two_factor_authenticated(user)
+            data = {"access": str(access_token)}
 
-            if user.last_2fa_at:
-                if localtime(user.last_2fa_at) + settings.TWO_FACTOR_AUTH_TIMEOUT < localtime(now()):
-                    # ２FA認証が必要
-                    access_token["isTwoFactorAuthenticated"] = False
-                else:
-                    access_token["isTwoFactorAuthenticated"] = True
-            else:
-                access_token["isTwoFactorAuthenticated"] = False
+            # リフレッシュトークンを更新（更新前のトークンは無効化）
+            rotated = rotate_refresh_token(refresh)
+            if rotated is not None:
+                data["refresh"] = str(rotated)
 
-            response.data["access"] = str(access_token)
+            record_refresh(user)
 
+            response = Response(data, status=status.HTTP_200_OK)
             response.set_cookie(
                 key="access_token",
-                value=str(access_token),
+                value=data["access"],
                 httponly=settings.HTTPONLY_COOKIES,
                 secure=settings.SECURE_COOKIES,
                 samesite=None,
                 max_age=15 * 60,  # 有効期限
             )
+            if rotated is not None:
+                response.set_cookie(
+                    key="refresh_token",
+                    value=data["refresh"],
+                    httponly=settings.HTTPONLY_COOKIES,
+                    secure=settings.SECURE_COOKIES,
+                    samesite=None,
+                    # 有効期限（秒）
+                    max_age=int(
+                        settings.SIMPLE_JWT["REFRESH_TOKEN_LIFETIME"].total_seconds()
+                    ),
+                )
             return response
         except Exception as e:
             logger.error(f"An error occurred during refresh token validation: {str(e)}")
@@ -163,6 +184,11 @@ class RefreshTokenView(TokenRefreshView):
 class LogoutView(APIView):
     # 認証が必要
     permission_classes = (IsAuthenticated,)
+    # 性能の予算（npi.testing）
+    performance_budgets = {
+        # アカウント（キャッシュがない場合）
+        "POST": {"queries": 1, "db_time": 0.05, "wall_time": 0.5},
+    }
 
     def post(self, request):
         response = Response({"message": "Logout successful"}, status=status.HTTP_200_OK)
@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class AnnouncementConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "user_app.announcements"
+
+    def ready(self):
+        # シグナルの登録
+        from user_app.announcements import signals  # noqa: F401
+        from npi.health import register_warm_up
+        from user_app.announcements.cache import get_active_announcements
+
+        # 全ユーザー共通の掲載中のお知らせ一覧を、readiness の前に読み込んでおく
+        register_warm_up("active_announcements", get_active_announcements)
@@ -0,0 +1,92 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Min
+from django.utils import timezone
+
+from npi.cache import bump_version, get_version
+from shared.models import Announcement
+from user_app.announcements.serializers import AnnouncementSerializer
+
+# キャッシュキーの名前空間
+CACHE_NAMESPACE = "active_announcements"
+
+
+def _cache_key():
+    return f"{CACHE_NAMESPACE}:{get_version(CACHE_NAMESPACE)}"
+
+
+def _active_queryset(now):
+    # 現在時刻がannouncements_from_at〜announcements_to_atの範囲に入っている、かつdeleted_atがnull（論理削除してない）のお知らせを、idが大きい順にソート
+    return Announcement.objects.filter(
+        announcements_from_at__lte=now,
+        announcements_to_at__gte=now,
+        deleted_at__isnull=True,
+    ).order_by("-id")
+
+
+def _upcoming_queryset(now):
+    # これから掲載が始まるお知らせ
+    return Announcement.objects.filter(
+        announcements_from_at__gt=now, deleted_at__isnull=True
+    )
+
+
+def _build_entry(now, announcements, next_from_at):
+    """掲載中のお知らせと、次に一覧が変わる日時（いずれかの掲載の開始・終了）をまとめる"""
+    boundaries = [
+        announcement.announcements_to_at + timedelta(microseconds=1)
+        for announcement in announcements
+    ]
+    if next_from_at is not None:
+        boundaries.append(next_from_at)
+    # 一覧が変わらない場合も、シグナルを通らない更新に備えて一定時間で取り直す
+    valid_until = min(
+        boundaries + [now + timedelta(seconds=settings.ANNOUNCEMENT_CACHE_TIMEOUT)]
+    )
+    return {
+        "data": list(AnnouncementSerializer(announcements, many=True).data),
+        "valid_until": valid_until,
+    }
+
+
+def _timeout(now, entry):
+    return max(int((entry["valid_until"] - now).total_seconds()) + 1, 1)
+
+
+def get_active_announcements():
+    """掲載中のお知らせ一覧（シリアライズ済み）を取得（全ユーザー共通のためキャッシュを共有する）"""
+    key = _cache_key()
+    now = timezone.now()
+    entry = cache.get(key)
+    if entry is None or entry["valid_until"] <= now:
+        announcements = list(_active_queryset(now))
+        next_from_at = _upcoming_queryset(now).aggregate(
+            next_from_at=Min("announcements_from_at")
+        )["next_from_at"]
+        entry = _build_entry(now, announcements, next_from_at)
+        cache.set(key, entry, timeout=_timeout(now, entry))
+    return entry["data"]
+
+
+async def aget_active_announcements():
+    """get_active_announcements の非同期版"""
+    key = _cache_key()
+    now = timezone.now()
+    entry = await cache.aget(key)
+    if entry is None or entry["valid_until"] <= now:
+        announcements = [announcement async for announcement in _active_queryset(now)]
+        next_from_at = (
+            await _upcoming_queryset(now).aaggregate(
+                next_from_at=Min("announcements_from_at")
+            )
+        )["next_from_at"]
+        entry = _build_entry(now, announcements, next_from_at)
+        await cache.aset(key, entry, timeout=_timeout(now, entry))
+    return entry["data"]
+
+
+def invalidate_active_announcements():
+    """お知らせの変更時に、掲載中のお知らせ一覧のキャッシュを無効化"""
+    bump_version(CACHE_NAMESPACE)
@@ -1,8 +1,9 @@
 from rest_framework import serializers
 from shared.models import Announcement
+from npi.instrumentation import TimedSerializerMixin
 
 
-class AnnouncementSerializer(serializers.ModelSerializer):
+class AnnouncementSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Announcement
         fields = "__all__"
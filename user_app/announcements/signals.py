@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from shared.models import Announcement
+from user_app.announcements.cache import invalidate_active_announcements
+
+
+# お知らせの登録・更新・削除時に、掲載中のお知らせ一覧のキャッシュを無効化
+@receiver([post_save, post_delete], sender=Announcement)
+def invalidate_announcement_list(sender, instance, **kwargs):
+    invalidate_active_announcements()
@@ -1,17 +1,22 @@
 from django_hosts.resolvers import reverse
 from datetime import datetime, timedelta
+from unittest import mock
+from django.utils import timezone
 from django.utils.timezone import make_aware
 from rest_framework import status
-from rest_framework.test import APITestCase
+from rest_framework.test import APIRequestFactory, APITestCase
+from asgiref.sync import async_to_sync
 from npi.utils import ERROR_MESSAGES
 from django.contrib.auth.hashers import make_password
 from shared.models import Account, Announcement
+from npi.testing import PerformanceBudgetMixin
+from user_app.announcements.views import AsyncAnnouncementListView
 
 
-class AnnouncementListViewTests(APITestCase):
+class AnnouncementListViewTests(PerformanceBudgetMixin, APITestCase):
     def setUp(self):
-        self.login_url = reverse("login", host='user_app')
-        self.url = reverse("announcement-list", host='user_app')
+        self.login_url = reverse("login", host="user_app")
+        self.url = reverse("announcement-list", host="user_app")
         # テスト用ユーザーを作成
         self.account1 = Account.objects.create(
             email="test@example.com",
@@ -48,6 +53,28 @@ class AnnouncementListViewTests(APITestCase):
         self.assertEqual(len(response.data["data"]), 10)  # Default per_page is 10
         self.assertEqual(response.data["pagination"]["total_items"], 15)
 
+    def test_get_announcements_async(self):
+        """
+        お知らせ一覧の取得（非同期ビュー）
+        """
+        request = APIRequestFactory().get(self.url, {"page": 2, "per_page": 10})
+        request.COOKIES["access_token"] = self.client.cookies["access_token"].value
+        response = async_to_sync(AsyncAnnouncementListView.as_view())(request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["data"]), 5)
+        self.assertEqual(response.data["pagination"]["total_items"], 15)
+
+    def test_get_announcements_async_no_announcements(self):
+        """
+        お知らせ一覧の取得時に、お知らせが存在しない場合（非同期ビュー）
+        """
+        Announcement.objects.all().delete()
+        request = APIRequestFactory().get(self.url, {"page": 1, "per_page": 10})
+        request.COOKIES["access_token"] = self.client.cookies["access_token"].value
+        response = async_to_sync(AsyncAnnouncementListView.as_view())(request)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.data, ERROR_MESSAGES["404_ERRORS"])
+
     def test_get_announcements_unauthenticated(self):
         """
         お知らせ一覧の取得時に、未認証の場合
@@ -130,3 +157,82 @@ class AnnouncementListViewTests(APITestCase):
         self.assertNotIn(
             "Deleted Announcement", [a["title"] for a in page2_response.data["data"]]
         )
+
+    def test_get_announcements_budget(self):
+        """
+        お知らせ一覧の取得が予算内に収まること
+        """
+        response = self.assertWithinBudget(
+            "get", self.url, {"page": 1, "per_page": 10}, warm_up=False
+        )
+        self.assertEqual(len(response.data["data"]), 10)
+
+    def test_get_announcements_cached(self):
+        """
+        お知らせ一覧の取得時に、2回目以降はキャッシュから返しDBを参照しないこと
+        """
+        self.client.get(self.url, {"page": 1, "per_page": 10})
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, {"page": 2, "per_page": 10})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["data"]), 5)
+        self.assertEqual(response.data["pagination"]["total_items"], 15)
+
+    def test_get_announcements_after_update(self):
+        """
+        お知らせ一覧の取得時に、お知らせの変更がキャッシュに反映されること
+        """
+        self.client.get(self.url, {"page": 1, "per_page": 10})
+        announcement = Announcement.objects.get(title="Announcement 0")
+        announcement.deleted_at = make_aware(datetime.now())
+        announcement.save()
+
+        response = self.client.get(self.url, {"page": 1, "per_page": 100})
+        self.assertEqual(response.data["pagination"]["total_items"], 14)
+        self.assertNotIn("Announcement 0", [a["title"] for a in response.data["data"]])
+
+    def test_get_announcements_after_start(self):
+        """
+        お知らせ一覧の取得時に、掲載開始日時を過ぎたお知らせがキャッシュの有効期間内でも表示されること
+        """
+        now = timezone.now()
+        Announcement.objects.create(
+            title="Upcoming Announcement",
+            content="Content",
+            announcements_from_at=now + timedelta(seconds=10),
+            announcements_to_at=now + timedelta(days=1),
+        )
+        response = self.client.get(self.url, {"page": 1, "per_page": 100})
+        self.assertEqual(response.data["pagination"]["total_items"], 15)
+
+        with mock.patch(
+            "django.utils.timezone.now", return_value=now + timedelta(seconds=20)
+        ):
+            response = self.client.get(self.url, {"page": 1, "per_page": 100})
+        self.assertEqual(response.data["pagination"]["total_items"], 16)
+        self.assertIn(
+            "Upcoming Announcement", [a["title"] for a in response.data["data"]]
+        )
+
+    def test_get_announcements_cursor(self):
+        """
+        お知らせ一覧の取得時に、キーセット方式のページネーションでidが大きい順に取得できること
+        """
+        response = self.client.get(self.url, {"pagination": "cursor", "per_page": 10})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["data"]), 10)
+        self.assertTrue(response.data["pagination"]["has_next"])
+
+        next_response = self.client.get(
+            self.url,
+            {
+                "pagination": "cursor",
+                "per_page": 10,
+                "cursor": response.data["pagination"]["next_cursor"],
+            },
+        )
+        self.assertEqual(next_response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(next_response.data["data"]), 5)
+        self.assertFalse(next_response.data["pagination"]["has_next"])
+        ids = [a["id"] for a in response.data["data"] + next_response.data["data"]]
+        self.assertEqual(ids, sorted(ids, reverse=True))
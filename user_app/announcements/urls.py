@@ -1,5 +1,10 @@
+from django.conf import settings
 from django.urls import path
-from .views import AnnouncementListView
+from .views import AnnouncementListView, AsyncAnnouncementListView
+
+# ASGIで動かす場合は非同期ビューを使う
+if settings.ASYNC_VIEWS:
+    AnnouncementListView = AsyncAnnouncementListView  # noqa: F811
 
 # Create your tests here.
 
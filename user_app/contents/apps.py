@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ContentsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "user_app.contents"
+
+    def ready(self):
+        # シグナルの登録
+        from user_app.contents import signals  # noqa: F401
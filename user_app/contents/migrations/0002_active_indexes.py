@@ -0,0 +1,24 @@
+# Generated by Django 4.2.16 on 2026-10-18 17:40
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # 本番のテーブルへの書き込みを止めないよう、インデックスはトランザクションの外で CONCURRENTLY で作成する
+    atomic = False
+
+    dependencies = [
+        ("contents", "0001_initial"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="contents",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", True)),
+                fields=["project", "id"],
+                name="contents_project_active_idx",
+            ),
+        ),
+    ]
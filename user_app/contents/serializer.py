@@ -4,6 +4,7 @@ from django.core.validators import (
 )
 from shared.models import Project
 from user_app.contents.models import Contents, ProductionStatusEnum
+from npi.instrumentation import TimedSerializerMixin
 
 
 def validate_project_exists(value):
@@ -12,7 +13,7 @@ def validate_project_exists(value):
         raise serializers.ValidationError("存在しないプロジェクトが指定されています。")
 
 
-class ContentsSerializer(serializers.ModelSerializer):
+class ContentsSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     name = serializers.CharField(
         required=True,
         validators=[
@@ -22,15 +23,15 @@ class ContentsSerializer(serializers.ModelSerializer):
 
     description = serializers.CharField(
         validators=[
-            MaxLengthValidator(1000, message="説明は1000文字以下である必要があります。"),
+            MaxLengthValidator(
+                1000, message="説明は1000文字以下である必要があります。"
+            ),
         ],
     )
 
     project = serializers.IntegerField(
         required=True,
-        validators=[
-            validate_project_exists
-        ],
+        validators=[validate_project_exists],
         write_only=True,
     )
 
@@ -43,23 +44,23 @@ class ContentsSerializer(serializers.ModelSerializer):
     )
 
     def validate(self, data):
-        if Contents.objects.filter(name=data['name'], project=data['project']).exists():
+        if Contents.objects.filter(name=data["name"], project=data["project"]).exists():
             raise serializers.ValidationError("同じ名前のコンテンツが既に存在します。")
         return data
 
     class Meta:
         model = Contents
         fields = [
-            'id',
-            'logical_contents_id',
-            'name',
-            'description',
-            'project',
-            'last_updated_at',
-            'script_path',
-            'is_10_return_move_on_display',
+            "id",
+            "logical_contents_id",
+            "name",
+            "description",
+            "project",
+            "last_updated_at",
+            "script_path",
+            "is_10_return_move_on_display",
         ]
-        read_only_fields = ['id', 'logical_contents_id']
+        read_only_fields = ["id", "logical_contents_id"]
 
     def to_representation(self, instance):
         # 通常のデータ表現を取得
@@ -67,7 +68,9 @@ class ContentsSerializer(serializers.ModelSerializer):
 
         # production_status_idをENUM名に変換
         try:
-            data['production_status'] = ProductionStatusEnum(instance.production_status_id).name
+            data["production_status"] = ProductionStatusEnum(
+                instance.production_status_id
+            ).name
         except ValueError:
-            data['production_status'] = None
-        return data
\ No newline at end of file
+            data["production_status"] = None
+        return data
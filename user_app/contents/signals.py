@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from npi.counts import invalidate_counts
+from user_app.contents.models import Contents
+
+
+# コンテンツの登録・更新・削除時に、コンテンツ一覧の件数のキャッシュを無効化
+@receiver([post_save, post_delete], sender=Contents)
+def invalidate_contents_counts(sender, **kwargs):
+    invalidate_counts(sender)
@@ -1,15 +1,28 @@
 from django_hosts.resolvers import reverse
 from rest_framework import status
-from rest_framework.test import APITestCase
-from shared.models import Account, Space, SpaceAccount, Permission, SpaceAccountPermission, Project
+from rest_framework.test import APIRequestFactory, APITestCase
+from asgiref.sync import async_to_sync
+from shared.models import (
+    Account,
+    Space,
+    SpaceAccount,
+    Permission,
+    SpaceAccountPermission,
+    Project,
+)
 from user_app.contents.models import Contents
 from django.utils import timezone
 from django.contrib.auth.hashers import make_password
+from npi.utils import ERROR_MESSAGES
+from user_app.contents.views import (
+    AsyncContentsListCreateAPIView,
+    AsyncContentsRetrieveReproduceUpdateDestroyAPIView,
+)
 
 
 class ContentsListCreateAPIViewTests(APITestCase):
     def setUp(self):
-        self.login_url = reverse("login", host='user_app')
+        self.login_url = reverse("login", host="user_app")
 
         # 検証用アカウントの作成
         self.account1 = Account.objects.create(
@@ -19,19 +32,25 @@ class ContentsListCreateAPIViewTests(APITestCase):
         )
 
         # 検証用スペースの作成
-        self.space1 = Space.objects.create(name='Test Space 1', icon_image_path='path/to/icon1.png', description='This is a test space description.')
+        self.space1 = Space.objects.create(
+            name="Test Space 1",
+            icon_image_path="path/to/icon1.png",
+            description="This is a test space description.",
+        )
         self.space_id = self.space1.id
 
         # 検証用スペースアカウントの作成
-        self.space_account1 = SpaceAccount.objects.create(space=self.space1, account=self.account1)
+        self.space_account1 = SpaceAccount.objects.create(
+            space=self.space1, account=self.account1
+        )
 
         # 検証用権限の作成
-        self.permission1 = Permission.objects.create(name='creator')
+        self.permission1 = Permission.objects.create(name="creator")
 
         # 検証用スペースアカウント権限の作成
         self.space_account_permission1 = SpaceAccountPermission.objects.create(
             space_account=self.space_account1,
-            permission=Permission.objects.get(name='creator')
+            permission=Permission.objects.get(name="creator"),
         )
 
         # 検証用プロジェクトの作成
@@ -57,29 +76,33 @@ class ContentsListCreateAPIViewTests(APITestCase):
         """
         production_status_id = 1
         Contents.objects.create(
-            name='Test Content1',
-            description='This is a test content description.',
+            name="Test Content1",
+            description="This is a test content description.",
             project=self.project1,
-            script_path='/path/to/script',
+            script_path="/path/to/script",
             is_10_return_move_on_display=True,
             last_updated_at=timezone.now(),
-            production_status_id=production_status_id
+            production_status_id=production_status_id,
         )
         Contents.objects.create(
-            name='Test Content2',
-            description='This is a test content description.',
+            name="Test Content2",
+            description="This is a test content description.",
             project=self.project1,
-            script_path='/path/to/script',
+            script_path="/path/to/script",
             is_10_return_move_on_display=True,
             last_updated_at=timezone.now(),
-            production_status_id=2
+            production_status_id=2,
         )
 
-        url = reverse('contents-list-create', kwargs={'space_id': self.space_id, 'project_id': self.project_id}, host='user_app')
-        response = self.client.get(url, {'page': 1, 'per_page': 10})
+        url = reverse(
+            "contents-list-create",
+            kwargs={"space_id": self.space_id, "project_id": self.project_id},
+            host="user_app",
+        )
+        response = self.client.get(url, {"page": 1, "per_page": 10})
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data['data']), 2)
+        self.assertEqual(len(response.data["data"]), 2)
 
     def test_get_contents_list_with_production_status(self):
         """
@@ -87,52 +110,190 @@ class ContentsListCreateAPIViewTests(APITestCase):
         """
         production_status_id = 2
         Contents.objects.create(
-            name='Test Content1',
-            description='This is a test content description.',
+            name="Test Content1",
+            description="This is a test content description.",
             project=self.project1,
-            script_path='/path/to/script',
+            script_path="/path/to/script",
             is_10_return_move_on_display=True,
             last_updated_at=timezone.now(),
-            production_status_id=production_status_id
+            production_status_id=production_status_id,
         )
         Contents.objects.create(
-            name='Test Content2',
-            description='This is a test content description.',
+            name="Test Content2",
+            description="This is a test content description.",
             project=self.project1,
-            script_path='/path/to/script',
+            script_path="/path/to/script",
             is_10_return_move_on_display=True,
             last_updated_at=timezone.now(),
         )
 
-        url = reverse('contents-list-create', kwargs={'space_id': self.space_id, 'project_id': self.project_id}, host='user_app')
-        response = self.client.get(url, {'page': 1, 'per_page': 10, 'production_status': production_status_id})
+        url = reverse(
+            "contents-list-create",
+            kwargs={"space_id": self.space_id, "project_id": self.project_id},
+            host="user_app",
+        )
+        response = self.client.get(
+            url, {"page": 1, "per_page": 10, "production_status": production_status_id}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["data"]), 1)
+        self.assertEqual(response.data["data"][0]["production_status"], "COMPLETION")
+
+    def test_get_contents_list_async(self):
+        """
+        正常系(非同期ビュー): production_statusで絞り込み
+        """
+        Contents.objects.create(
+            name="Test Content1", project=self.project1, production_status_id=1
+        )
+        Contents.objects.create(
+            name="Test Content2", project=self.project1, production_status_id=2
+        )
+
+        url = reverse(
+            "contents-list-create",
+            kwargs={"space_id": self.space_id, "project_id": self.project_id},
+            host="user_app",
+        )
+        request = APIRequestFactory().get(
+            url, {"page": 1, "per_page": 10, "production_status": 2}
+        )
+        request.COOKIES["access_token"] = self.client.cookies["access_token"].value
+        response = async_to_sync(AsyncContentsListCreateAPIView.as_view())(
+            request, space_id=self.space_id, project_id=self.project_id
+        )
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data['data']), 1)
-        self.assertEqual(response.data['data'][0]['production_status'], 'COMPLETION')
+        self.assertEqual(len(response.data["data"]), 1)
+        self.assertEqual(response.data["data"][0]["name"], "Test Content2")
+
+    def test_get_contents_list_count_cached(self):
+        """
+        正常系(一覧取得): ページを移動しても件数を取得し直さず、コンテンツの追加後は取得し直すこと
+        """
+        for i in range(3):
+            Contents.objects.create(
+                name=f"Test Content{i}",
+                project=self.project1,
+                last_updated_at=timezone.now(),
+            )
+
+        url = reverse(
+            "contents-list-create",
+            kwargs={"space_id": self.space_id, "project_id": self.project_id},
+            host="user_app",
+        )
+        response = self.client.get(url, {"page": 1, "per_page": 2})
+        self.assertEqual(response.data["pagination"]["total_items"], 3)
+
+        # ページの取得のみ（件数はキャッシュから取得）
+        with self.assertNumQueries(1):
+            response = self.client.get(url, {"page": 2, "per_page": 2})
+        self.assertEqual(len(response.data["data"]), 1)
+        self.assertEqual(response.data["pagination"]["total_items"], 3)
+
+        Contents.objects.create(
+            name="Test Content3", project=self.project1, last_updated_at=timezone.now()
+        )
+        response = self.client.get(url, {"page": 2, "per_page": 2})
+        self.assertEqual(len(response.data["data"]), 2)
+        self.assertEqual(response.data["pagination"]["total_items"], 4)
+
+    def test_get_contents_list_stale_count(self):
+        """
+        正常系(一覧取得): キャッシュした件数が実際より少ない・多い場合も、ページの行は実際の行から取得すること
+        """
+        for i in range(2):
+            Contents.objects.create(
+                name=f"Test Content{i}",
+                project=self.project1,
+                last_updated_at=timezone.now(),
+            )
+
+        url = reverse(
+            "contents-list-create",
+            kwargs={"space_id": self.space_id, "project_id": self.project_id},
+            host="user_app",
+        )
+        response = self.client.get(url, {"page": 1, "per_page": 2})
+        self.assertEqual(response.data["pagination"]["total_items"], 2)
+
+        # 保存時のシグナルを送らない追加（キャッシュした件数は古いまま）
+        Contents.objects.bulk_create(
+            [Contents(name=f"Bulk Content{i}", project=self.project1) for i in range(3)]
+        )
+        response = self.client.get(url, {"page": 2, "per_page": 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["data"]), 2)
+        self.assertEqual(response.data["pagination"]["total_items"], 4)
+        response = self.client.get(url, {"page": 3, "per_page": 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["data"]), 1)
+
+        # 保存時のシグナルを送らない削除（キャッシュした件数より少ない）
+        Contents.objects.filter(name__startswith="Bulk").update(
+            deleted_at=timezone.now()
+        )
+        response = self.client.get(url, {"page": 2, "per_page": 2})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_get_contents_list_without_count(self):
+        """
+        正常系(一覧取得): 件数を取得せず、次のページの有無のみ返すこと
+        """
+        for i in range(3):
+            Contents.objects.create(
+                name=f"Test Content{i}",
+                project=self.project1,
+                last_updated_at=timezone.now(),
+            )
+
+        url = reverse(
+            "contents-list-create",
+            kwargs={"space_id": self.space_id, "project_id": self.project_id},
+            host="user_app",
+        )
+        response = self.client.get(url, {"page": 1, "per_page": 2, "count": "none"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["data"]), 2)
+        self.assertTrue(response.data["pagination"]["has_next"])
+        self.assertNotIn("total_items", response.data["pagination"])
+
+        response = self.client.get(url, {"page": 2, "per_page": 2, "count": "none"})
+        self.assertEqual(len(response.data["data"]), 1)
+        self.assertFalse(response.data["pagination"]["has_next"])
+
+        response = self.client.get(url, {"page": 3, "per_page": 2, "count": "none"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
     def test_create_contents(self):
         """
         正常系(新規作成)
         """
-        url = reverse('contents-list-create', kwargs={'space_id': self.space_id, 'project_id': self.project_id}, host='user_app')
-        data = {
-            'name': 'New Contents',
-            'description': 'Contents description'
-        }
-        response = self.client.post(url, data, format='json')
+        url = reverse(
+            "contents-list-create",
+            kwargs={"space_id": self.space_id, "project_id": self.project_id},
+            host="user_app",
+        )
+        data = {"name": "New Contents", "description": "Contents description"}
+        response = self.client.post(url, data, format="json")
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(Contents.objects.count(), 1)
-        self.assertEqual(Contents.objects.get().name, 'New Contents')
+        self.assertEqual(Contents.objects.get().name, "New Contents")
 
     def test_get_contents_list_without_permission(self):
         """
         異常系(権限なし)(一覧取得)
         """
         self.client.force_authenticate(user=None)
-        url = reverse('contents-list-create', kwargs={'space_id': self.space_id, 'project_id': self.project_id}, host='user_app')
-        response = self.client.get(url, {'page': 1, 'per_page': 10})
+        url = reverse(
+            "contents-list-create",
+            kwargs={"space_id": self.space_id, "project_id": self.project_id},
+            host="user_app",
+        )
+        response = self.client.get(url, {"page": 1, "per_page": 10})
 
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
@@ -141,12 +302,13 @@ class ContentsListCreateAPIViewTests(APITestCase):
         異常系(権限なし)(新規作成)
         """
         self.client.force_authenticate(user=None)
-        url = reverse('contents-list-create', kwargs={'space_id': self.space_id, 'project_id': self.project_id}, host='user_app')
-        data = {
-            'name': 'New Contents',
-            'description': 'Contents description'
-        }
-        response = self.client.post(url, data, format='json')
+        url = reverse(
+            "contents-list-create",
+            kwargs={"space_id": self.space_id, "project_id": self.project_id},
+            host="user_app",
+        )
+        data = {"name": "New Contents", "description": "Contents description"}
+        response = self.client.post(url, data, format="json")
 
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
         self.assertEqual(Contents.objects.count(), 0)
@@ -157,8 +319,12 @@ class ContentsListCreateAPIViewTests(APITestCase):
         """
         self.space_account_permission1.delete()
 
-        url = reverse('contents-list-create', kwargs={'space_id': self.space_id, 'project_id': self.project_id}, host='user_app')
-        response = self.client.get(url, {'page': 1, 'per_page': 10})
+        url = reverse(
+            "contents-list-create",
+            kwargs={"space_id": self.space_id, "project_id": self.project_id},
+            host="user_app",
+        )
+        response = self.client.get(url, {"page": 1, "per_page": 10})
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
@@ -168,12 +334,13 @@ class ContentsListCreateAPIViewTests(APITestCase):
         """
         self.space_account_permission1.delete()
 
-        url = reverse('contents-list-create', kwargs={'space_id': self.space_id, 'project_id': self.project_id}, host='user_app')
-        data = {
-            'name': 'New Contents',
-            'description': 'Contents description'
-        }
-        response = self.client.post(url, data, format='json')
+        url = reverse(
+            "contents-list-create",
+            kwargs={"space_id": self.space_id, "project_id": self.project_id},
+            host="user_app",
+        )
+        data = {"name": "New Contents", "description": "Contents description"}
+        response = self.client.post(url, data, format="json")
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertEqual(Contents.objects.count(), 0)
@@ -181,7 +348,7 @@ class ContentsListCreateAPIViewTests(APITestCase):
 
 class ContentsRetrieveReproduceUpdateDestroyAPIViewTests(APITestCase):
     def setUp(self):
-        self.login_url = reverse("login", host='user_app')
+        self.login_url = reverse("login", host="user_app")
 
         # 検証用アカウントの作成
         self.account1 = Account.objects.create(
@@ -191,19 +358,25 @@ class ContentsRetrieveReproduceUpdateDestroyAPIViewTests(APITestCase):
         )
 
         # 検証用スペースの作成
-        self.space1 = Space.objects.create(name='Test Space 1', icon_image_path='path/to/icon1.png', description='This is a test space description.')
+        self.space1 = Space.objects.create(
+            name="Test Space 1",
+            icon_image_path="path/to/icon1.png",
+            description="This is a test space description.",
+        )
         self.space_id = self.space1.id
 
         # 検証用スペースアカウントの作成
-        self.space_account1 = SpaceAccount.objects.create(space=self.space1, account=self.account1)
+        self.space_account1 = SpaceAccount.objects.create(
+            space=self.space1, account=self.account1
+        )
 
         # 検証用権限の作成
-        self.permission1 = Permission.objects.create(name='creator')
+        self.permission1 = Permission.objects.create(name="creator")
 
         # 検証用スペースアカウント権限の作成
         self.space_account_permission1 = SpaceAccountPermission.objects.create(
             space_account=self.space_account1,
-            permission=Permission.objects.get(name='creator')
+            permission=Permission.objects.get(name="creator"),
         )
 
         # 検証用プロジェクトの作成
@@ -216,13 +389,13 @@ class ContentsRetrieveReproduceUpdateDestroyAPIViewTests(APITestCase):
 
         # 検証用コンテンツの作成
         self.contents1 = Contents.objects.create(
-            name='Test Content1',
-            description='This is a test content description.',
+            name="Test Content1",
+            description="This is a test content description.",
             project=self.project1,
-            script_path='/path/to/script',
+            script_path="/path/to/script",
             is_10_return_move_on_display=True,
             last_updated_at=timezone.now(),
-            production_status_id=1
+            production_status_id=1,
         )
         self.contents_id = self.contents1.id
 
@@ -239,18 +412,108 @@ class ContentsRetrieveReproduceUpdateDestroyAPIViewTests(APITestCase):
         """
         正常系(詳細取得)
         """
-        url = reverse('contents-detail', kwargs={'space_id': self.space_id, 'project_id': self.project_id, 'contents_id': self.contents_id}, host='user_app')
+        url = reverse(
+            "contents-detail",
+            kwargs={
+                "space_id": self.space_id,
+                "project_id": self.project_id,
+                "contents_id": self.contents_id,
+            },
+            host="user_app",
+        )
         response = self.client.get(url)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data['data']['name'], 'Test Content1')
+        self.assertEqual(response.data["data"]["name"], "Test Content1")
+
+    def test_get_contents_detail_async(self):
+        """
+        正常系(非同期ビュー)(詳細取得)
+        """
+        url = reverse(
+            "contents-detail",
+            kwargs={
+                "space_id": self.space_id,
+                "project_id": self.project_id,
+                "contents_id": self.contents_id,
+            },
+            host="user_app",
+        )
+        request = APIRequestFactory().get(url)
+        request.COOKIES["access_token"] = self.client.cookies["access_token"].value
+        response = async_to_sync(
+            AsyncContentsRetrieveReproduceUpdateDestroyAPIView.as_view()
+        )(
+            request,
+            space_id=self.space_id,
+            project_id=self.project_id,
+            contents_id=self.contents_id,
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["data"]["name"], "Test Content1")
+
+    def test_get_contents_detail_not_found(self):
+        """
+        異常系(存在しないコンテンツ)(詳細取得)
+        """
+        url = reverse(
+            "contents-detail",
+            kwargs={
+                "space_id": self.space_id,
+                "project_id": self.project_id,
+                "contents_id": self.contents_id + 100,
+            },
+            host="user_app",
+        )
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.data, ERROR_MESSAGES["404_ERRORS"])
+
+    def test_get_contents_detail_not_found_async(self):
+        """
+        異常系(存在しないコンテンツ)(非同期ビュー)(詳細取得)
+        """
+        self.contents1.delete()
+
+        url = reverse(
+            "contents-detail",
+            kwargs={
+                "space_id": self.space_id,
+                "project_id": self.project_id,
+                "contents_id": self.contents_id,
+            },
+            host="user_app",
+        )
+        request = APIRequestFactory().get(url)
+        request.COOKIES["access_token"] = self.client.cookies["access_token"].value
+        response = async_to_sync(
+            AsyncContentsRetrieveReproduceUpdateDestroyAPIView.as_view()
+        )(
+            request,
+            space_id=self.space_id,
+            project_id=self.project_id,
+            contents_id=self.contents_id,
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.data, ERROR_MESSAGES["404_ERRORS"])
 
     def test_get_contents_detail_without_permission(self):
         """
         異常系(権限なし)(詳細取得)
         """
         self.client.force_authenticate(user=None)
-        url = reverse('contents-detail', kwargs={'space_id': self.space_id, 'project_id': self.project_id, 'contents_id': self.contents_id}, host='user_app')
+        url = reverse(
+            "contents-detail",
+            kwargs={
+                "space_id": self.space_id,
+                "project_id": self.project_id,
+                "contents_id": self.contents_id,
+            },
+            host="user_app",
+        )
         response = self.client.get(url)
 
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -261,7 +524,15 @@ class ContentsRetrieveReproduceUpdateDestroyAPIViewTests(APITestCase):
         """
         self.space_account_permission1.delete()
 
-        url = reverse('contents-detail', kwargs={'space_id': self.space_id, 'project_id': self.project_id, 'contents_id': self.contents_id}, host='user_app')
+        url = reverse(
+            "contents-detail",
+            kwargs={
+                "space_id": self.space_id,
+                "project_id": self.project_id,
+                "contents_id": self.contents_id,
+            },
+            host="user_app",
+        )
         response = self.client.get(url)
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -270,28 +541,41 @@ class ContentsRetrieveReproduceUpdateDestroyAPIViewTests(APITestCase):
         """
         正常系(複製)
         """
-        url = reverse('contents-detail', kwargs={'space_id': self.space_id, 'project_id': self.project_id, 'contents_id': self.contents_id}, host='user_app')
-        data = {
-            'name': 'Reproduced Content',
-            'description': 'Reproduced description'
-        }
-        response = self.client.post(url, data, format='json')
+        url = reverse(
+            "contents-detail",
+            kwargs={
+                "space_id": self.space_id,
+                "project_id": self.project_id,
+                "contents_id": self.contents_id,
+            },
+            host="user_app",
+        )
+        data = {"name": "Reproduced Content", "description": "Reproduced description"}
+        response = self.client.post(url, data, format="json")
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(Contents.objects.count(), 2)
-        self.assertEqual(Contents.objects.get(name='Reproduced Content').description, 'Reproduced description')
+        self.assertEqual(
+            Contents.objects.get(name="Reproduced Content").description,
+            "Reproduced description",
+        )
 
     def test_reproduce_contents_without_permission(self):
         """
         異常系(権限なし)(複製)
         """
         self.client.force_authenticate(user=None)
-        url = reverse('contents-detail', kwargs={'space_id': self.space_id, 'project_id': self.project_id, 'contents_id': self.contents_id}, host='user_app')
-        data = {
-            'name': 'Reproduced Content',
-            'description': 'Reproduced description'
-        }
-        response = self.client.post(url, data, format='json')
+        url = reverse(
+            "contents-detail",
+            kwargs={
+                "space_id": self.space_id,
+                "project_id": self.project_id,
+                "contents_id": self.contents_id,
+            },
+            host="user_app",
+        )
+        data = {"name": "Reproduced Content", "description": "Reproduced description"}
+        response = self.client.post(url, data, format="json")
 
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
         self.assertEqual(Contents.objects.count(), 1)
@@ -302,12 +586,17 @@ class ContentsRetrieveReproduceUpdateDestroyAPIViewTests(APITestCase):
         """
         self.space_account_permission1.delete()
 
-        url = reverse('contents-detail', kwargs={'space_id': self.space_id, 'project_id': self.project_id, 'contents_id': self.contents_id}, host='user_app')
-        data = {
-            'name': 'Reproduced Content',
-            'description': 'Reproduced description'
-        }
-        response = self.client.post(url, data, format='json')
+        url = reverse(
+            "contents-detail",
+            kwargs={
+                "space_id": self.space_id,
+                "project_id": self.project_id,
+                "contents_id": self.contents_id,
+            },
+            host="user_app",
+        )
+        data = {"name": "Reproduced Content", "description": "Reproduced description"}
+        response = self.client.post(url, data, format="json")
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertEqual(Contents.objects.count(), 1)
@@ -316,27 +605,39 @@ class ContentsRetrieveReproduceUpdateDestroyAPIViewTests(APITestCase):
         """
         正常系(更新)
         """
-        url = reverse('contents-detail', kwargs={'space_id': self.space_id, 'project_id': self.project_id, 'contents_id': self.contents_id}, host='user_app')
-        data = {
-            'name': 'Updated Content',
-            'description': 'Updated description'
-        }
-        response = self.client.put(url, data, format='json')
+        url = reverse(
+            "contents-detail",
+            kwargs={
+                "space_id": self.space_id,
+                "project_id": self.project_id,
+                "contents_id": self.contents_id,
+            },
+            host="user_app",
+        )
+        data = {"name": "Updated Content", "description": "Updated description"}
+        response = self.client.put(url, data, format="json")
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(Contents.objects.get(id=self.contents_id).name, 'Updated Content')
+        self.assertEqual(
+            Contents.objects.get(id=self.contents_id).name, "Updated Content"
+        )
 
     def test_update_contents_without_permission(self):
         """
         異常系(権限なし)(更新)
         """
         self.client.force_authenticate(user=None)
-        url = reverse('contents-detail', kwargs={'space_id': self.space_id, 'project_id': self.project_id, 'contents_id': self.contents_id}, host='user_app')
-        data = {
-            'name': 'Updated Content',
-            'description': 'Updated description'
-        }
-        response = self.client.put(url, data, format='json')
+        url = reverse(
+            "contents-detail",
+            kwargs={
+                "space_id": self.space_id,
+                "project_id": self.project_id,
+                "contents_id": self.contents_id,
+            },
+            host="user_app",
+        )
+        data = {"name": "Updated Content", "description": "Updated description"}
+        response = self.client.put(url, data, format="json")
 
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
@@ -346,12 +647,17 @@ class ContentsRetrieveReproduceUpdateDestroyAPIViewTests(APITestCase):
         """
         self.space_account_permission1.delete()
 
-        url = reverse('contents-detail', kwargs={'space_id': self.space_id, 'project_id': self.project_id, 'contents_id': self.contents_id}, host='user_app')
-        data = {
-            'name': 'Updated Content',
-            'description': 'Updated description'
-        }
-        response = self.client.put(url, data, format='json')
+        url = reverse(
+            "contents-detail",
+            kwargs={
+                "space_id": self.space_id,
+                "project_id": self.project_id,
+                "contents_id": self.contents_id,
+            },
+            host="user_app",
+        )
+        data = {"name": "Updated Content", "description": "Updated description"}
+        response = self.client.put(url, data, format="json")
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
@@ -359,18 +665,57 @@ class ContentsRetrieveReproduceUpdateDestroyAPIViewTests(APITestCase):
         """
         正常系(削除)
         """
-        url = reverse('contents-detail', kwargs={'space_id': self.space_id, 'project_id': self.project_id, 'contents_id': self.contents_id}, host='user_app')
+        url = reverse(
+            "contents-detail",
+            kwargs={
+                "space_id": self.space_id,
+                "project_id": self.project_id,
+                "contents_id": self.contents_id,
+            },
+            host="user_app",
+        )
         response = self.client.delete(url)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(Contents.objects.filter(id=self.contents_id).count(), 0)
 
+    def test_reproduce_and_update_missing_contents(self):
+        """
+        異常系(存在しないコンテンツ)(複製・更新・削除)
+        """
+        url = reverse(
+            "contents-detail",
+            kwargs={
+                "space_id": self.space_id,
+                "project_id": self.project_id,
+                "contents_id": self.contents_id + 100,
+            },
+            host="user_app",
+        )
+        data = {"name": "Reproduced", "description": "Reproduced"}
+
+        self.assertEqual(
+            self.client.post(url, data).status_code, status.HTTP_404_NOT_FOUND
+        )
+        self.assertEqual(
+            self.client.put(url, data).status_code, status.HTTP_404_NOT_FOUND
+        )
+        self.assertEqual(self.client.delete(url).status_code, status.HTTP_404_NOT_FOUND)
+
     def test_delete_contents_without_permission(self):
         """
         異常系(権限なし)(削除)(削除)
         """
         self.client.force_authenticate(user=None)
-        url = reverse('contents-detail', kwargs={'space_id': self.space_id, 'project_id': self.project_id, 'contents_id': self.contents_id}, host='user_app')
+        url = reverse(
+            "contents-detail",
+            kwargs={
+                "space_id": self.space_id,
+                "project_id": self.project_id,
+                "contents_id": self.contents_id,
+            },
+            host="user_app",
+        )
         response = self.client.delete(url)
 
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -381,7 +726,15 @@ class ContentsRetrieveReproduceUpdateDestroyAPIViewTests(APITestCase):
         """
         self.space_account_permission1.delete()
 
-        url = reverse('contents-detail', kwargs={'space_id': self.space_id, 'project_id': self.project_id, 'contents_id': self.contents_id}, host='user_app')
+        url = reverse(
+            "contents-detail",
+            kwargs={
+                "space_id": self.space_id,
+                "project_id": self.project_id,
+                "contents_id": self.contents_id,
+            },
+            host="user_app",
+        )
         response = self.client.delete(url)
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,92 @@
+from django_hosts.resolvers import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from npi.testing import PerformanceBudgetMixin
+
+
+class ContentsPerformanceBudgetTests(PerformanceBudgetMixin, APITestCase):
+    def setUp(self):
+        self.set_up_space("creator", projects=1, contents_per_project=10)
+        self.project_id = self.project.id
+        self.list_url = reverse(
+            "contents-list-create",
+            kwargs={"space_id": self.space_id, "project_id": self.project_id},
+            host="user_app",
+        )
+        self.detail_url = reverse(
+            "contents-detail",
+            kwargs={
+                "space_id": self.space_id,
+                "project_id": self.project_id,
+                "contents_id": self.contents.id,
+            },
+            host="user_app",
+        )
+
+    def test_get_contents_list_budget(self):
+        """
+        一覧取得が予算内に収まること
+        """
+        response = self.assertWithinBudget(
+            "get", self.list_url, {"page": 1, "per_page": 10}
+        )
+        self.assertEqual(len(response.data["data"]), 10)
+
+    def test_get_contents_list_cold_budget(self):
+        """
+        キャッシュがない状態での一覧取得が予算内に収まること
+        """
+        response = self.assertWithinBudget(
+            "get", self.list_url, {"page": 1, "per_page": 10}, warm_up=False
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_create_contents_budget(self):
+        """
+        作成が予算内に収まること
+        """
+        response = self.assertWithinBudget(
+            "post",
+            self.list_url,
+            {"name": "New Contents", "description": "Contents description"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_get_contents_detail_budget(self):
+        """
+        詳細取得が予算内に収まること
+        """
+        response = self.assertWithinBudget("get", self.detail_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_reproduce_contents_budget(self):
+        """
+        複製が予算内に収まること
+        """
+        response = self.assertWithinBudget(
+            "post",
+            self.detail_url,
+            {"name": "Reproduced Content", "description": "Reproduced description"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_update_contents_budget(self):
+        """
+        更新が予算内に収まること
+        """
+        response = self.assertWithinBudget(
+            "put",
+            self.detail_url,
+            {"name": "Updated Content", "description": "Updated description"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_delete_contents_budget(self):
+        """
+        削除が予算内に収まること
+        """
+        response = self.assertWithinBudget("delete", self.detail_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
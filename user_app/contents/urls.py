@@ -1,7 +1,24 @@
+from django.conf import settings
 from django.urls import path
-from user_app.contents.views import ContentsListCreateAPIView, ContentsRetrieveReproduceUpdateDestroyAPIView
+from user_app.contents.views import (
+    ContentsListCreateAPIView,
+    ContentsRetrieveReproduceUpdateDestroyAPIView,
+    AsyncContentsListCreateAPIView,
+    AsyncContentsRetrieveReproduceUpdateDestroyAPIView,
+)
+
+# ASGIで動かす場合は非同期ビューを使う
+if settings.ASYNC_VIEWS:
+    ContentsListCreateAPIView = AsyncContentsListCreateAPIView  # noqa: F811
+    ContentsRetrieveReproduceUpdateDestroyAPIView = (  # noqa: F811
+        AsyncContentsRetrieveReproduceUpdateDestroyAPIView
+    )
 
 urlpatterns = [
     path("", ContentsListCreateAPIView.as_view(), name="contents-list-create"),
-    path('<int:contents_id>/', ContentsRetrieveReproduceUpdateDestroyAPIView.as_view(), name='contents-detail'),
-]
\ No newline at end of file
+    path(
+        "<int:contents_id>/",
+        ContentsRetrieveReproduceUpdateDestroyAPIView.as_view(),
+        name="contents-detail",
+    ),
+]
@@ -4,8 +4,12 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 
-from npi.utils import ERROR_MESSAGES, CustomPagination, check_space_permission
-from shared.models import Project, Permission
+from npi.authentication import CookieJWTStatelessAuthentication
+from npi.utils import ERROR_MESSAGES, get_paginator, list_params_error
+from npi.async_views import AsyncAPIView
+from npi.permissions import has_space_permission, ahas_space_permission
+from shared.registry import PERM
+from shared.models import Project
 from user_app.contents.models import Contents
 from user_app.contents.serializer import ContentsSerializer
 from django.utils import timezone
@@ -16,67 +20,80 @@ logger = logging.getLogger(__name__)
 
 # 一覧/作成用
 class ContentsListCreateAPIView(APIView):
+    # 参照系はトークンのクレームのみで認証（更新系はアカウントの存在・削除済みでないことも確認）
+    authentication_classes = (CookieJWTStatelessAuthentication,)
     # 認証が必要
     permission_classes = (IsAuthenticated,)
+    # キーセット方式のページネーション（pagination=cursor）で指定できる並び順
+    orderings = {"id": ("id",), "last_updated_at": ("-last_updated_at", "-id")}
+    # 性能の予算（npi.testing）
+    performance_budgets = {
+        # 権限 + 件数 + 一覧
+        "GET": {"queries": 3, "db_time": 0.05, "wall_time": 0.5},
+        # アカウント（キャッシュがない場合） + 権限 + プロジェクトの存在チェック + プロジェクトの取得 + 登録
+        "POST": {"queries": 6, "db_time": 0.05, "wall_time": 0.5},
+    }
+
+    # 一覧取得できる権限
+    list_permission_names = [PERM.creator]
+
+    # 一覧の対象（同期・非同期で共通）
+    def get_queryset(self, request, project_id):
+        contents = Contents.objects.filter(
+            project_id=project_id, deleted_at__isnull=True
+        )
+
+        # production_statusで絞り込み
+        production_status = request.GET.get("production_status")
+        if production_status:
+            contents = contents.filter(production_status_id=production_status)
+        return contents
+
+    # 一覧のレスポンス（同期・非同期で共通）
+    def list_response(self, paginator, page, contents):
+        if page is not None:
+            serializer = ContentsSerializer(page, many=True)
+            return paginator.get_paginated_response(serializer.data)
+
+        serializer = ContentsSerializer(contents, many=True)
+
+        return Response(
+            {"status": "success", "data": serializer.data}, status=status.HTTP_200_OK
+        )
 
     # 一覧取得
     def get(self, request, space_id, project_id):
         # ユーザーがそのスペースでの対象の操作権限があるかチェック
-        permission_names = ['creator']
-        permission_ids = list(Permission.objects.filter(name__in=permission_names, deleted_at__isnull=True).values_list('id', flat=True))
-
-        if not check_space_permission(request.user, space_id, permission_ids):
+        if not has_space_permission(request, space_id, self.list_permission_names):
             return Response(
                 ERROR_MESSAGES["400_ERRORS"], status=status.HTTP_400_BAD_REQUEST
             )
 
         # 必須チェック
-        if request.GET.get("page") is None:
-            return Response(
-                ERROR_MESSAGES["400_ERRORS"], status=status.HTTP_400_BAD_REQUEST
-            )
-        if request.GET.get("per_page") is None:
-            return Response(
-                ERROR_MESSAGES["400_ERRORS"], status=status.HTTP_400_BAD_REQUEST
-            )
+        error = list_params_error(request)
+        if error is not None:
+            return error
 
         # ページネーションの設定
-        paginator = CustomPagination()
-        paginator.page_size = request.GET.get("per_page", 10)
-
-        contents = Contents.objects.filter(project_id=project_id, deleted_at__isnull=True)
-
-        # production_statusで絞り込み
-        production_status = request.GET.get("production_status")
-        if production_status:
-            contents = contents.filter(production_status_id=production_status)
+        paginator = get_paginator(request, self.orderings)
 
+        contents = self.get_queryset(request, project_id)
         # ページネーションを適用
         page = paginator.paginate_queryset(contents, request)
-        if page is not None:
-            serializer = ContentsSerializer(page, many=True)
-            return paginator.get_paginated_response(serializer.data)
-
-        serializer = ContentsSerializer(contents, many=True)
-
-        return Response({
-            'status': 'success',
-            'data': serializer.data
-        }, status=status.HTTP_200_OK)
+        return self.list_response(paginator, page, contents)
 
     # 作成
     def post(self, request, space_id, project_id):
         # ユーザーがそのスペースでの対象の操作権限があるかチェック
-        permission_names = ['creator']
-        permission_ids = list(Permission.objects.filter(name__in=permission_names, deleted_at__isnull=True).values_list('id', flat=True))
-        if not check_space_permission(request.user, space_id, permission_ids):
+        permission_names = [PERM.creator]
+        if not has_space_permission(request, space_id, permission_names):
             return Response(
                 ERROR_MESSAGES["400_ERRORS"], status=status.HTTP_400_BAD_REQUEST
             )
 
         data = request.data.copy()
-        data['project'] = project_id
-        data['last_updated_at'] = timezone.now()
+        data["project"] = project_id
+        data["last_updated_at"] = timezone.now()
         serializer = ContentsSerializer(data=data)
 
         if serializer.is_valid():
@@ -85,7 +102,7 @@ class ContentsListCreateAPIView(APIView):
             serializer.save(
                 project=project,
             )
-            return Response({'status': 'success'}, status=status.HTTP_200_OK)
+            return Response({"status": "success"}, status=status.HTTP_200_OK)
 
         return Response(
             ERROR_MESSAGES["400_ERRORS"], status=status.HTTP_400_BAD_REQUEST
@@ -94,44 +111,76 @@ class ContentsListCreateAPIView(APIView):
 
 # 詳細/複製/更新/削除用
 class ContentsRetrieveReproduceUpdateDestroyAPIView(APIView):
+    # 参照系はトークンのクレームのみで認証（更新系はアカウントの存在・削除済みでないことも確認）
+    authentication_classes = (CookieJWTStatelessAuthentication,)
     # 認証が必要
     permission_classes = (IsAuthenticated,)
-
-    # 詳細取得
-    def get(self, request, space_id, project_id, contents_id):
-        # ユーザーがそのスペースでの対象の操作権限があるかチェック
-        permission_names = ['creator']
-        permission_ids = list(Permission.objects.filter(name__in=permission_names, deleted_at__isnull=True).values_list('id', flat=True))
-        if not check_space_permission(request.user, space_id, permission_ids):
-            return Response(
-                ERROR_MESSAGES["400_ERRORS"], status=status.HTTP_400_BAD_REQUEST
+    # 性能の予算（npi.testing）
+    performance_budgets = {
+        # 権限 + 詳細
+        "GET": {"queries": 2, "db_time": 0.05, "wall_time": 0.5},
+        # アカウント（キャッシュがない場合） + 権限 + 複製元の取得 + プロジェクトの存在チェック + 名前の重複チェック + プロジェクトの取得 + 登録
+        "POST": {"queries": 7, "db_time": 0.05, "wall_time": 0.5},
+        # アカウント（キャッシュがない場合） + 権限 + 取得 + プロジェクトの存在チェック + 名前の重複チェック + プロジェクトの取得 + 更新
+        "PUT": {"queries": 7, "db_time": 0.05, "wall_time": 0.5},
+        # アカウント（キャッシュがない場合） + 権限 + 取得 + 削除
+        "DELETE": {"queries": 4, "db_time": 0.05, "wall_time": 0.5},
+    }
+
+    # 詳細取得できる権限
+    detail_permission_names = [PERM.creator]
+
+    # 対象のコンテンツを取得（存在しない場合は None）
+    def get_contents(self, project_id, contents_id):
+        try:
+            return Contents.objects.get(
+                id=contents_id, project_id=project_id, deleted_at__isnull=True
             )
+        except Contents.DoesNotExist:
+            return None
+
+    # get_contents の非同期版
+    async def aget_contents(self, project_id, contents_id):
+        try:
+            return await Contents.objects.aget(
+                id=contents_id, project_id=project_id, deleted_at__isnull=True
+            )
+        except Contents.DoesNotExist:
+            return None
 
-        contents = Contents.objects.get(id=contents_id, project_id=project_id, deleted_at__isnull=True)
-
+    # 詳細のレスポンス（同期・非同期で共通）
+    def detail_response(self, contents):
         if not contents:
             return Response(
                 ERROR_MESSAGES["404_ERRORS"], status=status.HTTP_404_NOT_FOUND
             )
 
         serializer = ContentsSerializer(contents)
-        return Response({
-            'status': 'success',
-            'data': serializer.data
-        }, status=status.HTTP_200_OK)
+        return Response(
+            {"status": "success", "data": serializer.data}, status=status.HTTP_200_OK
+        )
+
+    # 詳細取得
+    def get(self, request, space_id, project_id, contents_id):
+        # ユーザーがそのスペースでの対象の操作権限があるかチェック
+        if not has_space_permission(request, space_id, self.detail_permission_names):
+            return Response(
+                ERROR_MESSAGES["400_ERRORS"], status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return self.detail_response(self.get_contents(project_id, contents_id))
 
     # 複製
     def post(self, request, space_id, project_id, contents_id):
         # ユーザーがそのスペースでの対象の操作権限があるかチェック
-        permission_names = ['creator']
-        permission_ids = list(Permission.objects.filter(name__in=permission_names, deleted_at__isnull=True).values_list('id', flat=True))
-        if not check_space_permission(request.user, space_id, permission_ids):
+        permission_names = [PERM.creator]
+        if not has_space_permission(request, space_id, permission_names):
             return Response(
                 ERROR_MESSAGES["400_ERRORS"], status=status.HTTP_400_BAD_REQUEST
             )
 
         # 複製元のコンテンツを取得
-        base_contents = Contents.objects.get(id=contents_id, project_id=project_id, deleted_at__isnull=True)
+        base_contents = self.get_contents(project_id, contents_id)
 
         if not base_contents:
             return Response(
@@ -140,13 +189,13 @@ class ContentsRetrieveReproduceUpdateDestroyAPIView(APIView):
 
         data = request.data.copy()
         content_data = {
-            'name': data['name'],
-            'description': data['description'],
-            'project': project_id,
-            'production_status_id': base_contents.production_status_id,
-            'script_path': base_contents.script_path,
-            'is_10_return_move_on_display': base_contents.is_10_return_move_on_display,
-            'last_updated_at': timezone.now(),
+            "name": data["name"],
+            "description": data["description"],
+            "project": project_id,
+            "production_status_id": base_contents.production_status_id,
+            "script_path": base_contents.script_path,
+            "is_10_return_move_on_display": base_contents.is_10_return_move_on_display,
+            "last_updated_at": timezone.now(),
         }
 
         serializer = ContentsSerializer(data=content_data)
@@ -159,7 +208,7 @@ class ContentsRetrieveReproduceUpdateDestroyAPIView(APIView):
             )
 
             # 実際はその他の情報も複製するが、現時点ではコンテンツ情報のみ複製する
-            return Response({'status': 'success'}, status=status.HTTP_200_OK)
+            return Response({"status": "success"}, status=status.HTTP_200_OK)
 
         return Response(
             ERROR_MESSAGES["400_ERRORS"], status=status.HTTP_400_BAD_REQUEST
@@ -168,14 +217,13 @@ class ContentsRetrieveReproduceUpdateDestroyAPIView(APIView):
     # 更新
     def put(self, request, space_id, project_id, contents_id):
         # ユーザーがそのスペースでの対象の操作権限があるかチェック
-        permission_names = ['creator']
-        permission_ids = list(Permission.objects.filter(name__in=permission_names, deleted_at__isnull=True).values_list('id', flat=True))
-        if not check_space_permission(request.user, space_id, permission_ids):
+        permission_names = [PERM.creator]
+        if not has_space_permission(request, space_id, permission_names):
             return Response(
                 ERROR_MESSAGES["400_ERRORS"], status=status.HTTP_400_BAD_REQUEST
             )
 
-        contents = Contents.objects.get(id=contents_id, project_id=project_id, deleted_at__isnull=True)
+        contents = self.get_contents(project_id, contents_id)
 
         if not contents:
             return Response(
@@ -183,8 +231,8 @@ class ContentsRetrieveReproduceUpdateDestroyAPIView(APIView):
             )
 
         data = request.data.copy()
-        data['project'] = project_id
-        data['last_updated_at'] = timezone.now()
+        data["project"] = project_id
+        data["last_updated_at"] = timezone.now()
         serializer = ContentsSerializer(contents, data)
 
         if serializer.is_valid():
@@ -193,7 +241,7 @@ class ContentsRetrieveReproduceUpdateDestroyAPIView(APIView):
             serializer.save(
                 project=project,
             )
-            return Response({'status': 'success'}, status=status.HTTP_200_OK)
+            return Response({"status": "success"}, status=status.HTTP_200_OK)
 
         return Response(
             ERROR_MESSAGES["400_ERRORS"], status=status.HTTP_400_BAD_REQUEST
@@ -202,14 +250,13 @@ class ContentsRetrieveReproduceUpdateDestroyAPIView(APIView):
     # 削除
     def delete(self, request, space_id, project_id, contents_id):
         # ユーザーがそのスペースでの対象の操作権限があるかチェック
-        permission_names = ['creator']
-        permission_ids = list(Permission.objects.filter(name__in=permission_names, deleted_at__isnull=True).values_list('id', flat=True))
-        if not check_space_permission(request.user, space_id, permission_ids):
+        permission_names = [PERM.creator]
+        if not has_space_permission(request, space_id, permission_names):
             return Response(
                 ERROR_MESSAGES["400_ERRORS"], status=status.HTTP_400_BAD_REQUEST
             )
 
-        contents = Contents.objects.get(id=contents_id, project_id=project_id, deleted_at__isnull=True)
+        contents = self.get_contents(project_id, contents_id)
 
         if not contents:
             return Response(
@@ -217,4 +264,53 @@ class ContentsRetrieveReproduceUpdateDestroyAPIView(APIView):
             )
 
         contents.delete()
-        return Response({'status': 'success'}, status=status.HTTP_200_OK)
+        return Response({"status": "success"}, status=status.HTTP_200_OK)
+
+
+# ContentsListCreateAPIView の非同期版（ASGIで動かす場合に使う）
+# 一覧取得のみ非同期で処理し、作成は同期処理をスレッドで実行する
+class AsyncContentsListCreateAPIView(AsyncAPIView, ContentsListCreateAPIView):
+
+    # 一覧取得
+    async def get(self, request, space_id, project_id):
+        # ユーザーがそのスペースでの対象の操作権限があるかチェック
+        if not await ahas_space_permission(
+            request, space_id, self.list_permission_names
+        ):
+            return Response(
+                ERROR_MESSAGES["400_ERRORS"], status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # 必須チェック
+        error = list_params_error(request)
+        if error is not None:
+            return error
+
+        # ページネーションの設定
+        paginator = get_paginator(request, self.orderings)
+
+        contents = self.get_queryset(request, project_id)
+        # ページネーションを適用
+        page = await paginator.apaginate_queryset(contents, request)
+        if page is None:
+            contents = [item async for item in contents]
+        return self.list_response(paginator, page, contents)
+
+
+# ContentsRetrieveReproduceUpdateDestroyAPIView の非同期版（ASGIで動かす場合に使う）
+# 詳細取得のみ非同期で処理し、複製/更新/削除は同期処理をスレッドで実行する
+class AsyncContentsRetrieveReproduceUpdateDestroyAPIView(
+    AsyncAPIView, ContentsRetrieveReproduceUpdateDestroyAPIView
+):
+
+    # 詳細取得
+    async def get(self, request, space_id, project_id, contents_id):
+        # ユーザーがそのスペースでの対象の操作権限があるかチェック
+        if not await ahas_space_permission(
+            request, space_id, self.detail_permission_names
+        ):
+            return Response(
+                ERROR_MESSAGES["400_ERRORS"], status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return self.detail_response(await self.aget_contents(project_id, contents_id))
@@ -3,6 +3,7 @@ from django.core.validators import (
     MaxLengthValidator,
 )
 from shared.models import Space, Project
+from npi.instrumentation import TimedSerializerMixin
 
 
 def validate_space_exists(value):
@@ -11,7 +12,7 @@ def validate_space_exists(value):
         raise serializers.ValidationError("存在しないスペースが指定されています。")
 
 
-class ProjectSerializer(serializers.ModelSerializer):
+class ProjectSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     name = serializers.CharField(
         required=True,
         validators=[
@@ -21,42 +22,44 @@ class ProjectSerializer(serializers.ModelSerializer):
 
     description = serializers.CharField(
         validators=[
-            MaxLengthValidator(1000, message="説明は1000文字以下である必要があります。"),
+            MaxLengthValidator(
+                1000, message="説明は1000文字以下である必要があります。"
+            ),
         ],
     )
 
     space = serializers.IntegerField(
         required=True,
-        validators=[
-            validate_space_exists
-        ],
+        validators=[validate_space_exists],
         write_only=True,
     )
 
     def validate(self, data):
-        if Project.objects.filter(name=data['name'], space=data['space']).exists():
-            raise serializers.ValidationError("同じ名前とスペースの組み合わせが既に存在します。")
+        if Project.objects.filter(name=data["name"], space=data["space"]).exists():
+            raise serializers.ValidationError(
+                "同じ名前とスペースの組み合わせが既に存在します。"
+            )
         return data
 
     class Meta:
         model = Project
         fields = [
-            'id',
-            'logical_project_id',
-            'name',
-            'description',
-            'space',
-            'last_updated_at',
+            "id",
+            "logical_project_id",
+            "name",
+            "description",
+            "space",
+            "last_updated_at",
         ]
-        read_only_fields = ['id', 'logical_project_id']
+        read_only_fields = ["id", "logical_project_id"]
 
     def to_representation(self, instance):
         # 通常のデータ表現を取得
         data = super().to_representation(instance)
 
         # 仮置き()
-        data['last_status'] = "public"
-        data['project_play_count_last_month'] = 12345
-        data['projects_play_count_two_months_ago'] = 67890
+        data["last_status"] = "public"
+        data["project_play_count_last_month"] = 12345
+        data["projects_play_count_two_months_ago"] = 67890
 
         return data
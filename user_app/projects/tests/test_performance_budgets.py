@@ -0,0 +1,73 @@
+from django_hosts.resolvers import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from npi.testing import PerformanceBudgetMixin
+
+
+class ProjectPerformanceBudgetTests(PerformanceBudgetMixin, APITestCase):
+    def setUp(self):
+        self.set_up_space("space_admin", projects=10, contents_per_project=3)
+        self.list_url = reverse(
+            "project-list-create", kwargs={"space_id": self.space_id}, host="user_app"
+        )
+        self.detail_url = reverse(
+            "project-detail",
+            kwargs={"space_id": self.space_id, "project_id": self.project.id},
+            host="user_app",
+        )
+
+    def test_get_project_list_budget(self):
+        """
+        一覧取得が予算内に収まること
+        """
+        response = self.assertWithinBudget(
+            "get", self.list_url, {"page": 1, "per_page": 10}
+        )
+        self.assertEqual(len(response.data["data"]), 10)
+
+    def test_get_project_list_cold_budget(self):
+        """
+        キャッシュがない状態での一覧取得が予算内に収まること
+        """
+        response = self.assertWithinBudget(
+            "get", self.list_url, {"page": 1, "per_page": 10}, warm_up=False
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_create_project_budget(self):
+        """
+        作成が予算内に収まること
+        """
+        response = self.assertWithinBudget(
+            "post",
+            self.list_url,
+            {"name": "New Project", "description": "Project description"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_get_project_detail_budget(self):
+        """
+        詳細取得が予算内に収まること
+        """
+        response = self.assertWithinBudget("get", self.detail_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_update_project_budget(self):
+        """
+        更新が予算内に収まること
+        """
+        response = self.assertWithinBudget(
+            "put",
+            self.detail_url,
+            {"name": "Updated Project", "description": "Updated description"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_delete_project_budget(self):
+        """
+        削除が予算内に収まること
+        """
+        response = self.assertWithinBudget("delete", self.detail_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -1,14 +1,27 @@
 from django_hosts.resolvers import reverse
 from rest_framework import status
-from rest_framework.test import APITestCase
-from shared.models import Account, Space, SpaceAccount, Permission, SpaceAccountPermission, Project
+from rest_framework.test import APITestCase, APIRequestFactory
+from asgiref.sync import async_to_sync
+from shared.models import (
+    Account,
+    Space,
+    SpaceAccount,
+    Permission,
+    SpaceAccountPermission,
+    Project,
+)
 from django.utils import timezone
 from django.contrib.auth.hashers import make_password
+from npi.utils import ERROR_MESSAGES
+from user_app.projects.views import (
+    AsyncProjectListCreateAPIView,
+    AsyncProjectRetrieveUpdateDestroyAPIView,
+)
 
 
 class ProjectListCreateAPIViewTests(APITestCase):
     def setUp(self):
-        self.login_url = reverse("login", host='user_app')
+        self.login_url = reverse("login", host="user_app")
 
         # 検証用アカウントの作成
         self.account1 = Account.objects.create(
@@ -18,19 +31,25 @@ class ProjectListCreateAPIViewTests(APITestCase):
         )
 
         # 検証用スペースの作成
-        self.space1 = Space.objects.create(name='Test Space 1', icon_image_path='path/to/icon1.png', description='This is a test space description.')
+        self.space1 = Space.objects.create(
+            name="Test Space 1",
+            icon_image_path="path/to/icon1.png",
+            description="This is a test space description.",
+        )
         self.space_id = self.space1.id
 
         # 検証用スペースアカウントの作成
-        self.space_account1 = SpaceAccount.objects.create(space=self.space1, account=self.account1)
+        self.space_account1 = SpaceAccount.objects.create(
+            space=self.space1, account=self.account1
+        )
 
         # 検証用権限の作成
-        self.permission1 = Permission.objects.create(name='space_admin')
+        self.permission1 = Permission.objects.create(name="space_admin")
 
         # 検証用スペースアカウント権限の作成
         self.space_account_permission1 = SpaceAccountPermission.objects.create(
             space_account=self.space_account1,
-            permission=Permission.objects.get(name='space_admin')
+            permission=Permission.objects.get(name="space_admin"),
         )
 
         # JWTトークンの取得
@@ -46,37 +65,154 @@ class ProjectListCreateAPIViewTests(APITestCase):
         """
         正常系
         """
-        Project.objects.create(name='Project 1', space=self.space1, last_updated_at=timezone.now())
-        Project.objects.create(name='Project 2', space=self.space1, last_updated_at=timezone.now())
+        Project.objects.create(
+            name="Project 1", space=self.space1, last_updated_at=timezone.now()
+        )
+        Project.objects.create(
+            name="Project 2", space=self.space1, last_updated_at=timezone.now()
+        )
+
+        url = reverse(
+            "project-list-create", kwargs={"space_id": self.space_id}, host="user_app"
+        )
+        response = self.client.get(url, {"page": 1, "per_page": 10})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["data"]), 2)
+
+    def test_get_project_list_async(self):
+        """
+        正常系(非同期ビュー)
+        """
+        Project.objects.create(
+            name="Project 1", space=self.space1, last_updated_at=timezone.now()
+        )
+        Project.objects.create(
+            name="Project 2", space=self.space1, last_updated_at=timezone.now()
+        )
+
+        url = reverse(
+            "project-list-create", kwargs={"space_id": self.space_id}, host="user_app"
+        )
+        request = APIRequestFactory().get(url, {"page": 1, "per_page": 10})
+        request.COOKIES["access_token"] = self.client.cookies["access_token"].value
+        response = async_to_sync(AsyncProjectListCreateAPIView.as_view())(
+            request, space_id=self.space_id
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["data"]), 2)
+
+    def test_get_project_list_cursor(self):
+        """
+        正常系(キーセット方式のページネーション)
+        """
+        now = timezone.now()
+        for i in range(5):
+            Project.objects.create(
+                name=f"Project {i}",
+                space=self.space1,
+                last_updated_at=now - timezone.timedelta(minutes=i),
+            )
+        Project.objects.create(name="Project without update", space=self.space1)
+
+        url = reverse(
+            "project-list-create", kwargs={"space_id": self.space_id}, host="user_app"
+        )
+        names = []
+        params = {"pagination": "cursor", "order": "last_updated_at", "per_page": 4}
+        while True:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn("total_items", response.data["pagination"])
+            names += [project["name"] for project in response.data["data"]]
+            if not response.data["pagination"]["has_next"]:
+                break
+            params["cursor"] = response.data["pagination"]["next_cursor"]
+
+        # 最終更新日時の新しい順（未更新は最後）に、重複・欠落なく取得できること
+        self.assertEqual(
+            names, [f"Project {i}" for i in range(5)] + ["Project without update"]
+        )
+
+    def test_get_project_list_cursor_with_count(self):
+        """
+        正常系(キーセット方式のページネーションで件数も取得)
+        """
+        for i in range(3):
+            Project.objects.create(
+                name=f"Project {i}", space=self.space1, last_updated_at=timezone.now()
+            )
 
-        url = reverse('project-list-create', kwargs={'space_id': self.space_id}, host='user_app')
-        response = self.client.get(url, {'page': 1, 'per_page': 10})
+        url = reverse(
+            "project-list-create", kwargs={"space_id": self.space_id}, host="user_app"
+        )
+        response = self.client.get(
+            url, {"pagination": "cursor", "per_page": 2, "with_count": "true"}
+        )
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data['data']), 2)
+        self.assertEqual(
+            [project["name"] for project in response.data["data"]],
+            ["Project 0", "Project 1"],
+        )
+        self.assertEqual(response.data["pagination"]["total_items"], 3)
+        self.assertTrue(response.data["pagination"]["has_next"])
+
+    def test_get_project_list_invalid_cursor(self):
+        """
+        異常系(カーソルが不正)
+        """
+        url = reverse(
+            "project-list-create", kwargs={"space_id": self.space_id}, host="user_app"
+        )
+        response = self.client.get(
+            url, {"pagination": "cursor", "per_page": 2, "cursor": "invalid"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
     def test_create_project(self):
         """
         正常系
         """
-        url = reverse('project-list-create', kwargs={'space_id': self.space_id}, host='user_app')
-        data = {
-            'name': 'New Project',
-            'description': 'Project description'
-        }
-        response = self.client.post(url, data, format='json')
+        url = reverse(
+            "project-list-create", kwargs={"space_id": self.space_id}, host="user_app"
+        )
+        data = {"name": "New Project", "description": "Project description"}
+        response = self.client.post(url, data, format="json")
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(Project.objects.count(), 1)
-        self.assertEqual(Project.objects.get().name, 'New Project')
+        self.assertEqual(Project.objects.get().name, "New Project")
+
+    def test_create_project_by_deleted_account(self):
+        """
+        異常系(削除済みアカウント。アクセストークンが有効期限内でも更新系は認証しない)
+        """
+        self.account1.deleted_at = timezone.now()
+        self.account1.save()
+        url = reverse(
+            "project-list-create", kwargs={"space_id": self.space_id}, host="user_app"
+        )
+        response = self.client.post(
+            url,
+            {"name": "New Project", "description": "Project description"},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(Project.objects.count(), 0)
 
     def test_get_project_list_without_permission(self):
         """
         異常系(権限なし)
         """
         self.client.force_authenticate(user=None)
-        url = reverse('project-list-create', kwargs={'space_id': self.space_id}, host='user_app')
-        response = self.client.get(url, {'page': 1, 'per_page': 10})
+        url = reverse(
+            "project-list-create", kwargs={"space_id": self.space_id}, host="user_app"
+        )
+        response = self.client.get(url, {"page": 1, "per_page": 10})
 
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
@@ -85,12 +221,11 @@ class ProjectListCreateAPIViewTests(APITestCase):
         異常系(権限なし)
         """
         self.client.force_authenticate(user=None)
-        url = reverse('project-list-create', kwargs={'space_id': self.space_id}, host='user_app')
-        data = {
-            'name': 'New Project',
-            'description': 'Project description'
-        }
-        response = self.client.post(url, data, format='json')
+        url = reverse(
+            "project-list-create", kwargs={"space_id": self.space_id}, host="user_app"
+        )
+        data = {"name": "New Project", "description": "Project description"}
+        response = self.client.post(url, data, format="json")
 
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
         self.assertEqual(Project.objects.count(), 0)
@@ -101,23 +236,56 @@ class ProjectListCreateAPIViewTests(APITestCase):
         """
         self.space_account_permission1.delete()
 
-        url = reverse('project-list-create', kwargs={'space_id': self.space_id}, host='user_app')
-        response = self.client.get(url, {'page': 1, 'per_page': 10})
+        url = reverse(
+            "project-list-create", kwargs={"space_id": self.space_id}, host="user_app"
+        )
+        response = self.client.get(url, {"page": 1, "per_page": 10})
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_get_project_list_after_space_permission_revoked(self):
+        """
+        異常系(一度アクセスした後にスペースでの操作権限が論理削除された場合)
+        """
+        url = reverse(
+            "project-list-create", kwargs={"space_id": self.space_id}, host="user_app"
+        )
+        response = self.client.get(url, {"page": 1, "per_page": 10})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.space_account_permission1.deleted_at = timezone.now()
+        self.space_account_permission1.save()
+
+        response = self.client.get(url, {"page": 1, "per_page": 10})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_get_project_list_after_permission_master_deleted(self):
+        """
+        異常系(権限マスタが論理削除された場合)
+        """
+        url = reverse(
+            "project-list-create", kwargs={"space_id": self.space_id}, host="user_app"
+        )
+        response = self.client.get(url, {"page": 1, "per_page": 10})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.permission1.deleted_at = timezone.now()
+        self.permission1.save()
+
+        response = self.client.get(url, {"page": 1, "per_page": 10})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_create_project_without_space_permission(self):
         """
         異常系(スペースでの操作権限なし)
         """
         self.space_account_permission1.delete()
 
-        url = reverse('project-list-create', kwargs={'space_id': self.space_id}, host='user_app')
-        data = {
-            'name': 'New Project',
-            'description': 'Project description'
-        }
-        response = self.client.post(url, data, format='json')
+        url = reverse(
+            "project-list-create", kwargs={"space_id": self.space_id}, host="user_app"
+        )
+        data = {"name": "New Project", "description": "Project description"}
+        response = self.client.post(url, data, format="json")
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertEqual(Project.objects.count(), 0)
@@ -125,7 +293,7 @@ class ProjectListCreateAPIViewTests(APITestCase):
 
 class ProjectRetrieveUpdateDestroyAPIViewTests(APITestCase):
     def setUp(self):
-        self.login_url = reverse("login", host='user_app')
+        self.login_url = reverse("login", host="user_app")
 
         # 検証用アカウントの作成
         self.account1 = Account.objects.create(
@@ -135,23 +303,31 @@ class ProjectRetrieveUpdateDestroyAPIViewTests(APITestCase):
         )
 
         # 検証用スペースの作成
-        self.space1 = Space.objects.create(name='Test Space 1', icon_image_path='path/to/icon1.png', description='This is a test space description.')
+        self.space1 = Space.objects.create(
+            name="Test Space 1",
+            icon_image_path="path/to/icon1.png",
+            description="This is a test space description.",
+        )
         self.space_id = self.space1.id
 
         # 検証用スペースアカウントの作成
-        self.space_account1 = SpaceAccount.objects.create(space=self.space1, account=self.account1)
+        self.space_account1 = SpaceAccount.objects.create(
+            space=self.space1, account=self.account1
+        )
 
         # 検証用権限の作成
-        self.permission1 = Permission.objects.create(name='space_admin')
+        self.permission1 = Permission.objects.create(name="space_admin")
 
         # 検証用スペースアカウント権限の作成
         self.space_account_permission1 = SpaceAccountPermission.objects.create(
             space_account=self.space_account1,
-            permission=Permission.objects.get(name='space_admin')
+            permission=Permission.objects.get(name="space_admin"),
         )
 
         # 検証用プロジェクトの作成
-        self.project1 = Project.objects.create(name='Project 1', space=self.space1, last_updated_at=timezone.now())
+        self.project1 = Project.objects.create(
+            name="Project 1", space=self.space1, last_updated_at=timezone.now()
+        )
         self.project_id = self.project1.id
 
         # JWTトークンの取得
@@ -167,41 +343,128 @@ class ProjectRetrieveUpdateDestroyAPIViewTests(APITestCase):
         """
         正常系
         """
-        url = reverse('project-detail', kwargs={'space_id': self.space_id, 'project_id': self.project_id}, host='user_app')
+        url = reverse(
+            "project-detail",
+            kwargs={"space_id": self.space_id, "project_id": self.project_id},
+            host="user_app",
+        )
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data['data']['name'], 'Project 1')
+        self.assertEqual(response.data["data"]["name"], "Project 1")
+
+    def test_get_project_detail_without_account_query(self):
+        """
+        正常系(2回目以降はアカウント・権限を取得せず、プロジェクトの取得のみ)
+        """
+        url = reverse(
+            "project-detail",
+            kwargs={"space_id": self.space_id, "project_id": self.project_id},
+            host="user_app",
+        )
+        self.client.get(url)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
 
     def test_update_project(self):
         """
         正常系
         """
-        url = reverse('project-detail', kwargs={'space_id': self.space_id, 'project_id': self.project_id}, host='user_app')
-        data = {
-            'name': 'Updated Project',
-            'description': 'Updated description'
-        }
-        response = self.client.put(url, data, format='json')
+        url = reverse(
+            "project-detail",
+            kwargs={"space_id": self.space_id, "project_id": self.project_id},
+            host="user_app",
+        )
+        data = {"name": "Updated Project", "description": "Updated description"}
+        response = self.client.put(url, data, format="json")
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(Project.objects.get(id=self.project_id).name, 'Updated Project')
+        self.assertEqual(
+            Project.objects.get(id=self.project_id).name, "Updated Project"
+        )
 
     def test_delete_project(self):
         """
         正常系
         """
-        url = reverse('project-detail', kwargs={'space_id': self.space_id, 'project_id': self.project_id}, host='user_app')
+        url = reverse(
+            "project-detail",
+            kwargs={"space_id": self.space_id, "project_id": self.project_id},
+            host="user_app",
+        )
         response = self.client.delete(url)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertFalse(Project.objects.filter(id=self.project_id).exists())
 
+    def test_get_project_detail_async(self):
+        """
+        正常系(非同期ビュー)
+        """
+        url = reverse(
+            "project-detail",
+            kwargs={"space_id": self.space_id, "project_id": self.project_id},
+            host="user_app",
+        )
+        request = APIRequestFactory().get(url)
+        request.COOKIES["access_token"] = self.client.cookies["access_token"].value
+        response = async_to_sync(AsyncProjectRetrieveUpdateDestroyAPIView.as_view())(
+            request, space_id=self.space_id, project_id=self.project_id
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["data"]["name"], "Project 1")
+
+    def test_project_not_found(self):
+        """
+        異常系(存在しないプロジェクト)(詳細取得・更新・削除)
+        """
+        url = reverse(
+            "project-detail",
+            kwargs={"space_id": self.space_id, "project_id": self.project_id + 100},
+            host="user_app",
+        )
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.data, ERROR_MESSAGES["404_ERRORS"])
+        self.assertEqual(
+            self.client.put(
+                url, {"name": "Updated Project"}, format="json"
+            ).status_code,
+            status.HTTP_404_NOT_FOUND,
+        )
+        self.assertEqual(self.client.delete(url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_get_project_detail_not_found_async(self):
+        """
+        異常系(存在しないプロジェクト)(非同期ビュー)
+        """
+        url = reverse(
+            "project-detail",
+            kwargs={"space_id": self.space_id, "project_id": self.project_id + 100},
+            host="user_app",
+        )
+        request = APIRequestFactory().get(url)
+        request.COOKIES["access_token"] = self.client.cookies["access_token"].value
+        response = async_to_sync(AsyncProjectRetrieveUpdateDestroyAPIView.as_view())(
+            request, space_id=self.space_id, project_id=self.project_id + 100
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.data, ERROR_MESSAGES["404_ERRORS"])
+
     def test_get_project_detail_without_permission(self):
         """
         異常系(権限なし)
         """
         self.client.force_authenticate(user=None)
-        url = reverse('project-detail', kwargs={'space_id': self.space_id, 'project_id': self.project_id}, host='user_app')
+        url = reverse(
+            "project-detail",
+            kwargs={"space_id": self.space_id, "project_id": self.project_id},
+            host="user_app",
+        )
         response = self.client.get(url)
 
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -211,22 +474,27 @@ class ProjectRetrieveUpdateDestroyAPIViewTests(APITestCase):
         異常系(権限なし)
         """
         self.client.force_authenticate(user=None)
-        url = reverse('project-detail', kwargs={'space_id': self.space_id, 'project_id': self.project_id}, host='user_app')
-        data = {
-            'name': 'Updated Project',
-            'description': 'Updated description'
-        }
-        response = self.client.put(url, data, format='json')
+        url = reverse(
+            "project-detail",
+            kwargs={"space_id": self.space_id, "project_id": self.project_id},
+            host="user_app",
+        )
+        data = {"name": "Updated Project", "description": "Updated description"}
+        response = self.client.put(url, data, format="json")
 
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
-        self.assertEqual(Project.objects.get(id=self.project_id).name, 'Project 1')
+        self.assertEqual(Project.objects.get(id=self.project_id).name, "Project 1")
 
     def test_delete_project_without_permission(self):
         """
         異常系(権限なし)
         """
         self.client.force_authenticate(user=None)
-        url = reverse('project-detail', kwargs={'space_id': self.space_id, 'project_id': self.project_id}, host='user_app')
+        url = reverse(
+            "project-detail",
+            kwargs={"space_id": self.space_id, "project_id": self.project_id},
+            host="user_app",
+        )
         response = self.client.delete(url)
 
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -238,7 +506,11 @@ class ProjectRetrieveUpdateDestroyAPIViewTests(APITestCase):
         """
         self.space_account_permission1.delete()
 
-        url = reverse('project-detail', kwargs={'space_id': self.space_id, 'project_id': self.project_id}, host='user_app')
+        url = reverse(
+            "project-detail",
+            kwargs={"space_id": self.space_id, "project_id": self.project_id},
+            host="user_app",
+        )
         response = self.client.get(url)
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -249,15 +521,16 @@ class ProjectRetrieveUpdateDestroyAPIViewTests(APITestCase):
         """
         self.space_account_permission1.delete()
 
-        url = reverse('project-detail', kwargs={'space_id': self.space_id, 'project_id': self.project_id}, host='user_app')
-        data = {
-            'name': 'Updated Project',
-            'description': 'Updated description'
-        }
-        response = self.client.put(url, data, format='json')
+        url = reverse(
+            "project-detail",
+            kwargs={"space_id": self.space_id, "project_id": self.project_id},
+            host="user_app",
+        )
+        data = {"name": "Updated Project", "description": "Updated description"}
+        response = self.client.put(url, data, format="json")
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertEqual(Project.objects.get(id=self.project_id).name, 'Project 1')
+        self.assertEqual(Project.objects.get(id=self.project_id).name, "Project 1")
 
     def test_delete_project_without_space_permission(self):
         """
@@ -265,7 +538,11 @@ class ProjectRetrieveUpdateDestroyAPIViewTests(APITestCase):
         """
         self.space_account_permission1.delete()
 
-        url = reverse('project-detail', kwargs={'space_id': self.space_id, 'project_id': self.project_id}, host='user_app')
+        url = reverse(
+            "project-detail",
+            kwargs={"space_id": self.space_id, "project_id": self.project_id},
+            host="user_app",
+        )
         response = self.client.delete(url)
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,182 @@
+import json
+from urllib.parse import urlsplit
+from django_hosts.resolvers import reverse
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+from shared.models import (
+    Account,
+    Space,
+    SpaceAccount,
+    Permission,
+    SpaceAccountPermission,
+    Project,
+)
+from django.utils import timezone
+from django.contrib.auth.hashers import make_password
+from shared.registry import permission_registry
+
+
+@override_settings(REQUEST_METRICS={"LOG": False, "SERVER_TIMING": True})
+class RequestMetricsTests(APITestCase):
+    def setUp(self):
+        self.login_url = reverse("login", host="user_app")
+
+        # 検証用アカウントの作成
+        self.account1 = Account.objects.create(
+            email="test@example.com",
+            password=make_password("securepassword1"),
+            name="Test User",
+        )
+
+        # 検証用スペース・スペースアカウント・権限の作成
+        self.space1 = Space.objects.create(
+            name="Test Space 1",
+            icon_image_path="path/to/icon1.png",
+            description="This is a test space description.",
+        )
+        self.space_account1 = SpaceAccount.objects.create(
+            space=self.space1, account=self.account1
+        )
+        SpaceAccountPermission.objects.create(
+            space_account=self.space_account1,
+            permission=Permission.objects.create(name="space_admin"),
+        )
+        for i in range(3):
+            Project.objects.create(
+                name=f"Project {i}", space=self.space1, last_updated_at=timezone.now()
+            )
+
+        # JWTトークンの取得
+        login_response = self.client.post(
+            self.login_url, {"email": "test@example.com", "password": "securepassword1"}
+        )
+        self.assertEqual(login_response.status_code, status.HTTP_200_OK)
+        self.client.cookies["access_token"] = login_response.cookies.get(
+            "access_token"
+        ).value
+
+        self.list_url = reverse(
+            "project-list-create", kwargs={"space_id": self.space1.id}, host="user_app"
+        )
+        permission_registry.load()
+
+    @override_settings(REQUEST_METRICS={"LOG": True, "SERVER_TIMING": True})
+    def test_request_metrics_log(self):
+        """
+        リクエストごとにホスト・ビュー・クエリ数・処理時間がログに出力されること
+        """
+        with self.assertLogs("npi.performance", level="INFO") as logs:
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(self.list_url, {"page": 1, "per_page": 10})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        record = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(record["method"], "GET")
+        self.assertEqual(record["path"], urlsplit(self.list_url).path)
+        self.assertEqual(record["status"], 200)
+        self.assertEqual(record["host"], "user_app")
+        self.assertEqual(record["view"], "project-list-create")
+        self.assertEqual(record["db_queries"], len(context.captured_queries))
+        self.assertGreater(record["auth_ms"], 0)
+        self.assertGreater(record["serializer_ms"], 0)
+        self.assertGreaterEqual(record["total_ms"], record["db_ms"])
+
+    def test_server_timing_header(self):
+        """
+        計測結果が Server-Timing ヘッダーで返されること
+        """
+        response = self.client.get(self.list_url, {"page": 1, "per_page": 10})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        timings = {
+            entry.split(";")[0].strip(): entry
+            for entry in response["Server-Timing"].split(",")
+        }
+        self.assertEqual(set(timings), {"db", "auth", "serializer", "total"})
+        self.assertIn("queries", timings["db"])
+
+    @override_settings(REQUEST_METRICS={"LOG": False, "SERVER_TIMING": False})
+    def test_disabled(self):
+        """
+        無効にした場合は Server-Timing ヘッダーを返さないこと
+        """
+        response = self.client.get(self.list_url, {"page": 1, "per_page": 10})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.has_header("Server-Timing"))
+
+    def test_metrics_endpoint(self):
+        """
+        /metrics でビューごとのリクエスト数・処理時間・クエリ数・キャッシュのヒット数が返されること
+        """
+        for _ in range(2):
+            self.client.get(self.list_url, {"page": 1, "per_page": 10})
+
+        response = self.client.get(reverse("metrics", host="user_app"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        body = response.content.decode()
+        self.assertIn(
+            'npi_requests_total{host="user_app",method="GET",status="200",view="project-list-create"}',
+            body,
+        )
+        self.assertIn(
+            'npi_request_duration_seconds_bucket{host="user_app",le="0.005",method="GET",view="project-list-create"}',
+            body,
+        )
+        self.assertIn(
+            'npi_db_queries_total{host="user_app",view="project-list-create"}', body
+        )
+        self.assertIn(
+            'npi_cache_requests_total{cache="verified_token",result="hit"}', body
+        )
+
+    def test_metrics_endpoint_from_outside(self):
+        """
+        許可していない接続元からの /metrics は 404 を返し、トークンを指定した場合のみ返すこと
+        """
+        url = reverse("metrics", host="user_app")
+        self.assertEqual(
+            self.client.get(url, REMOTE_ADDR="203.0.113.10").status_code,
+            status.HTTP_404_NOT_FOUND,
+        )
+
+        with override_settings(
+            METRICS={"TOKEN": "metrics-token", "ALLOWED_IPS": ["10.0.0.0/8"]}
+        ):
+            self.assertEqual(
+                self.client.get(url, REMOTE_ADDR="10.1.2.3").status_code,
+                status.HTTP_200_OK,
+            )
+            self.assertEqual(
+                self.client.get(url, REMOTE_ADDR="203.0.113.10").status_code,
+                status.HTTP_404_NOT_FOUND,
+            )
+            response = self.client.get(
+                url, REMOTE_ADDR="203.0.113.10", HTTP_AUTHORIZATION="Bearer wrong-token"
+            )
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+            response = self.client.get(
+                url,
+                REMOTE_ADDR="203.0.113.10",
+                HTTP_AUTHORIZATION="Bearer metrics-token",
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @override_settings(METRICS={"TOKEN": "metrics-token", "ALLOWED_IPS": []})
+    def test_metrics_endpoint_non_ascii_authorization(self):
+        """
+        ASCII 以外を含む Authorization ヘッダーでも500エラーにならず、404 を返すこと
+        """
+        url = reverse("metrics", host="user_app")
+        response = self.client.get(
+            url, REMOTE_ADDR="203.0.113.10", HTTP_AUTHORIZATION="Bearer トークン"
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get(
+            url,
+            REMOTE_ADDR="203.0.113.10",
+            HTTP_AUTHORIZATION="Bearer m\xe9trics-token",
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
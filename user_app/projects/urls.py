@@ -1,8 +1,25 @@
+from django.conf import settings
 from django.urls import path, include
-from user_app.projects.views import ProjectListCreateAPIView, ProjectRetrieveUpdateDestroyAPIView
+from user_app.projects.views import (
+    ProjectListCreateAPIView,
+    ProjectRetrieveUpdateDestroyAPIView,
+    AsyncProjectListCreateAPIView,
+    AsyncProjectRetrieveUpdateDestroyAPIView,
+)
+
+# ASGIで動かす場合は非同期ビューを使う
+if settings.ASYNC_VIEWS:
+    ProjectListCreateAPIView = AsyncProjectListCreateAPIView  # noqa: F811
+    ProjectRetrieveUpdateDestroyAPIView = (  # noqa: F811
+        AsyncProjectRetrieveUpdateDestroyAPIView
+    )
 
 urlpatterns = [
     path("", ProjectListCreateAPIView.as_view(), name="project-list-create"),
-    path('<int:project_id>/', ProjectRetrieveUpdateDestroyAPIView.as_view(), name='project-detail'),
-    path('<int:project_id>/contents/', include('user_app.contents.urls')),
+    path(
+        "<int:project_id>/",
+        ProjectRetrieveUpdateDestroyAPIView.as_view(),
+        name="project-detail",
+    ),
+    path("<int:project_id>/contents/", include("user_app.contents.urls")),
 ]
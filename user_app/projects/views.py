@@ -4,8 +4,12 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 
-from npi.utils import ERROR_MESSAGES, CustomPagination, check_space_permission
-from shared.models import Space, Permission, Project
+from npi.authentication import CookieJWTStatelessAuthentication
+from npi.utils import ERROR_MESSAGES, get_paginator, list_params_error
+from npi.async_views import AsyncAPIView
+from npi.permissions import has_space_permission, ahas_space_permission
+from shared.registry import PERM
+from shared.models import Space, Project
 from user_app.projects.serializer import ProjectSerializer
 from django.utils import timezone
 
@@ -15,60 +19,77 @@ logger = logging.getLogger(__name__)
 
 # 一覧/作成用
 class ProjectListCreateAPIView(APIView):
+    # 参照系はトークンのクレームのみで認証（更新系はアカウントの存在・削除済みでないことも確認）
+    authentication_classes = (CookieJWTStatelessAuthentication,)
     # 認証が必要
     permission_classes = (IsAuthenticated,)
+    # キーセット方式のページネーション（pagination=cursor）で指定できる並び順
+    orderings = {"id": ("id",), "last_updated_at": ("-last_updated_at", "-id")}
+    # 性能の予算（npi.testing）
+    performance_budgets = {
+        # 権限 + 件数 + 一覧
+        "GET": {"queries": 3, "db_time": 0.05, "wall_time": 0.5},
+        # アカウント（キャッシュがない場合） + 権限 + スペースの存在チェック + スペースの取得 + 登録
+        "POST": {"queries": 6, "db_time": 0.05, "wall_time": 0.5},
+    }
+
+    # 一覧取得できる権限
+    list_permission_names = [
+        PERM.space_admin,
+        PERM.creator,
+        PERM.distributor,
+        PERM.viewer,
+    ]
+
+    # 一覧の対象（同期・非同期で共通）
+    def get_queryset(self, request, space_id):
+        return Project.objects.filter(space_id=space_id, deleted_at__isnull=True)
+
+    # 一覧のレスポンス（同期・非同期で共通）
+    def list_response(self, paginator, page, projects):
+        if page is not None:
+            serializer = ProjectSerializer(page, many=True)
+            return paginator.get_paginated_response(serializer.data)
+
+        serializer = ProjectSerializer(projects, many=True)
+
+        return Response(
+            {"status": "success", "data": serializer.data}, status=status.HTTP_200_OK
+        )
 
     # 一覧取得
     def get(self, request, space_id):
         # ユーザーがそのスペースでの対象の操作権限があるかチェック
-        permission_names = ['space_admin', 'creator', 'disrtibutor', 'viewer']
-        permission_ids = list(Permission.objects.filter(name__in=permission_names, deleted_at__isnull=True).values_list('id', flat=True))
-        if not check_space_permission(request.user, space_id, permission_ids):
+        if not has_space_permission(request, space_id, self.list_permission_names):
             return Response(
                 ERROR_MESSAGES["400_ERRORS"], status=status.HTTP_400_BAD_REQUEST
             )
 
         # 必須チェック
-        if request.GET.get("page") is None:
-            return Response(
-                ERROR_MESSAGES["400_ERRORS"], status=status.HTTP_400_BAD_REQUEST
-            )
-        if request.GET.get("per_page") is None:
-            return Response(
-                ERROR_MESSAGES["400_ERRORS"], status=status.HTTP_400_BAD_REQUEST
-            )
+        error = list_params_error(request)
+        if error is not None:
+            return error
 
         # ページネーションの設定
-        paginator = CustomPagination()
-        paginator.page_size = request.GET.get("per_page", 10)
+        paginator = get_paginator(request, self.orderings)
 
-        projects = Project.objects.filter(space_id=space_id, deleted_at__isnull=True)
+        projects = self.get_queryset(request, space_id)
         # ページネーションを適用
         page = paginator.paginate_queryset(projects, request)
-        if page is not None:
-            serializer = ProjectSerializer(page, many=True)
-            return paginator.get_paginated_response(serializer.data)
-
-        serializer = ProjectSerializer(projects, many=True)
-
-        return Response({
-            'status': 'success',
-            'data': serializer.data
-        }, status=status.HTTP_200_OK)
+        return self.list_response(paginator, page, projects)
 
     # 作成
     def post(self, request, space_id):
         # ユーザーがそのスペースでの対象の操作権限があるかチェック
-        permission_names = ['space_admin']
-        permission_ids = list(Permission.objects.filter(name__in=permission_names, deleted_at__isnull=True).values_list('id', flat=True))
-        if not check_space_permission(request.user, space_id, permission_ids):
+        permission_names = [PERM.space_admin]
+        if not has_space_permission(request, space_id, permission_names):
             return Response(
                 ERROR_MESSAGES["400_ERRORS"], status=status.HTTP_400_BAD_REQUEST
             )
 
         data = request.data.copy()
-        data['space'] = space_id
-        data['last_updated_at'] = timezone.now()
+        data["space"] = space_id
+        data["last_updated_at"] = timezone.now()
         serializer = ProjectSerializer(data=data)
 
         if serializer.is_valid():
@@ -77,7 +98,7 @@ class ProjectListCreateAPIView(APIView):
             serializer.save(
                 space=space,
             )
-            return Response({'status': 'success'}, status=status.HTTP_200_OK)
+            return Response({"status": "success"}, status=status.HTTP_200_OK)
 
         return Response(
             ERROR_MESSAGES["400_ERRORS"], status=status.HTTP_400_BAD_REQUEST
@@ -86,43 +107,78 @@ class ProjectListCreateAPIView(APIView):
 
 # 詳細/更新/削除用
 class ProjectRetrieveUpdateDestroyAPIView(APIView):
+    # 参照系はトークンのクレームのみで認証（更新系はアカウントの存在・削除済みでないことも確認）
+    authentication_classes = (CookieJWTStatelessAuthentication,)
     # 認証が必要
     permission_classes = (IsAuthenticated,)
+    # 性能の予算（npi.testing）
+    performance_budgets = {
+        # 権限 + 詳細
+        "GET": {"queries": 2, "db_time": 0.05, "wall_time": 0.5},
+        # アカウント（キャッシュがない場合） + 権限 + 取得 + スペースの存在チェック + スペースの取得 + 更新
+        "PUT": {"queries": 7, "db_time": 0.05, "wall_time": 0.5},
+        # アカウント（キャッシュがない場合） + 権限 + 取得 + 削除（コンテンツを含む）
+        "DELETE": {"queries": 6, "db_time": 0.05, "wall_time": 0.5},
+    }
 
-    # 詳細取得
-    def get(self, request, space_id, project_id):
-        # ユーザーがそのスペースでの対象の操作権限があるかチェック
-        permission_names = ['space_admin', 'creator', 'disrtibutor', 'viewer']
-        permission_ids = list(Permission.objects.filter(name__in=permission_names, deleted_at__isnull=True).values_list('id', flat=True))
-        if not check_space_permission(request.user, space_id, permission_ids):
-            return Response(
-                ERROR_MESSAGES["400_ERRORS"], status=status.HTTP_400_BAD_REQUEST
+    # 詳細取得できる権限
+    detail_permission_names = [
+        PERM.space_admin,
+        PERM.creator,
+        PERM.distributor,
+        PERM.viewer,
+    ]
+
+    # 対象のプロジェクトを取得（存在しない場合は None）
+    def get_project(self, space_id, project_id):
+        try:
+            return Project.objects.get(
+                id=project_id, space_id=space_id, deleted_at__isnull=True
             )
+        except Project.DoesNotExist:
+            return None
 
-        project = Project.objects.get(id=project_id, space_id=space_id, deleted_at__isnull=True)
+    # get_project の非同期版
+    async def aget_project(self, space_id, project_id):
+        try:
+            return await Project.objects.aget(
+                id=project_id, space_id=space_id, deleted_at__isnull=True
+            )
+        except Project.DoesNotExist:
+            return None
 
+    # 詳細のレスポンス（同期・非同期で共通）
+    def detail_response(self, project):
         if not project:
             return Response(
                 ERROR_MESSAGES["404_ERRORS"], status=status.HTTP_404_NOT_FOUND
             )
 
         serializer = ProjectSerializer(project)
-        return Response({
-            'status': 'success',
-            'data': serializer.data
-        }, status=status.HTTP_200_OK)
+        return Response(
+            {"status": "success", "data": serializer.data}, status=status.HTTP_200_OK
+        )
+
+    # 詳細取得
+    def get(self, request, space_id, project_id):
+        # ユーザーがそのスペースでの対象の操作権限があるかチェック
+        if not has_space_permission(request, space_id, self.detail_permission_names):
+            return Response(
+                ERROR_MESSAGES["400_ERRORS"], status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return self.detail_response(self.get_project(space_id, project_id))
 
     # 更新
     def put(self, request, space_id, project_id):
         # ユーザーがそのスペースでの対象の操作権限があるかチェック
-        permission_names = ['space_admin']
-        permission_ids = list(Permission.objects.filter(name__in=permission_names, deleted_at__isnull=True).values_list('id', flat=True))
-        if not check_space_permission(request.user, space_id, permission_ids):
+        permission_names = [PERM.space_admin]
+        if not has_space_permission(request, space_id, permission_names):
             return Response(
                 ERROR_MESSAGES["400_ERRORS"], status=status.HTTP_400_BAD_REQUEST
             )
 
-        project = Project.objects.get(id=project_id, space_id=space_id, deleted_at__isnull=True)
+        project = self.get_project(space_id, project_id)
 
         if not project:
             return Response(
@@ -130,8 +186,8 @@ class ProjectRetrieveUpdateDestroyAPIView(APIView):
             )
 
         data = request.data.copy()
-        data['space'] = space_id
-        data['last_updated_at'] = timezone.now()
+        data["space"] = space_id
+        data["last_updated_at"] = timezone.now()
         serializer = ProjectSerializer(project, data)
         if serializer.is_valid():
             space = Space.objects.get(id=space_id, deleted_at__isnull=True)
@@ -139,7 +195,7 @@ class ProjectRetrieveUpdateDestroyAPIView(APIView):
             serializer.save(
                 space=space,
             )
-            return Response({'status': 'success'}, status=status.HTTP_200_OK)
+            return Response({"status": "success"}, status=status.HTTP_200_OK)
 
         return Response(
             ERROR_MESSAGES["400_ERRORS"], status=status.HTTP_400_BAD_REQUEST
@@ -148,14 +204,13 @@ class ProjectRetrieveUpdateDestroyAPIView(APIView):
     # 削除
     def delete(self, request, space_id, project_id):
         # ユーザーがそのスペースでの対象の操作権限があるかチェック
-        permission_names = ['space_admin']
-        permission_ids = list(Permission.objects.filter(name__in=permission_names, deleted_at__isnull=True).values_list('id', flat=True))
-        if not check_space_permission(request.user, space_id, permission_ids):
+        permission_names = [PERM.space_admin]
+        if not has_space_permission(request, space_id, permission_names):
             return Response(
                 ERROR_MESSAGES["400_ERRORS"], status=status.HTTP_400_BAD_REQUEST
             )
 
-        project = Project.objects.get(id=project_id, space_id=space_id, deleted_at__isnull=True)
+        project = self.get_project(space_id, project_id)
 
         if not project:
             return Response(
@@ -163,4 +218,53 @@ class ProjectRetrieveUpdateDestroyAPIView(APIView):
             )
 
         project.delete()
-        return Response({'status': 'success'}, status=status.HTTP_200_OK)
+        return Response({"status": "success"}, status=status.HTTP_200_OK)
+
+
+# ProjectListCreateAPIView の非同期版（ASGIで動かす場合に使う）
+# 一覧取得のみ非同期で処理し、作成は同期処理をスレッドで実行する
+class AsyncProjectListCreateAPIView(AsyncAPIView, ProjectListCreateAPIView):
+
+    # 一覧取得
+    async def get(self, request, space_id):
+        # ユーザーがそのスペースでの対象の操作権限があるかチェック
+        if not await ahas_space_permission(
+            request, space_id, self.list_permission_names
+        ):
+            return Response(
+                ERROR_MESSAGES["400_ERRORS"], status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # 必須チェック
+        error = list_params_error(request)
+        if error is not None:
+            return error
+
+        # ページネーションの設定
+        paginator = get_paginator(request, self.orderings)
+
+        projects = self.get_queryset(request, space_id)
+        # ページネーションを適用
+        page = await paginator.apaginate_queryset(projects, request)
+        if page is None:
+            projects = [project async for project in projects]
+        return self.list_response(paginator, page, projects)
+
+
+# ProjectRetrieveUpdateDestroyAPIView の非同期版（ASGIで動かす場合に使う）
+# 詳細取得のみ非同期で処理し、更新/削除は同期処理をスレッドで実行する
+class AsyncProjectRetrieveUpdateDestroyAPIView(
+    AsyncAPIView, ProjectRetrieveUpdateDestroyAPIView
+):
+
+    # 詳細取得
+    async def get(self, request, space_id, project_id):
+        # ユーザーがそのスペースでの対象の操作権限があるかチェック
+        if not await ahas_space_permission(
+            request, space_id, self.detail_permission_names
+        ):
+            return Response(
+                ERROR_MESSAGES["400_ERRORS"], status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return self.detail_response(await self.aget_project(space_id, project_id))
@@ -5,9 +5,10 @@ from django.core.validators import (
 from shared.models import Space, SpaceAccount, Permission, SpaceAccountPermission
 from user_app.accounts.serializer import AccountSerializer
 from shared.models import Account
+from npi.instrumentation import TimedSerializerMixin
 
 
-class SpaceSerializer(serializers.ModelSerializer):
+class SpaceSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     name = serializers.CharField(
         required=True,
         validators=[
@@ -1,8 +1,11 @@
 from rest_framework import status
-from rest_framework.test import APITestCase
+from rest_framework.test import APITestCase, APIRequestFactory
+from asgiref.sync import async_to_sync
 from npi.utils import ERROR_MESSAGES
 from django_hosts.resolvers import reverse
 from shared.models import Account, Space, SpaceAccount
+from npi.testing import PerformanceBudgetMixin
+from user_app.spaces.views import AsyncSpaceListView
 from django.contrib.auth.hashers import make_password
 import logging
 
@@ -10,10 +13,10 @@ import logging
 logger = logging.getLogger(__name__)
 
 
-class SpaceListViewTests(APITestCase):
+class SpaceListViewTests(PerformanceBudgetMixin, APITestCase):
     def setUp(self):
-        self.login_url = reverse("login", host='user_app')
-        self.url = reverse("spaces-list", host='user_app')
+        self.login_url = reverse("login", host="user_app")
+        self.url = reverse("spaces-list", host="user_app")
         # テスト用ユーザーを作成
         self.account1 = Account.objects.create(
             email="test@example.com",
@@ -59,6 +62,49 @@ class SpaceListViewTests(APITestCase):
         self.assertEqual(response.data["status"], "success")
         self.assertEqual(len(response.data["data"]), 2)
 
+    def test_get_space_list_response(self):
+        """
+        スペース一覧の取得時に、スペースの項目のみを返すこと
+        """
+        response = self.client.get(self.url, {"page": 1, "per_page": 10})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["data"][0],
+            {
+                "id": self.space1.id,
+                "name": "Test Space 1",
+                "icon_image_path": "path/to/icon1.png",
+                "description": "This is a test space description.",
+            },
+        )
+
+    def test_get_space_list_query_count(self):
+        """
+        スペース一覧の取得時に、件数によらずクエリ数が一定であること
+        """
+        for i in range(20):
+            space = Space.objects.create(name=f"Extra Space {i}")
+            SpaceAccount.objects.create(space=space, account=self.account1)
+
+        # 件数 + ページの取得
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, {"page": 1, "per_page": 20})
+        self.assertEqual(len(response.data["data"]), 20)
+
+        # 件数はキャッシュから取得するため、ページの取得のみ
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, {"page": 2, "per_page": 20})
+        self.assertEqual(len(response.data["data"]), 3)
+
+    def test_get_space_list_budget(self):
+        """
+        スペース一覧の取得が予算内に収まること
+        """
+        response = self.assertWithinBudget(
+            "get", self.url, {"page": 1, "per_page": 10}, warm_up=False
+        )
+        self.assertEqual(len(response.data["data"]), 3)
+
     def test_get_space_list_no_spaces(self):
         """
         スペースが存在しない場合のスペース一覧を取得
@@ -80,3 +126,26 @@ class SpaceListViewTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
         expected_response = ERROR_MESSAGES["401_ERRORS"]
         self.assertEqual(response.data, expected_response)
+
+    def test_get_space_list_async(self):
+        """
+        非同期ビューでのスペース一覧の取得
+        """
+        request = APIRequestFactory().get(self.url, {"page": 1, "per_page": 2})
+        request.COOKIES["access_token"] = self.client.cookies["access_token"].value
+        response = async_to_sync(AsyncSpaceListView.as_view())(request)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["status"], "success")
+        self.assertEqual(len(response.data["data"]), 2)
+        self.assertEqual(response.data["pagination"]["total_items"], 3)
+
+    def test_get_space_list_async_unauthenticated(self):
+        """
+        非同期ビューで認証されていないスペース一覧を取得しようとする
+        """
+        request = APIRequestFactory().get(self.url, {"page": 1, "per_page": 10})
+        response = async_to_sync(AsyncSpaceListView.as_view())(request)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response.data, ERROR_MESSAGES["401_ERRORS"])
@@ -1,7 +1,12 @@
+from django.conf import settings
 from django.urls import path, include
-from user_app.spaces.views import SpaceListView
+from user_app.spaces.views import SpaceListView, AsyncSpaceListView
+
+# ASGIで動かす場合は非同期ビューを使う
+if settings.ASYNC_VIEWS:
+    SpaceListView = AsyncSpaceListView  # noqa: F811
 
 urlpatterns = [
     path("", SpaceListView.as_view(), name="spaces-list"),
-    path('<int:space_id>/projects/', include('user_app.projects.urls')),
+    path("<int:space_id>/projects/", include("user_app.projects.urls")),
 ]
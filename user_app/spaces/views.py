@@ -4,53 +4,84 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 
-from user_app.spaces.serializer import SpaceAccountSerializer
-from npi.utils import ERROR_MESSAGES, CustomPagination
-from shared.models import SpaceAccount
+from user_app.spaces.serializer import SpaceSerializer
+from npi.async_views import AsyncAPIView
+from npi.authentication import CookieJWTStatelessAuthentication
+from npi.utils import ERROR_MESSAGES, get_paginator, list_params_error
+from shared.models import Space
 
 # ロガーの設定
 logger = logging.getLogger(__name__)
 
 
+def space_list_queryset(account_id):
+    """
+    ユーザーが所属しているスペースの一覧
+    スペースアカウントと結合し、レスポンスに含めるスペースの列のみを取得する
+    """
+    return (
+        Space.objects.filter(
+            spaceaccount__account_id=account_id, spaceaccount__deleted_at__isnull=True
+        )
+        .order_by("id")
+        .values(*SpaceSerializer.Meta.fields)
+    )
+
+
 class SpaceListView(APIView):
+    # トークンのクレームのみで認証（アカウントは参照時に取得）
+    authentication_classes = (CookieJWTStatelessAuthentication,)
     # 認証が必要
     permission_classes = (IsAuthenticated,)
+    # キーセット方式のページネーション（pagination=cursor）で指定できる並び順
+    orderings = {"id": ("id",)}
+    # 性能の予算（npi.testing）: 件数 + 一覧
+    performance_budgets = {
+        "GET": {"queries": 2, "db_time": 0.05, "wall_time": 0.5},
+    }
 
     def get(self, request):
-        # ユーザーが所属しているスペースを取得
-        space_accounts = SpaceAccount.objects.filter(
-            account=request.user, deleted_at__isnull=True
-        )
-
         # 必須チェック
-        if request.GET.get("page") is None:
-            return Response(
-                ERROR_MESSAGES["400_ERRORS"], status=status.HTTP_400_BAD_REQUEST
-            )
-        if request.GET.get("per_page") is None:
-            return Response(
-                ERROR_MESSAGES["400_ERRORS"], status=status.HTTP_400_BAD_REQUEST
-            )
+        error = list_params_error(request)
+        if error is not None:
+            return error
+
+        # ユーザーが所属しているスペースを取得
+        spaces = space_list_queryset(request.user.id)
 
-        # ページネーションの設定
-        paginator = CustomPagination()
-        paginator.page_size = request.GET.get("per_page", 10)
+        # ページネーションを適用
+        paginator = get_paginator(request, self.orderings)
+        page = paginator.paginate_queryset(spaces, request)
 
-        if not space_accounts.exists():
+        # 所属しているスペースがない場合
+        if not page:
             return Response(
                 ERROR_MESSAGES["404_ERRORS"], status=status.HTTP_404_NOT_FOUND
             )
 
+        return paginator.get_paginated_response(page)
+
+
+# SpaceListView の非同期版（ASGIで動かす場合に使う）
+class AsyncSpaceListView(AsyncAPIView, SpaceListView):
+
+    async def get(self, request):
+        # 必須チェック
+        error = list_params_error(request)
+        if error is not None:
+            return error
+
+        # ユーザーが所属しているスペースを取得
+        spaces = space_list_queryset(request.user.id)
+
         # ページネーションを適用
-        page = paginator.paginate_queryset(space_accounts, request)
-        if page is not None:
-            serializer = SpaceAccountSerializer(page, many=True)
-            filtered_data = [item["space"] for item in serializer.data]
-            return paginator.get_paginated_response(filtered_data)
+        paginator = get_paginator(request, self.orderings)
+        page = await paginator.apaginate_queryset(spaces, request)
 
-        serializer = SpaceAccountSerializer(space_accounts, many=True)
-        filtered_data = [item["space"] for item in serializer.data]
+        # 所属しているスペースがない場合
+        if not page:
+            return Response(
+                ERROR_MESSAGES["404_ERRORS"], status=status.HTTP_404_NOT_FOUND
+            )
 
-        return Response(
-            {"status": "success", "data": filtered_data}, status=status.HTTP_200_OK
-        )
+        return paginator.get_paginated_response(page)
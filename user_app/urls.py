@@ -18,7 +18,9 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
-from mail_templates.views import SendMailView
+from mail_templates.views import BulkSendMailStatusView, BulkSendMailView, SendMailView
+from npi.health import liveness_view, readiness_view
+from npi.metrics import metrics_view
 from user_app.accounts.views.account_views import MeView, Generate2FAView, Verify2FAView
 from user_app.accounts.views.auth_views import LoginView, LogoutView, RefreshTokenView
 
@@ -32,6 +34,17 @@ urlpatterns = [
     path("logout/", LogoutView.as_view(), name="logout"),
     path("refresh/", RefreshTokenView.as_view(), name="refresh"),
     path("send-mail/", SendMailView.as_view(), name="send-mail"),
+    path("send-mail/bulk/", BulkSendMailView.as_view(), name="send-mail-bulk"),
+    path(
+        "send-mail/bulk/<uuid:batch_id>/",
+        BulkSendMailStatusView.as_view(),
+        name="send-mail-bulk-status",
+    ),
     path("spaces/", include("user_app.spaces.urls")),
     path("announcements/", include("user_app.announcements.urls")),
+    # ホストの指定がないリクエスト（DEFAULT_HOST）もこのURL設定で処理されるため、ここにも定義する
+    path("health", liveness_view, name="health_check"),
+    path("health/live", liveness_view, name="health_live"),
+    path("health/ready", readiness_view, name="health_ready"),
+    path("metrics", metrics_view, name="metrics"),
 ]